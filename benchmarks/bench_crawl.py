@@ -0,0 +1,107 @@
+"""
+End-to-end crawl benchmark against the local mock server in tests/mock_server.py.
+
+Several threads share one FAAPI object and crawl gallery pages and submissions for a fixed time. The benchmark reports
+the throughput, the timing percentiles of each endpoint, the retries, the coalesced requests, and whether the crawl
+delay was respected.
+
+Usage: python benchmarks/bench_crawl.py [--duration SECONDS] [--threads N] [--delay SECONDS] [--latency SECONDS]
+                                        [--error-rate RATE] [--json FILE]
+"""
+
+from argparse import ArgumentParser
+from json import dump
+from pathlib import Path
+from sys import path as sys_path
+from threading import Event
+from threading import Thread
+from time import perf_counter
+from typing import Any
+from typing import Optional
+
+__root__: Path = Path(__file__).resolve().parent.parent
+sys_path.insert(0, str(__root__))
+sys_path.insert(0, str(__root__ / "tests"))
+
+import faapi.connection  # noqa: E402
+from faapi import FAAPI  # noqa: E402
+from faapi.metrics import MetricsAggregator  # noqa: E402
+from faapi.retry import RetryPolicy  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+
+
+def crawl(api: FAAPI, stop: Event, errors: list[str]):
+    page: Optional[int] = 1
+    while not stop.is_set():
+        try:
+            submissions, page = api.gallery("artist", page or 1)
+            for submission in submissions[:3]:
+                if stop.is_set():
+                    break
+                api.submission(submission.id)
+        except Exception as err:
+            errors.append(type(err).__name__)
+
+
+def main():
+    argparser: ArgumentParser = ArgumentParser(description="Run a crawl against the local mock server.")
+    argparser.add_argument("--duration", type=float, default=10, help="duration of the crawl (seconds)")
+    argparser.add_argument("--threads", type=int, default=4, help="number of crawling threads")
+    argparser.add_argument("--delay", type=float, default=0.05, help="crawl delay (seconds)")
+    argparser.add_argument("--latency", type=float, default=0.01, help="latency added by the server (seconds)")
+    argparser.add_argument("--error-rate", type=float, default=0, help="probability of server errors")
+    argparser.add_argument("--json", type=Path, default=None, help="save the results to a JSON file")
+    args = argparser.parse_args()
+
+    with MockServer(latency=args.latency, error_rate=args.error_rate, pages=5, seed=0) as server:
+        faapi.connection.root = server.url
+        api: FAAPI = FAAPI([{"name": "a", "value": "a"}], retry_policy=RetryPolicy(3, backoff_factor=args.delay))
+        api.robots.default_entry.delay = args.delay  # type: ignore
+        api.robots_policy.compile()
+        aggregator: MetricsAggregator = MetricsAggregator()
+        api.observers.append(aggregator)
+
+        stop: Event = Event()
+        errors: list[str] = []
+        threads: list[Thread] = [Thread(target=crawl, args=(api, stop, errors)) for _ in range(args.threads)]
+        server.requests.clear()
+        time_start: float = perf_counter()
+        for thread in threads:
+            thread.start()
+        stop.wait(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed: float = perf_counter() - time_start
+
+    times: list[float] = [r.time for r in server.requests]
+    intervals: list[float] = [b - a for a, b in zip(times, times[1:])]
+    results: dict[str, Any] = {
+        "requests": len(server.requests),
+        "requests_per_second": len(server.requests) / elapsed,
+        "min_interval": min(intervals, default=0),
+        "delay_respected": all(i >= args.delay * 0.9 for i in intervals),
+        "errors": len(errors),
+        "retries": dict(api.retry_policy.stats),
+        "coalesced": api.single_flight.shared if api.single_flight else 0,
+        "endpoints": aggregator.report(),
+    }
+
+    print(f"requests: {results['requests']} ({results['requests_per_second']:.2f}/s)")
+    print(f"crawl delay respected: {results['delay_respected']} (minimum interval {results['min_interval']:.3f}s)")
+    print(f"errors: {results['errors']}, retries: {api.retry_policy.stats}, coalesced: {results['coalesced']}")
+    for endpoint, endpoint_phases in results["endpoints"].items():
+        print(endpoint)
+        for phase_name, percentiles in endpoint_phases.items():
+            print(f"  {phase_name:<10}" + "".join(
+                f" p{p:g}={v:.0f}" if phase_name == "bytes" else f" p{p:g}={v * 1000:.1f}ms"
+                for p, v in percentiles.items()
+            ))
+
+    if args.json:
+        with args.json.open("w") as f:
+            dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
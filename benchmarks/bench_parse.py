@@ -0,0 +1,187 @@
+"""
+Offline benchmarks for the parsing hot paths.
+
+The benchmarks run over the pages recorded in tests/pages and report the throughput and peak memory of each function.
+
+Usage: python benchmarks/bench_parse.py [--min-time SECONDS] [--filter TEXT] [--json FILE]
+"""
+
+from argparse import ArgumentParser
+from json import dump
+from pickle import dumps
+from pickle import loads
+from pathlib import Path
+from sys import path as sys_path
+from time import perf_counter
+from tracemalloc import get_traced_memory
+from tracemalloc import start as tracemalloc_start
+from tracemalloc import stop as tracemalloc_stop
+from typing import Any
+from typing import Callable
+from typing import NamedTuple
+
+__root__: Path = Path(__file__).resolve().parent.parent
+sys_path.insert(0, str(__root__))
+
+from faapi import Journal  # noqa: E402
+from faapi import Submission  # noqa: E402
+from faapi import User  # noqa: E402
+from faapi.comment import Comment  # noqa: E402
+from faapi.comment import sort_comments  # noqa: E402
+from faapi.parse import bbcode_to_html  # noqa: E402
+from faapi.parse import check_page_raise  # noqa: E402
+from faapi.parse import html_to_bbcode  # noqa: E402
+from faapi.parse import parse_comment_tag  # noqa: E402
+from faapi.parse import parse_comments  # noqa: E402
+from faapi.parse import parse_journal_page  # noqa: E402
+from faapi.parse import parse_loggedin_user  # noqa: E402
+from faapi.parse import parse_page  # noqa: E402
+from faapi.parse import parse_page_envelope  # noqa: E402
+from faapi.parse import parse_submission_figure  # noqa: E402
+from faapi.parse import parse_submission_figures  # noqa: E402
+from faapi.parse import parse_submission_page  # noqa: E402
+from faapi.parse import parse_user_favorites  # noqa: E402
+from faapi.parse import parse_user_journals  # noqa: E402
+from faapi.parse import parse_user_page  # noqa: E402
+from faapi.parse import parse_user_submissions  # noqa: E402
+from faapi.parse import parse_watchlist  # noqa: E402
+
+pages_folder: Path = __root__ / "tests" / "pages"
+
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: Callable[[], tuple]
+    run: Callable[..., Any]
+    size: int = 0
+
+
+class Result(NamedTuple):
+    name: str
+    iterations: int
+    mean: float
+    best: float
+    throughput: float
+    megabytes: float
+    peak_memory: int
+
+
+def arguments(*args) -> Callable[[], tuple]:
+    return lambda: args
+
+
+def benchmarks() -> list[Benchmark]:
+    pages: dict[str, str] = {p.name: p.read_text(encoding="utf-8") for p in sorted(pages_folder.glob("*.html"))}
+    submission_page: str = pages["submission.html"]
+    comments_page: str = pages["submission_comments.html"]
+    submission: Submission = Submission(parse_page(submission_page))
+    submission_comments: Submission = Submission(parse_page(comments_page))
+    comments_flat: list[Comment] = [Comment(t) for t in parse_comments(parse_page(comments_page))]
+    description_bbcode: str = html_to_bbcode(submission.description)
+
+    return [
+        *(
+            Benchmark(f"parse_page[{n}]", arguments(t), parse_page, len(t.encode()))
+            for n, t in pages.items()
+        ),
+        *(
+            Benchmark(f"parse_page[{n}:bytes]", arguments(b), parse_page, len(b))
+            for n, t in pages.items()
+            if (b := t.encode()) and n.startswith("submission")
+        ),
+        Benchmark("check_page_raise", lambda: (parse_page(submission_page),), check_page_raise),
+        Benchmark("parse_page_envelope", lambda: (parse_page(comments_page),), parse_page_envelope),
+        Benchmark("parse_loggedin_user", lambda: (parse_page(submission_page),), parse_loggedin_user),
+        Benchmark("parse_submission_page", lambda: (parse_page(submission_page),), parse_submission_page),
+        Benchmark("parse_user_page", lambda: (parse_page(pages["user.html"]),), parse_user_page),
+        Benchmark("parse_journal_page", lambda: (parse_page(pages["journal.html"]),), parse_journal_page),
+        Benchmark("parse_user_submissions", lambda: (parse_page(pages["gallery.html"]),), parse_user_submissions),
+        Benchmark("parse_user_favorites", lambda: (parse_page(pages["favorites.html"]),), parse_user_favorites),
+        Benchmark("parse_user_journals", lambda: (parse_page(pages["journals.html"]),), parse_user_journals),
+        Benchmark("parse_watchlist", lambda: (parse_page(pages["watchlist.html"]),), parse_watchlist),
+        Benchmark(
+            "parse_submission_figure[72]",
+            lambda: (parse_submission_figures(parse_page(pages["gallery.html"])),),
+            lambda figures: [parse_submission_figure(f) for f in figures]
+        ),
+        Benchmark(
+            "parse_comment_tag[600]",
+            lambda: (parse_comments(parse_page(comments_page)),),
+            lambda tags: [parse_comment_tag(t) for t in tags]
+        ),
+        Benchmark("Submission[12 comments]", lambda: (parse_page(submission_page),), Submission),
+        Benchmark("Submission[600 comments]", lambda: (parse_page(comments_page),), Submission),
+        Benchmark(
+            "Submission[600 comments, lazy]",
+            lambda: (parse_page(comments_page),),
+            lambda page: Submission(page, parse_comments=False)
+        ),
+        Benchmark("User", lambda: (parse_page(pages["user.html"]),), User),
+        Benchmark("Journal[150 comments]", lambda: (parse_page(pages["journal.html"]),), Journal),
+        Benchmark("html_to_bbcode", arguments(submission.description), html_to_bbcode, len(submission.description)),
+        Benchmark("bbcode_to_html", arguments(description_bbcode), bbcode_to_html, len(description_bbcode)),
+        Benchmark("sort_comments[600]", arguments(comments_flat), sort_comments),
+        Benchmark("dict(Submission)[12 comments]", arguments(submission), dict),
+        Benchmark("dict(Submission)[600 comments]", arguments(submission_comments), dict),
+        Benchmark(
+            "Submission.from_dict[600 comments]",
+            lambda: (dict(submission_comments),),
+            Submission.from_dict
+        ),
+        Benchmark("pickle.dumps(Submission)[600 comments]", arguments(submission_comments), dumps),
+        Benchmark("pickle.loads(Submission)[600 comments]", arguments(dumps(submission_comments)), loads),
+    ]
+
+
+def measure(benchmark: Benchmark, min_time: float, min_iterations: int = 3) -> Result:
+    times: list[float] = []
+    while sum(times) < min_time or len(times) < min_iterations:
+        args: tuple = benchmark.setup()
+        time_start: float = perf_counter()
+        benchmark.run(*args)
+        times.append(perf_counter() - time_start)
+
+    args = benchmark.setup()
+    tracemalloc_start()
+    benchmark.run(*args)
+    _, peak_memory = get_traced_memory()
+    tracemalloc_stop()
+
+    mean: float = sum(times) / len(times)
+    return Result(
+        benchmark.name,
+        len(times),
+        mean,
+        min(times),
+        1 / mean,
+        benchmark.size / mean / (1 << 20) if benchmark.size else 0,
+        peak_memory,
+    )
+
+
+def main():
+    argparser: ArgumentParser = ArgumentParser(description="Run the offline parsing benchmarks.")
+    argparser.add_argument("--min-time", type=float, default=1, help="minimum time for each benchmark (seconds)")
+    argparser.add_argument("--filter", type=str, default="", help="run only benchmarks containing this text")
+    argparser.add_argument("--json", type=Path, default=None, help="save the results to a JSON file")
+    args = argparser.parse_args()
+
+    results: list[Result] = []
+
+    print(f"{'benchmark':<40} {'iter':>6} {'mean ms':>10} {'best ms':>10} {'ops/s':>10} {'MiB/s':>8} {'peak KiB':>10}")
+    for benchmark in benchmarks():
+        if args.filter not in benchmark.name:
+            continue
+        result: Result = measure(benchmark, args.min_time)
+        results.append(result)
+        megabytes: str = f"{result.megabytes:.2f}" if result.megabytes else "-"
+        print(f"{result.name:<40} {result.iterations:>6} {result.mean * 1000:>10.3f} {result.best * 1000:>10.3f} "
+              f"{result.throughput:>10.1f} {megabytes:>8} {result.peak_memory / 1024:>10.1f}")
+
+    if args.json:
+        with args.json.open("w") as f:
+            dump([r._asdict() for r in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,19 @@ __all__ = [
     "SubmissionPartial",
     "User",
     "UserPartial",
+    "archive",
+    "cache",
+    "coalesce",
     "exceptions",
+    "idset",
     "connection",
-    "parse"
+    "metrics",
+    "parse",
+    "prefetch",
+    "retry",
+    "robots",
+    "scheduler",
+    "search",
+    "storage",
+    "throttle",
 ]
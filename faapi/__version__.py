@@ -1 +1 @@
-__version__ = "3.12.7"
+__version__ = "3.13.0"
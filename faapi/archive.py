@@ -0,0 +1,334 @@
+from collections import Counter
+from collections import namedtuple
+from mmap import ACCESS_READ
+from mmap import mmap
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import BinaryIO
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import TextIO
+from typing import Union
+from zlib import compressobj
+from zlib import decompressobj
+
+from .exceptions import _raise_exception
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+codecs: tuple[str, ...] = ("raw", "zlib", "zstd")
+index_name: str = "index.tsv"
+dictionary_name: str = "dictionary.bin"
+zlib_window: int = 1 << 15
+
+
+class ArchiveRecord(namedtuple("ArchiveRecord", ["url", "time", "segment", "offset", "length", "size", "codec"])):
+    """
+    This object contains the position of a response in the archive:
+    * url: the URL of the response
+    * time: the time the response was received (UNIX time)
+    * segment: the number of the segment file
+    * offset: the offset of the record in the segment file
+    * length: the length of the record in the segment file
+    * size: the size of the uncompressed response
+    * codec: the compression used for the record (raw, zlib, or zstd)
+    """
+
+
+def segment_name(segment: int) -> str:
+    return f"segment-{segment:05d}.bin"
+
+
+def train_dictionary(samples: list[bytes], size: int = 1 << 17) -> bytes:
+    """
+    Create a compression dictionary from sample responses.
+    If zstandard is installed, the dictionary is trained with it, otherwise it is built from the lines that appear in
+    at least half the samples and limited to the zlib window.
+
+    :param samples: The sample responses, such as pages of different types.
+    :param size: The maximum size of the dictionary (bytes).
+    :return: The dictionary.
+    """
+    if zstandard is not None:
+        return zstandard.train_dictionary(size, samples).as_bytes()
+    counts: Counter[bytes] = Counter(line for sample in samples for line in set(sample.splitlines(keepends=True)))
+    lines: dict[bytes, None] = {
+        line: None for sample in samples for line in sample.splitlines(keepends=True)
+        if line.strip() and counts[line] * 2 >= len(samples)
+    }
+    # zlib only uses the last 32 KiB of the dictionary
+    return b"".join(lines)[-min(size, zlib_window):]
+
+
+def compress(data: bytes, codec: str, dictionary: Optional[bytes] = None, level: int = 6) -> bytes:
+    """
+    Compress a response.
+
+    :param data: The response content.
+    :param codec: The compression to use (raw, zlib, or zstd).
+    :param dictionary: The compression dictionary.
+    :param level: The compression level.
+    :return: The compressed data.
+    """
+    if codec == "zstd":
+        assert zstandard is not None, _raise_exception(ImportError("zstandard is required for the zstd codec"))
+        return zstandard.ZstdCompressor(
+            level=level, dict_data=zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        ).compress(data)
+    elif codec == "zlib":
+        compressor = compressobj(level, zdict=dictionary) if dictionary else compressobj(level)
+        return compressor.compress(data) + compressor.flush()
+    assert codec == "raw", _raise_exception(ValueError(f"Unknown codec {codec!r}"))
+    return data
+
+
+def decompress(data: bytes, codec: str, dictionary: Optional[bytes] = None) -> bytes:
+    """
+    Decompress a record.
+
+    :param data: The compressed data.
+    :param codec: The compression used for the record (raw, zlib, or zstd).
+    :param dictionary: The compression dictionary used for the record.
+    :return: The response content.
+    """
+    if codec == "zstd":
+        assert zstandard is not None, _raise_exception(ImportError("zstandard is required for the zstd codec"))
+        return zstandard.ZstdDecompressor(
+            dict_data=zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        ).decompress(data)
+    elif codec == "zlib":
+        decompressor = decompressobj(zdict=dictionary) if dictionary else decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+    assert codec == "raw", _raise_exception(ValueError(f"Unknown codec {codec!r}"))
+    return data
+
+
+def read_index(folder: Path) -> Iterator[ArchiveRecord]:
+    if not (folder / index_name).is_file():
+        return
+    with (folder / index_name).open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # Incomplete line left by an interrupted write
+            time_, segment, offset, length, size, codec, url = line.rstrip("\n").split("\t", 6)
+            yield ArchiveRecord(url, float(time_), int(segment), int(offset), int(length), int(size), codec)
+
+
+def repair_index(index_file: Path):
+    # Remove the incomplete line left by an interrupted write, if any
+    if not index_file.is_file():
+        return
+    with index_file.open("r+b") as f:
+        end: int = f.seek(0, 2)
+        while end > 0:
+            start: int = max(0, end - 4096)
+            f.seek(start)
+            block: bytes = f.read(end - start)
+            if (newline := block.rfind(b"\n")) >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        f.truncate(end)
+
+
+class ArchiveWriter:
+    """
+    Append responses to a folder of segment files, with an index file that maps each URL and fetch time to the
+    position of its record.
+
+    Each response is compressed on its own, so that it can be read without the rest of the segment, and it is stored
+    uncompressed when compression does not make it smaller (e.g. images). A dictionary trained on pages (see
+    train_dictionary) is shared by all records and removes most of the boilerplate that Fur Affinity pages have in
+    common.
+    """
+
+    def __init__(
+        self, folder: Union[str, Path], *, dictionary: Optional[bytes] = None, codec: Optional[str] = None,
+        level: int = 6, segment_size: int = 1 << 28
+    ):
+        """
+        :param folder: The folder of the archive, created if it does not exist.
+        :param dictionary: The compression dictionary, saved in the folder the first time it is used.
+        :param codec: The compression to use (zstd if zstandard is installed, zlib otherwise).
+        :param level: The compression level.
+        :param segment_size: The size after which a new segment file is started (bytes).
+        """
+        self.folder: Path = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.codec: str = codec or ("zstd" if zstandard is not None else "zlib")
+        self.level: int = level
+        self.segment_size: int = segment_size
+
+        assert self.codec in codecs, _raise_exception(ValueError(f"Unknown codec {self.codec!r}"))
+        assert self.codec != "zstd" or zstandard is not None, \
+            _raise_exception(ImportError("zstandard is required for the zstd codec"))
+
+        records: list[ArchiveRecord] = list(read_index(self.folder))
+        repair_index(index_file := self.folder / index_name)
+        if (dictionary_file := self.folder / dictionary_name).is_file():
+            self.dictionary: Optional[bytes] = dictionary_file.read_bytes()
+            assert dictionary is None or dictionary == self.dictionary, \
+                _raise_exception(ValueError("The archive already uses a different dictionary"))
+        else:
+            assert dictionary is None or not records, \
+                _raise_exception(ValueError("A dictionary cannot be added to an archive that contains records"))
+            self.dictionary = dictionary
+            if dictionary:
+                dictionary_file.write_bytes(dictionary)
+
+        self.segment: int = max((r.segment for r in records), default=0)
+        self._lock: Lock = Lock()
+        self._index: TextIO = index_file.open("a", encoding="utf-8")
+        self._file: BinaryIO = (self.folder / segment_name(self.segment)).open("ab")
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({str(self.folder)!r}, codec={self.codec!r})"
+
+    def close(self):
+        """
+        Close the segment and index files.
+        """
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+    def add(self, url: str, content: bytes, fetch_time: Optional[float] = None) -> ArchiveRecord:
+        """
+        Add a response to the archive.
+
+        :param url: The URL of the response.
+        :param content: The content of the response.
+        :param fetch_time: The time the response was received (defaults to now).
+        :return: The ArchiveRecord of the response.
+        """
+        data: bytes = compress(content, self.codec, self.dictionary, self.level)
+        codec: str = self.codec
+        if len(data) >= len(content):
+            data, codec = content, "raw"
+
+        with self._lock:
+            if self._file.tell() and self._file.tell() + len(data) > self.segment_size:
+                self._file.close()
+                self.segment += 1
+                self._file = (self.folder / segment_name(self.segment)).open("ab")
+            record: ArchiveRecord = ArchiveRecord(
+                url.replace("\t", "%09").replace("\n", "%0A"), time() if fetch_time is None else fetch_time,
+                self.segment, self._file.tell(), len(data), len(content), codec
+            )
+            self._file.write(data)
+            self._file.flush()
+            # The index line is written after the data, so an interrupted write never indexes a partial record
+            self._index.write("\t".join(map(str, (*record[1:], record.url))) + "\n")
+            self._index.flush()
+        return record
+
+    def tee(self, url: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Pass the chunks of a streamed response through, and add the response to the archive once all the chunks have
+        been consumed.
+
+        :param url: The URL of the response.
+        :param chunks: The chunks of the response content.
+        :return: The same chunks.
+        """
+        content: list[bytes] = []
+        for chunk in chunks:
+            content.append(chunk)
+            yield chunk
+        self.add(url, b"".join(content))
+
+
+class ArchiveReader:
+    """
+    Read responses from an archive created by ArchiveWriter.
+    Segment files are memory-mapped, so reading a record only touches the pages of the file that contain it.
+    """
+
+    def __init__(self, folder: Union[str, Path]):
+        """
+        :param folder: The folder of the archive.
+        """
+        self.folder: Path = Path(folder)
+        self.dictionary: Optional[bytes] = (d.read_bytes() if (d := self.folder / dictionary_name).is_file() else None)
+        self.records: list[ArchiveRecord] = list(read_index(self.folder))
+        self.urls: dict[str, list[ArchiveRecord]] = {}
+        for record in self.records:
+            self.urls.setdefault(record.url, []).append(record)
+        self._segments: dict[int, Union[mmap, bytes]] = {}
+        self._lock: Lock = Lock()
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.urls
+
+    def __iter__(self) -> Iterator[tuple[ArchiveRecord, bytes]]:
+        for record in self.records:
+            yield record, self.read(record)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({str(self.folder)!r}, records={len(self.records)})"
+
+    def close(self):
+        """
+        Unmap the segment files.
+        """
+        with self._lock:
+            for segment in self._segments.values():
+                if isinstance(segment, mmap):
+                    segment.close()
+            self._segments.clear()
+
+    def _segment(self, segment: int) -> Union[mmap, bytes]:
+        with self._lock:
+            if (segment_map := self._segments.get(segment)) is None:
+                with (self.folder / segment_name(segment)).open("rb") as f:
+                    # Empty files cannot be mapped, they only hold empty records
+                    segment_map = self._segments[segment] = \
+                        mmap(f.fileno(), 0, access=ACCESS_READ) if f.seek(0, 2) else b""
+            return segment_map
+
+    def read(self, record: ArchiveRecord) -> bytes:
+        """
+        Read the content of a record.
+
+        :param record: The ArchiveRecord to read.
+        :return: The content of the response.
+        """
+        data: bytes = self._segment(record.segment)[record.offset:record.offset + record.length]
+        return decompress(data, record.codec, self.dictionary)
+
+    def get(self, url: str, before: Optional[float] = None) -> Optional[bytes]:
+        """
+        Read the latest response stored for a URL.
+
+        :param url: The URL of the response.
+        :param before: Only consider responses received at or before this time (UNIX time).
+        :return: The content of the response, or None if the URL is not in the archive.
+        """
+        records: list[ArchiveRecord] = [r for r in self.urls.get(url, []) if before is None or r.time <= before]
+        return self.read(max(records, key=lambda r: r.time)) if records else None
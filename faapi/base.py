@@ -1,41 +1,118 @@
+from contextlib import contextmanager
+from contextlib import nullcontext
+from datetime import date
+from functools import wraps
 from http.cookiejar import CookieJar
+from threading import Condition
+from time import perf_counter
 from time import sleep
 from time import time
 from typing import Any
+from typing import Callable
+from typing import cast
+from typing import ContextManager
+from typing import Iterable
+from typing import Iterator
+from typing import Literal
 from typing import Optional
+from typing import overload
 from typing import Type
+from typing import TYPE_CHECKING
+from typing import TypeVar
 from typing import Union
 from urllib.parse import quote
 from urllib.robotparser import RobotFileParser
+from weakref import ref
+from weakref import ReferenceType
 
 from requests import Session
-
+from requests.adapters import DEFAULT_POOLSIZE
+from requests.cookies import RequestsCookieJar
+from requests.exceptions import HTTPError
+from urllib3.util import Retry
+
+from .archive import ArchiveWriter
+from .cache import NegativeCache
+from .cache import ResponseCache
+from .coalesce import SingleFlight
 from .connection import CookieDict
+from .connection import FileDownload
+from .connection import FileMetadata
 from .connection import get
 from .connection import get_robots
+from .connection import head_file
 from .connection import join_url
+from .connection import make_cookie_jar
 from .connection import make_session
 from .connection import Response
 from .connection import stream_binary
+from .connection import stream_binary_conditional
+from .connection import stream_chunk_size
+from .connection import unchanged_file
 from .exceptions import DisallowedPath
 from .exceptions import Unauthorized
 from .journal import Journal
 from .journal import JournalPartial
+from .metrics import count_bytes
+from .metrics import current_metrics
+from .metrics import measure
+from .metrics import phase
+from .metrics import RequestMetrics
 from .parse import BeautifulSoup
 from .parse import check_page_raise
+from .parse import parse_inbox_journal
+from .parse import parse_inbox_journals
+from .parse import parse_inbox_submissions
+from .parse import parse_journal_section
 from .parse import parse_loggedin_user
 from .parse import parse_page
+from .parse import parse_search_submissions
+from .parse import parse_submission_figure
 from .parse import parse_submission_figures
 from .parse import parse_user_favorites
 from .parse import parse_user_journals
 from .parse import parse_user_submissions
 from .parse import parse_watchlist
+from .parse import Tag
 from .parse import username_url
+from .retry import RetryPolicy
+from .retry import transient_status_codes
+from .robots import RobotsPolicy
+from .scheduler import Scheduler
+from .search import browse_params
+from .search import DateRange
+from .search import OrderBy
+from .search import Rating
+from .search import ratings
+from .search import search_params
+from .search import SearchMode
+from .search import submission_types
+from .search import SubmissionType
 from .submission import Submission
 from .submission import SubmissionPartial
+from .throttle import AdaptiveDelay
+from .throttle import parse_retry_after
 from .user import User
 from .user import UserPartial
 
+if TYPE_CHECKING:
+    from .prefetch import Prefetcher
+
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _measured(endpoint: str) -> Callable[[F], F]:
+    def decorator(method: F) -> F:
+        @wraps(method)
+        def wrapper(self: "FAAPI", *args, **kwargs):
+            with measure(endpoint, self.observers):
+                return method(self, *args, **kwargs)
+
+        return cast(F, wrapper)
+
+    return decorator
+
 
 # noinspection GrazieInspection
 class FAAPI:
@@ -43,17 +120,63 @@ class FAAPI:
     This class provides the methods to access and parse Fur Affinity pages and retrieve objects.
     """
 
-    def __init__(self, cookies: Union[list[CookieDict], CookieJar], session_class: Type[Session] = Session):
+    def __init__(
+        self, cookies: Union[list[CookieDict], CookieJar], session_class: Type[Session] = Session, *,
+        pool_size: int = DEFAULT_POOLSIZE, max_retries: Union[Retry, int, None] = None,
+        cdn_pool_size: Optional[int] = None, cdn_max_retries: Union[Retry, int, None] = None,
+        retry_policy: Optional[RetryPolicy] = None, archive: Optional[ArchiveWriter] = None,
+        negative_cache: Optional[NegativeCache] = None, adaptive_delay: Optional[AdaptiveDelay] = None,
+        robots_refresh: Optional[float] = None, response_cache: Optional[ResponseCache] = None
+    ):
         """
         :param cookies: The cookies for the session.
         :param session_class: The class to use for the session (defaults to requests.Session).
-        """
-
-        self.session: Session = make_session(cookies, session_class)  # Session used for get requests
-        self.robots: RobotFileParser = get_robots(self.session)  # robots.txt handler
-        self.last_get: float = time() - self.crawl_delay  # Time of last get (UNIX time)
+        :param pool_size: The number of pooled connections to keep for Fur Affinity's pages host.
+        :param max_retries: The retry policy for the pages host (see connection.make_retry).
+        :param cdn_pool_size: The number of pooled connections to keep for each CDN host (defaults to pool_size).
+        :param cdn_max_retries: The retry policy for the CDN hosts (defaults to max_retries).
+        :param retry_policy: The policy used to retry pages and files after transient errors (defaults to no retries).
+        :param archive: The archive where the received pages and files are stored (defaults to no archive).
+        :param negative_cache: The cache of resources that were not found or disabled (defaults to no cache).
+        :param adaptive_delay: The controller that adapts the crawl delay to the server responses (defaults to the
+            robots.txt crawl delay only).
+        :param robots_refresh: The time between two downloads of the robots.txt in the background (seconds), the
+            robots.txt is only downloaded once if None.
+        :param response_cache: The cache of responses used by the prefetcher (defaults to no cache).
+        """
+
+        self.pool_size: int = pool_size  # Pooled connections for the pages host
+        self.max_retries: Union[Retry, int, None] = max_retries  # Retry policy for the pages host
+        self.cdn_pool_size: Optional[int] = cdn_pool_size  # Pooled connections for each CDN host
+        self.cdn_max_retries: Union[Retry, int, None] = cdn_max_retries  # Retry policy for the CDN hosts
+        self.session: Session = self.make_session(cookies, session_class)  # Session used for get requests
+        self._cookies_condition: Condition = Condition()
+        self._in_flight: int = 0  # Requests being sent with the current cookies
+        self._swapping_cookies: bool = False
+        self.robots_policy: RobotsPolicy = RobotsPolicy(self._get_robots(), self.user_agent)  # robots.txt rules
+        self.adaptive_delay: Optional[AdaptiveDelay] = adaptive_delay  # Adapts the crawl delay to the server
+        self.scheduler: Scheduler = Scheduler(time() - self.robots_delay)  # Hands out request slots by priority
         self.raise_for_unauthorized: bool = True  # Control login checks
         self.timeout: Optional[int] = None  # Timeout for requests
+        self.stream_pages: bool = False  # Parse pages while they are being received
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy(0)  # Retries for transient errors
+        self.observers: list[Callable[[RequestMetrics], None]] = []  # Callbacks that receive calls metrics
+        self.archive: Optional[ArchiveWriter] = archive  # Archive of the received pages and files
+        self.negative_cache: Optional[NegativeCache] = negative_cache  # Resources that were not found or disabled
+        self.single_flight: Optional[SingleFlight] = SingleFlight()  # Shares identical concurrent requests
+        self.response_cache: Optional[ResponseCache] = response_cache  # Responses fetched in advance
+        self.prefetcher: Optional["Prefetcher"] = None  # Fetches likely next pages during idle slots
+
+        if robots_refresh is not None:
+            # The thread only holds a weak reference, so that the object can be deleted while it is running
+            api_ref: ReferenceType[FAAPI] = ref(self)
+
+            def fetch_robots() -> RobotFileParser:
+                if (api := api_ref()) is None:
+                    raise ReferenceError("FAAPI object was deleted")
+                return api._get_robots()
+
+            self.robots_policy.start_refresh(fetch_robots, robots_refresh)
 
     @property
     def user_agent(self) -> str:
@@ -63,27 +186,146 @@ class FAAPI:
         return ua.decode() if isinstance(ua := self.session.headers["User-Agent"], bytes) else ua
 
     @property
-    def crawl_delay(self) -> float:
+    def robots(self) -> RobotFileParser:
+        """
+        robots.txt handler
+        """
+        return self.robots_policy.robots
+
+    @robots.setter
+    def robots(self, robots: RobotFileParser):
+        self.robots_policy.refresh(robots, self.user_agent)
+
+    @property
+    def last_get(self) -> float:
+        """
+        Time of last get (UNIX time)
+        """
+        return self.scheduler.last_get
+
+    @last_get.setter
+    def last_get(self, last_get: float):
+        self.scheduler.last_get = last_get
+
+    @property
+    def robots_delay(self) -> float:
         """
         Crawl delay from robots.txt
         """
-        return float(self.robots.crawl_delay(self.user_agent) or 1)
+        return self.robots_policy.crawl_delay
+
+    @property
+    def crawl_delay(self) -> float:
+        """
+        Crawl delay from robots.txt, increased by the adaptive delay if the server shows distress
+        """
+        if self.adaptive_delay is None:
+            return self.robots_delay
+        return self.adaptive_delay.delay(self.robots_delay, self.last_get)
+
+    def refresh_robots(self):
+        """
+        Download the robots.txt again and replace the current rules.
+        """
+        self.robots = self._get_robots()
+
+    def _get_robots(self) -> RobotFileParser:
+        with self._sending():
+            return get_robots(self.session)
+
+    def make_session(self, cookies: Union[list[CookieDict], CookieJar], session_class: Type[Session]) -> Session:
+        """
+        Create a new session using the connection pool and retry settings of the object.
+
+        :param cookies: The cookies for the session.
+        :param session_class: The class to use for the session.
+        :return: The new session.
+        """
+        return make_session(
+            cookies, session_class,
+            pool_size=self.pool_size, max_retries=self.max_retries,
+            cdn_pool_size=self.cdn_pool_size, cdn_max_retries=self.cdn_max_retries
+        )
 
     def load_cookies(self, cookies: Union[list[CookieDict], CookieJar]):
         """
-        Load new cookies and create a new session.
+        Load new cookies in the session, keeping its connection pools.
 
         :param cookies: The cookies for the session.
         """
-        self.session = make_session(cookies, self.session.__class__)
+        self.swap_cookies(cookies)
+
+    def swap_cookies(self, cookies: Union[list[CookieDict], CookieJar]) -> RequestsCookieJar:
+        """
+        Replace the cookie jar of the session with a new one, keeping the connection pools.
+        The swap waits for the requests that are being sent to finish, so that the cookies they receive are stored in
+        the previous jar, and the requests made in the meantime wait for the swap and use the new cookies.
+        The response cache is cleared, as its pages were fetched with the previous cookies.
+
+        :param cookies: The new cookies for the session.
+        :return: The previous cookie jar, which can be loaded again to rotate between accounts.
+        """
+        cookie_jar: RequestsCookieJar = make_cookie_jar(cookies)
+        with self._cookies_condition:
+            self._cookies_condition.wait_for(lambda: not self._swapping_cookies)
+            self._swapping_cookies = True
+            try:
+                self._cookies_condition.wait_for(lambda: not self._in_flight)
+                previous, self.session.cookies = self.session.cookies, cookie_jar
+                if self.response_cache is not None:
+                    self.response_cache.clear()
+            finally:
+                self._swapping_cookies = False
+                self._cookies_condition.notify_all()
+        return previous
+
+    @contextmanager
+    def _sending(self) -> Iterator[None]:
+        # The session stores the cookies of each response in its jar, so a swap must not happen while a request is sent
+        with self._cookies_condition:
+            self._cookies_condition.wait_for(lambda: not self._swapping_cookies)
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cookies_condition:
+                self._in_flight -= 1
+                self._cookies_condition.notify_all()
 
     def handle_delay(self):
         """
         Handles the crawl delay as set in the robots.txt
-        """
-        if (d := time() - self.last_get) < self.crawl_delay:
-            sleep(self.crawl_delay - d)
-        self.last_get = time()
+        Requests waiting at the same time are sent in order of priority (see scheduler.priority).
+        """
+        self.scheduler.acquire(self.crawl_delay)
+
+    def _with_retry(self, call: Callable[[], T]) -> T:
+        retry: int = 0
+        while True:
+            try:
+                result: T = call()
+            except Exception as err:
+                if self.adaptive_delay is not None and self.retry_policy.is_transient(err) \
+                        and not isinstance(err, HTTPError):
+                    # Error statuses are recorded by _get and the file downloads with their Retry-After header
+                    self.adaptive_delay.record_distress(self.robots_delay)
+                if not self.retry_policy.is_transient(err):
+                    self.retry_policy.stats.record_permanent()
+                    raise
+                elif retry >= self.retry_policy.max_retries:
+                    self.retry_policy.stats.record_exhausted()
+                    raise
+                wait: float = self.retry_policy.retry_after(err) or self.retry_policy.backoff(retry, self.crawl_delay)
+                self.retry_policy.stats.record_retry(err, wait)
+                retry += 1
+                sleep(wait)
+            else:
+                if retry:
+                    self.retry_policy.stats.record_recovered()
+                return result
+
+    def _check_negative_cache(self, resource: str, key: Union[int, str]) -> ContextManager[None]:
+        return nullcontext() if self.negative_cache is None else self.negative_cache.check(resource, key)
 
     def check_path(self, path: str, *, raise_for_disallowed: bool = False) -> bool:
         """
@@ -93,7 +335,7 @@ class FAAPI:
         :param raise_for_disallowed: Whether to raise an exception for a non-allowed path.
         :return: True if the path is allowed in the robots.txt, False otherwise.
         """
-        if not (allowed := self.robots.can_fetch(self.user_agent, "/" + path.lstrip("/"))) and raise_for_disallowed:
+        if not (allowed := self.robots_policy.can_fetch("/" + path.lstrip("/"))) and raise_for_disallowed:
             raise DisallowedPath(f"Path {path!r} is not allowed by robots.txt")
         return allowed
 
@@ -118,26 +360,80 @@ class FAAPI:
         """
         return parse_loggedin_user(self.get_parsed("/", skip_auth_check=True)) is not None
 
+    @_measured("get")
     def get(self, path: str, **params: Union[str, bytes, int, float]) -> Response:
         """
         Fetch a path with a GET request.
         The path is checked against the robots.txt before the request is made.
         The crawl-delay setting is enforced wth a wait time.
+        Identical requests made while the first one is running share its response.
 
         :param path: The path to fetch.
         :param params: Query parameters for the request.
         :return: A Response object from the request.
         """
-        self.check_path(path, raise_for_disallowed=True)
-        self.handle_delay()
-        return get(self.session, path, timeout=self.timeout, params=params)
+        return self._coalesce(("get", path, *sorted(params.items())), lambda: self._get(path, params))
 
+    def _coalesce(self, key: tuple, call: Callable[[], T]) -> T:
+        return call() if self.single_flight is None else self.single_flight.do(key, call)
+
+    def _get(self, path: str, params: dict[str, Union[str, bytes, int, float]], *, stream: bool = False) -> Response:
+        if self.response_cache is not None \
+                and (cached := self.response_cache.pop(ResponseCache.key(path, params))) is not None:
+            # The entry is removed so that a retry after a failed page check reaches the server
+            if metrics := current_metrics():
+                metrics.path = metrics.path or path
+                metrics.status = cached.status_code
+            return cached
+        self.check_path(path, raise_for_disallowed=True)
+        with phase("delay"):
+            self.handle_delay()
+        with phase("network"):
+            time_start: float = perf_counter()
+            with self._sending():
+                response: Response = get(self.session, path, timeout=self.timeout, params=params, stream=stream)
+        self._adapt_delay(response, perf_counter() - time_start)
+        if metrics := current_metrics():
+            metrics.path = metrics.path or path
+            metrics.requests += 1
+            metrics.bytes += 0 if stream else len(response.content)
+            metrics.status = response.status_code
+        if self.archive is not None and not stream and response.ok:
+            self.archive.add(response.url, response.content)
+        return response
+
+    def _adapt_delay(self, response: Response, latency: Optional[float]):
+        if self.adaptive_delay is None:
+            return
+        elif response.status_code in transient_status_codes:
+            retry_after: Optional[float] = parse_retry_after(response.headers.get("Retry-After"))
+            self.adaptive_delay.record_distress(self.robots_delay, retry_after)
+        elif response.ok:
+            self.adaptive_delay.record_success(latency, self.robots_delay)
+
+    @contextmanager
+    def _adapting_delay(self) -> Iterator[None]:
+        # File downloads raise their error statuses instead of returning the response, and their duration depends on
+        # the size of the file, so successes are recorded without a response time
+        try:
+            yield
+        except HTTPError as err:
+            if err.response is not None:
+                self._adapt_delay(err.response, None)
+            raise
+        if self.adaptive_delay is not None:
+            self.adaptive_delay.record_success(None, self.robots_delay)
+
+    @_measured("get_parsed")
     def get_parsed(
         self, path: str, *, skip_page_check: bool = False, skip_auth_check: bool = False,
         **params: Union[str, bytes, int, float]
     ) -> BeautifulSoup:
         """
         Fetch a path with a GET request and parse it using BeautifulSoup.
+        Transient errors are retried according to the retry policy.
+        If stream_pages is set, the page is parsed while it is being received.
+        Identical requests made while the first one is running share its parsed page.
 
         :param path: The path to fetch.
         :param skip_page_check: Whether to skip checking the parsed page for errors.
@@ -145,15 +441,32 @@ class FAAPI:
         :param params: Query parameters for the request.
         :return: A BeautifulSoup object containing the parsed content of the request response.
         """
-        response: Response = self.get(path, **params)
-        response.raise_for_status()
-        page: BeautifulSoup = parse_page(response.text)
-        if not skip_page_check:
-            check_page_raise(page)
-        if not skip_auth_check and self.raise_for_unauthorized and not parse_loggedin_user(page):
-            raise Unauthorized("Not logged in")
+        def get_page() -> BeautifulSoup:
+            with self._get(path, params, stream=self.stream_pages) as response:
+                response.raise_for_status()
+                content: Union[bytes, Iterable[bytes]]
+                if not self.stream_pages:
+                    content = response.content
+                elif self.archive is not None:
+                    content = self.archive.tee(response.url, count_bytes(response.iter_content(stream_chunk_size)))
+                else:
+                    content = count_bytes(response.iter_content(stream_chunk_size))
+                with phase("tree"):
+                    page_: BeautifulSoup = parse_page(content)
+            if not skip_page_check:
+                with phase("check"):
+                    check_page_raise(page_)
+            return page_
+
+        page: BeautifulSoup = self._coalesce(
+            ("get_parsed", path, skip_page_check, *sorted(params.items())), lambda: self._with_retry(get_page)
+        )
+        with phase("check"):
+            if not skip_auth_check and self.raise_for_unauthorized and not parse_loggedin_user(page):
+                raise Unauthorized("Not logged in")
         return page
 
+    @_measured("me")
     def me(self) -> Optional[User]:
         """
         Fetch the information of the logged-in user.
@@ -162,6 +475,7 @@ class FAAPI:
         """
         return self.user(user) if (user := parse_loggedin_user(self.get_parsed("/"))) else None
 
+    @_measured("frontpage")
     def frontpage(self) -> list[SubmissionPartial]:
         """
         Fetch latest submissions from Fur Affinity's front page
@@ -169,11 +483,14 @@ class FAAPI:
         :return: A list of SubmissionPartial objects
         """
         page_parsed: BeautifulSoup = self.get_parsed("/")
-        submissions: list[SubmissionPartial] = [SubmissionPartial(f) for f in parse_submission_figures(page_parsed)]
+        with phase("extract"):
+            submissions: list[SubmissionPartial] = [SubmissionPartial(f) for f in parse_submission_figures(page_parsed)]
         return sorted({s for s in submissions}, reverse=True)
 
+    @_measured("submission")
     def submission(
-        self, submission_id: int, get_file: bool = False, *, chunk_size: Optional[int] = None
+        self, submission_id: int, get_file: bool = False, *, chunk_size: Optional[int] = None,
+        parse_comments: bool = True
     ) -> tuple[Submission, Optional[bytes]]:
         """
         Fetch a submission and, optionally, its file.
@@ -181,32 +498,113 @@ class FAAPI:
         :param submission_id: The ID of the submission.
         :param get_file: Whether to download the submission file.
         :param chunk_size: The chunk_size to be used for the download (does not override get_file).
+        :param parse_comments: Whether to parse the comments immediately, or on first access to Submission.comments.
         :return: A Submission object and a bytes object (if the submission file is downloaded).
         """
-        sub: Submission = Submission(self.get_parsed(join_url("view", int(submission_id))))
+        with self._check_negative_cache("submission", int(submission_id)):
+            page_parsed: BeautifulSoup = self.get_parsed(join_url("view", int(submission_id)))
+        sub: Submission = Submission(page_parsed, parse_comments=parse_comments)
+        if self.prefetcher is not None:
+            self.prefetcher.suggest_submission(sub.prev, sub.next)
         sub_file: Optional[bytes] = self.submission_file(sub, chunk_size=chunk_size) if get_file and sub.id else None
         return sub, sub_file
 
+    @_measured("submission_file")
     def submission_file(self, submission: Submission, *, chunk_size: Optional[int] = None) -> bytes:
         """
         Fetch a submission file from a Submission object.
+        Transient errors are retried according to the retry policy.
 
         :param submission: A Submission object.
         :param chunk_size: The chunk_size to be used for the download.
         :return: The submission file as a bytes object.
         """
-        self.handle_delay()
-        return stream_binary(self.session, submission.file_url, chunk_size=chunk_size, timeout=self.timeout)
+        def get_file() -> bytes:
+            with phase("delay"):
+                self.handle_delay()
+            with phase("network"), self._sending(), self._adapting_delay():
+                file: bytes = stream_binary(self.session, submission.file_url, chunk_size=chunk_size,
+                                            timeout=self.timeout)
+            if metrics := current_metrics():
+                metrics.path = metrics.path or submission.file_url
+                metrics.requests += 1
+                metrics.bytes += len(file)
+            if self.archive is not None:
+                self.archive.add(submission.file_url, file)
+            return file
+
+        return self._with_retry(get_file)
+
+    @_measured("submission_file")
+    def submission_file_conditional(
+        self, submission: Submission, stored: Optional[FileMetadata] = None, *, chunk_size: Optional[int] = None,
+        head: bool = False
+    ) -> FileDownload:
+        """
+        Fetch a submission file only if it changed since it was last downloaded.
+        The download is skipped without any request if the upload timestamp in the file URL did not change, otherwise
+        the stored ETag and Last-Modified values are sent with the request, and the server answers 304 if the file did
+        not change. With head, the metadata are compared using a HEAD request before the download instead, for servers
+        that ignore conditional requests; this uses two request slots when the file changed.
+        Transient errors are retried according to the retry policy.
 
-    def journal(self, journal_id: int) -> Journal:
+        :param submission: A Submission object.
+        :param stored: The metadata returned by the previous download of the file, if any.
+        :param chunk_size: The chunk_size to be used for the download.
+        :param head: Whether to compare the size, ETag, and Last-Modified from a HEAD request before downloading.
+        :return: A FileDownload object with the file (None if the download was skipped), the metadata to store for the
+            next download, and the reason the download was skipped.
+        """
+        url: str = submission.file_url
+        if stored is not None and unchanged_file(stored, FileMetadata(url)) == "timestamp":
+            return FileDownload(None, stored._replace(url=url), "timestamp")
+
+        def head_metadata() -> FileMetadata:
+            with phase("delay"):
+                self.handle_delay()
+            with phase("network"), self._sending(), self._adapting_delay():
+                metadata: FileMetadata = head_file(self.session, url, timeout=self.timeout)
+            if metrics := current_metrics():
+                metrics.path = metrics.path or url
+                metrics.requests += 1
+            return metadata
+
+        def get_file() -> FileDownload:
+            with phase("delay"):
+                self.handle_delay()
+            with phase("network"), self._sending(), self._adapting_delay():
+                download: FileDownload = stream_binary_conditional(
+                    self.session, url, stored or FileMetadata(url), chunk_size=chunk_size, timeout=self.timeout
+                )
+            if metrics := current_metrics():
+                metrics.path = metrics.path or url
+                metrics.requests += 1
+                metrics.bytes += len(download.file or b"")
+            if self.archive is not None and download.file is not None:
+                self.archive.add(url, download.file)
+            return download
+
+        if stored is not None and head:
+            current: FileMetadata = self._with_retry(head_metadata)
+            if skipped := unchanged_file(stored, current):
+                return FileDownload(None, current._replace(size=current.size or stored.size), skipped)
+
+        return self._with_retry(get_file)
+
+    @_measured("journal")
+    def journal(self, journal_id: int, *, parse_comments: bool = True) -> Journal:
         """
         Fetch a journal.
 
         :param journal_id: The ID of the journal.
+        :param parse_comments: Whether to parse the comments immediately, or on first access to Journal.comments.
         :return: A Journal object.
         """
-        return Journal(self.get_parsed(join_url("journal", int(journal_id))))
+        with self._check_negative_cache("journal", int(journal_id)):
+            page_parsed: BeautifulSoup = self.get_parsed(join_url("journal", int(journal_id)))
+        return Journal(page_parsed, parse_comments=parse_comments)
 
+    @_measured("user")
     def user(self, user: str) -> User:
         """
         Fetch a user.
@@ -214,83 +612,360 @@ class FAAPI:
         :param user: The name of the user (_ characters are allowed).
         :return: A User object.
         """
-        return User(self.get_parsed(join_url("user", quote(username_url(user)))))
+        with self._check_negative_cache("user", username_url(user)):
+            page_parsed: BeautifulSoup = self.get_parsed(join_url("user", quote(username_url(user))))
+        return User(page_parsed)
 
     # noinspection DuplicatedCode
-    def gallery(self, user: str, page: int = 1) -> tuple[list[SubmissionPartial], Optional[int]]:
+    @overload
+    def gallery(
+        self, user: str, page: int = 1, *, raw: Literal[False] = False
+    ) -> tuple[list[SubmissionPartial], Optional[int]]:
+        ...
+
+    @overload
+    def gallery(self, user: str, page: int = 1, *, raw: Literal[True]) -> tuple[list[dict[str, Any]], Optional[int]]:
+        ...
+
+    @_measured("gallery")
+    def gallery(
+        self, user: str, page: int = 1, *, raw: bool = False
+    ) -> tuple[Union[list[SubmissionPartial], list[dict[str, Any]]], Optional[int]]:
         """
         Fetch a user's gallery page.
 
         :param user: The name of the user (_ characters are allowed).
         :param page: The page to fetch.
-        :return: A list of SubmissionPartial objects and the next page (None if it is the last).
-        """
-        page_parsed: BeautifulSoup = self.get_parsed(join_url("gallery", quote(username_url(user)), int(page)))
-        info_parsed: dict[str, Any] = parse_user_submissions(page_parsed)
-        author: UserPartial = UserPartial()
-        author.name, author.status, author.title, author.join_date, author.avatar_url = [
-            info_parsed["name"], info_parsed["status"],
-            info_parsed["title"], info_parsed["join_date"],
-            info_parsed["avatar_url"]
-        ]
-        for s in (submissions := list(map(SubmissionPartial, info_parsed["figures"]))):
-            s.author = author
+        :param raw: Whether to return the parsed records as dictionaries instead of SubmissionPartial objects.
+        :return: A list of SubmissionPartial objects (or dictionaries) and the next page (None if it is the last).
+        """
+        with self._check_negative_cache("user", username_url(user)):
+            page_parsed: BeautifulSoup = self.get_parsed(join_url("gallery", quote(username_url(user)), int(page)))
+        with phase("extract"):
+            info_parsed: dict[str, Any] = parse_user_submissions(page_parsed)
+            self._suggest_listing(
+                None if info_parsed["last_page"] else join_url("gallery", quote(username_url(user)), int(page) + 1),
+                info_parsed["figures"]
+            )
+            if raw:
+                return (
+                    [parse_submission_figure(f) | {"author": info_parsed["name"]} for f in info_parsed["figures"]],
+                    (page + 1) if not info_parsed["last_page"] else None
+                )
+            author: UserPartial = UserPartial()
+            author.name, author.status, author.title, author.join_date, author.avatar_url = [
+                info_parsed["name"], info_parsed["status"],
+                info_parsed["title"], info_parsed["join_date"],
+                info_parsed["avatar_url"]
+            ]
+            for s in (submissions := list(map(SubmissionPartial, info_parsed["figures"]))):
+                s.author = author
         return submissions, (page + 1) if not info_parsed["last_page"] else None
 
     # noinspection DuplicatedCode
-    def scraps(self, user: str, page: int = 1) -> tuple[list[SubmissionPartial], Optional[int]]:
+    @overload
+    def scraps(
+        self, user: str, page: int = 1, *, raw: Literal[False] = False
+    ) -> tuple[list[SubmissionPartial], Optional[int]]:
+        ...
+
+    @overload
+    def scraps(self, user: str, page: int = 1, *, raw: Literal[True]) -> tuple[list[dict[str, Any]], Optional[int]]:
+        ...
+
+    @_measured("scraps")
+    def scraps(
+        self, user: str, page: int = 1, *, raw: bool = False
+    ) -> tuple[Union[list[SubmissionPartial], list[dict[str, Any]]], Optional[int]]:
         """
         Fetch a user's scraps page.
 
         :param user: The name of the user (_ characters are allowed).
         :param page: The page to fetch.
-        :return: A list of SubmissionPartial objects and the next page (None if it is the last).
-        """
-        page_parsed: BeautifulSoup = self.get_parsed(join_url("scraps", quote(username_url(user)), int(page)))
-        info_parsed: dict[str, Any] = parse_user_submissions(page_parsed)
-        author: UserPartial = UserPartial()
-        author.name, author.status, author.title, author.join_date, author.avatar_url = [
-            info_parsed["name"], info_parsed["status"],
-            info_parsed["title"], info_parsed["join_date"],
-            info_parsed["avatar_url"]
-        ]
-        for s in (submissions := list(map(SubmissionPartial, info_parsed["figures"]))):
-            s.author = author
+        :param raw: Whether to return the parsed records as dictionaries instead of SubmissionPartial objects.
+        :return: A list of SubmissionPartial objects (or dictionaries) and the next page (None if it is the last).
+        """
+        with self._check_negative_cache("user", username_url(user)):
+            page_parsed: BeautifulSoup = self.get_parsed(join_url("scraps", quote(username_url(user)), int(page)))
+        with phase("extract"):
+            info_parsed: dict[str, Any] = parse_user_submissions(page_parsed)
+            self._suggest_listing(
+                None if info_parsed["last_page"] else join_url("scraps", quote(username_url(user)), int(page) + 1),
+                info_parsed["figures"]
+            )
+            if raw:
+                return (
+                    [parse_submission_figure(f) | {"author": info_parsed["name"]} for f in info_parsed["figures"]],
+                    (page + 1) if not info_parsed["last_page"] else None
+                )
+            author: UserPartial = UserPartial()
+            author.name, author.status, author.title, author.join_date, author.avatar_url = [
+                info_parsed["name"], info_parsed["status"],
+                info_parsed["title"], info_parsed["join_date"],
+                info_parsed["avatar_url"]
+            ]
+            for s in (submissions := list(map(SubmissionPartial, info_parsed["figures"]))):
+                s.author = author
         return submissions, (page + 1) if not info_parsed["last_page"] else None
 
-    def favorites(self, user: str, page: str = "") -> tuple[list[SubmissionPartial], Optional[str]]:
+    @overload
+    def favorites(
+        self, user: str, page: str = "", *, raw: Literal[False] = False
+    ) -> tuple[list[SubmissionPartial], Optional[str]]:
+        ...
+
+    @overload
+    def favorites(self, user: str, page: str = "", *, raw: Literal[True]) -> tuple[list[dict[str, Any]], Optional[str]]:
+        ...
+
+    @_measured("favorites")
+    def favorites(
+        self, user: str, page: str = "", *, raw: bool = False
+    ) -> tuple[Union[list[SubmissionPartial], list[dict[str, Any]]], Optional[str]]:
         """
         Fetch a user's favorites page.
 
         :param user: The name of the user (_ characters are allowed).
         :param page: The page to fetch.
-        :return: A list of SubmissionPartial objects and the next page (None if it is the last).
-        """
-        page_parsed: BeautifulSoup = self.get_parsed(join_url("favorites", quote(username_url(user)), page.strip()))
-        info_parsed: dict[str, Any] = parse_user_favorites(page_parsed)
-        submissions: list[SubmissionPartial] = list(map(SubmissionPartial, info_parsed["figures"]))
+        :param raw: Whether to return the parsed records as dictionaries instead of SubmissionPartial objects.
+        :return: A list of SubmissionPartial objects (or dictionaries) and the next page (None if it is the last).
+        """
+        with self._check_negative_cache("user", username_url(user)):
+            page_parsed: BeautifulSoup = self.get_parsed(join_url("favorites", quote(username_url(user)), page.strip()))
+        with phase("extract"):
+            info_parsed: dict[str, Any] = parse_user_favorites(page_parsed)
+            self._suggest_listing(
+                join_url("favorites", quote(username_url(user)), info_parsed["next_page"])
+                if info_parsed["next_page"] else None,
+                info_parsed["figures"]
+            )
+            if raw:
+                return [parse_submission_figure(f) for f in info_parsed["figures"]], info_parsed["next_page"] or None
+            submissions: list[SubmissionPartial] = list(map(SubmissionPartial, info_parsed["figures"]))
         return submissions, info_parsed["next_page"] or None
 
-    def journals(self, user: str, page: int = 1) -> tuple[list[JournalPartial], Optional[int]]:
+    @overload
+    def journals(
+        self, user: str, page: int = 1, *, raw: Literal[False] = False
+    ) -> tuple[list[JournalPartial], Optional[int]]:
+        ...
+
+    @overload
+    def journals(self, user: str, page: int = 1, *, raw: Literal[True]) -> tuple[list[dict[str, Any]], Optional[int]]:
+        ...
+
+    @_measured("journals")
+    def journals(
+        self, user: str, page: int = 1, *, raw: bool = False
+    ) -> tuple[Union[list[JournalPartial], list[dict[str, Any]]], Optional[int]]:
         """
         Fetch a user's journals page.
 
         :param user: The name of the user (_ characters are allowed).
         :param page: The page to fetch.
-        :return: A list of Journal objects and the next page (None if it is the last).
-        """
-        page_parsed: BeautifulSoup = self.get_parsed(join_url("journals", quote(username_url(user)), int(page)))
-        info_parsed: dict[str, Any] = parse_user_journals(page_parsed)
-        author: UserPartial = UserPartial()
-        author.name, author.status, author.title, author.join_date, author.avatar_url = [
-            info_parsed["name"], info_parsed["status"],
-            info_parsed["title"], info_parsed["join_date"],
-            info_parsed["avatar_url"]
-        ]
-        for j in (journals := list(map(JournalPartial, info_parsed["sections"]))):
-            j.author = author
+        :param raw: Whether to return the parsed records as dictionaries instead of JournalPartial objects.
+        :return: A list of Journal objects (or dictionaries) and the next page (None if it is the last).
+        """
+        with self._check_negative_cache("user", username_url(user)):
+            page_parsed: BeautifulSoup = self.get_parsed(join_url("journals", quote(username_url(user)), int(page)))
+        with phase("extract"):
+            info_parsed: dict[str, Any] = parse_user_journals(page_parsed)
+            self._suggest_listing(
+                None if info_parsed["last_page"] else join_url("journals", quote(username_url(user)), int(page) + 1)
+            )
+            if raw:
+                return (
+                    [parse_journal_section(j) | {"author": info_parsed["name"]} for j in info_parsed["sections"]],
+                    (page + 1) if not info_parsed["last_page"] else None
+                )
+            author: UserPartial = UserPartial()
+            author.name, author.status, author.title, author.join_date, author.avatar_url = [
+                info_parsed["name"], info_parsed["status"],
+                info_parsed["title"], info_parsed["join_date"],
+                info_parsed["avatar_url"]
+            ]
+            for j in (journals := list(map(JournalPartial, info_parsed["sections"]))):
+                j.author = author
         return journals, (page + 1) if not info_parsed["last_page"] else None
 
+    @overload
+    def inbox_submissions(
+        self, page: str = "", *, raw: Literal[False] = False
+    ) -> tuple[list[SubmissionPartial], Optional[str]]:
+        ...
+
+    @overload
+    def inbox_submissions(self, page: str = "", *, raw: Literal[True]) -> tuple[list[dict[str, Any]], Optional[str]]:
+        ...
+
+    @_measured("inbox_submissions")
+    def inbox_submissions(
+        self, page: str = "", *, raw: bool = False
+    ) -> tuple[Union[list[SubmissionPartial], list[dict[str, Any]]], Optional[str]]:
+        """
+        Fetch a page of the submission notifications, the new submissions from the users watched by the logged-in user,
+        newest first.
+
+        :param page: The cursor of the page to fetch (e.g. new~50000000@72), the first page if empty.
+        :param raw: Whether to return the parsed records as dictionaries instead of SubmissionPartial objects.
+        :return: A list of SubmissionPartial objects (or dictionaries) and the cursor of the next page (None if it is
+            the last).
+        """
+        page_parsed: BeautifulSoup = self.get_parsed(join_url("msg", "submissions", page.strip()))
+        with phase("extract"):
+            info_parsed: dict[str, Any] = parse_inbox_submissions(page_parsed)
+            self._suggest_listing(
+                join_url("msg", "submissions", info_parsed["next_page"]) if info_parsed["next_page"] else None,
+                info_parsed["figures"]
+            )
+            if raw:
+                return [parse_submission_figure(f) for f in info_parsed["figures"]], info_parsed["next_page"] or None
+            submissions: list[SubmissionPartial] = list(map(SubmissionPartial, info_parsed["figures"]))
+        return submissions, info_parsed["next_page"] or None
+
+    @overload
+    def search(
+        self, query: str, page: int = 1, *,
+        rating: Iterable[Rating] = ratings, type_: Iterable[SubmissionType] = submission_types,
+        date_range: DateRange = "all", date_from: Optional[date] = None, date_to: Optional[date] = None,
+        order_by: OrderBy = "relevancy", ascending: bool = False, mode: SearchMode = "extended",
+        raw: Literal[False] = False
+    ) -> tuple[list[SubmissionPartial], Optional[int]]:
+        ...
+
+    @overload
+    def search(
+        self, query: str, page: int = 1, *,
+        rating: Iterable[Rating] = ratings, type_: Iterable[SubmissionType] = submission_types,
+        date_range: DateRange = "all", date_from: Optional[date] = None, date_to: Optional[date] = None,
+        order_by: OrderBy = "relevancy", ascending: bool = False, mode: SearchMode = "extended",
+        raw: Literal[True]
+    ) -> tuple[list[dict[str, Any]], Optional[int]]:
+        ...
+
+    @_measured("search")
+    def search(
+        self, query: str, page: int = 1, *,
+        rating: Iterable[Rating] = ratings, type_: Iterable[SubmissionType] = submission_types,
+        date_range: DateRange = "all", date_from: Optional[date] = None, date_to: Optional[date] = None,
+        order_by: OrderBy = "relevancy", ascending: bool = False, mode: SearchMode = "extended",
+        raw: bool = False
+    ) -> tuple[Union[list[SubmissionPartial], list[dict[str, Any]]], Optional[int]]:
+        """
+        Fetch a page of search results.
+
+        :param query: The search query.
+        :param page: The page to fetch.
+        :param rating: The ratings of the submissions (general, mature, adult).
+        :param type_: The types of the submissions (art, music, flash, story, photo, poetry).
+        :param date_range: The upload date range (e.g. 7days, 1year, all), ignored if date_from or date_to are set.
+        :param date_from: The first upload date.
+        :param date_to: The last upload date.
+        :param order_by: The order of the results (relevancy, date, popularity).
+        :param ascending: Whether to sort the results in ascending order.
+        :param mode: How the query words are matched (all, any, or extended syntax).
+        :param raw: Whether to return the parsed records as dictionaries instead of SubmissionPartial objects.
+        :return: A list of SubmissionPartial objects (or dictionaries) and the next page (None if it is the last).
+        """
+        params: dict[str, Union[str, int]] = search_params(
+            query, page, rating=rating, type_=type_, date_range=date_range, date_from=date_from, date_to=date_to,
+            order_by=order_by, ascending=ascending, mode=mode
+        )
+        return self._listing("search", params, raw=raw)
+
+    @overload
+    def browse(
+        self, page: int = 1, *,
+        rating: Iterable[Rating] = ratings, category: int = 1, art_type: int = 1, species: int = 1, gender: int = 0,
+        per_page: Literal[24, 48, 72] = 72, raw: Literal[False] = False
+    ) -> tuple[list[SubmissionPartial], Optional[int]]:
+        ...
+
+    @overload
+    def browse(
+        self, page: int = 1, *,
+        rating: Iterable[Rating] = ratings, category: int = 1, art_type: int = 1, species: int = 1, gender: int = 0,
+        per_page: Literal[24, 48, 72] = 72, raw: Literal[True]
+    ) -> tuple[list[dict[str, Any]], Optional[int]]:
+        ...
+
+    @_measured("browse")
+    def browse(
+        self, page: int = 1, *,
+        rating: Iterable[Rating] = ratings, category: int = 1, art_type: int = 1, species: int = 1, gender: int = 0,
+        per_page: Literal[24, 48, 72] = 72, raw: bool = False
+    ) -> tuple[Union[list[SubmissionPartial], list[dict[str, Any]]], Optional[int]]:
+        """
+        Fetch a page of the latest submissions.
+        Category, art type, species, and gender are the IDs used by Fur Affinity's browse form.
+
+        :param page: The page to fetch.
+        :param rating: The ratings of the submissions (general, mature, adult).
+        :param category: The ID of the category (1 for all).
+        :param art_type: The ID of the art type (1 for all).
+        :param species: The ID of the species (1 for all).
+        :param gender: The ID of the gender (0 for all).
+        :param per_page: The number of submissions on each page (24, 48, or 72).
+        :param raw: Whether to return the parsed records as dictionaries instead of SubmissionPartial objects.
+        :return: A list of SubmissionPartial objects (or dictionaries) and the next page (None if it is the last).
+        """
+        params: dict[str, Union[str, int]] = browse_params(
+            page, rating=rating, category=category, art_type=art_type, species=species, gender=gender,
+            per_page=per_page
+        )
+        return self._listing("browse", params, raw=raw)
+
+    def _listing(
+        self, path: str, params: dict[str, Any], *, raw: bool = False
+    ) -> tuple[Union[list[SubmissionPartial], list[dict[str, Any]]], Optional[int]]:
+        page_parsed: BeautifulSoup = self.get_parsed(path, **params)
+        page: int = int(params["page"])
+        with phase("extract"):
+            info_parsed: dict[str, Any] = parse_search_submissions(page_parsed)
+            next_page: Optional[int] = (page + 1) if not info_parsed["last_page"] else None
+            self._suggest_listing(path if next_page else None, info_parsed["figures"], **(params | {"page": next_page}))
+            if raw:
+                return [parse_submission_figure(f) for f in info_parsed["figures"]], next_page
+            submissions: list[SubmissionPartial] = list(map(SubmissionPartial, info_parsed["figures"]))
+        return submissions, next_page
+
+    def _suggest_listing(
+        self, next_path: Optional[str], figures: Iterable[Tag] = (), **params: Union[str, bytes, int, float]
+    ):
+        if self.prefetcher is not None:
+            self.prefetcher.suggest_listing(next_path, figures, **params)
+
+    @overload
+    def inbox_journals(self, *, raw: Literal[False] = False) -> list[JournalPartial]:
+        ...
+
+    @overload
+    def inbox_journals(self, *, raw: Literal[True]) -> list[dict[str, Any]]:
+        ...
+
+    @_measured("inbox_journals")
+    def inbox_journals(self, *, raw: bool = False) -> Union[list[JournalPartial], list[dict[str, Any]]]:
+        """
+        Fetch the journal notifications, the new journals from the users watched by the logged-in user.
+        Journals only contain the ID, title, date, and author.
+
+        :param raw: Whether to return the parsed records as dictionaries instead of JournalPartial objects.
+        :return: A list of JournalPartial objects (or dictionaries).
+        """
+        page_parsed: BeautifulSoup = self.get_parsed(join_url("msg", "others"))
+        with phase("extract"):
+            journals_parsed: list[dict[str, Any]] = list(map(parse_inbox_journal, parse_inbox_journals(page_parsed)))
+            if raw:
+                return journals_parsed
+            journals: list[JournalPartial] = []
+            for parsed in journals_parsed:
+                journal: JournalPartial = JournalPartial()
+                journal.id, journal.title, journal.date = parsed["id"], parsed["title"], parsed["date"]
+                journal.author.name, journal.author.display_name = parsed["author"], parsed["author_display_name"]
+                journals.append(journal)
+        return journals
+
+    @_measured("watchlist_to")
     def watchlist_to(self, user: str, page: int = 1) -> tuple[list[UserPartial], Optional[int]]:
         """
         Fetch a page from the list of users watching the user.
@@ -310,6 +985,7 @@ class FAAPI:
             users.append(_user)
         return users, np if np and np != page else None
 
+    @_measured("watchlist_by")
     def watchlist_by(self, user: str, page: int = 1) -> tuple[list[UserPartial], Optional[int]]:
         """
         Fetch a page from the list of users watched by the user.
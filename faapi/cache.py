@@ -0,0 +1,253 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from sqlite3 import connect
+from sqlite3 import Connection
+from threading import Lock
+from time import time
+from typing import Hashable
+from typing import Iterator
+from typing import Optional
+from typing import Type
+from typing import Union
+
+from requests import Response
+
+from .exceptions import _raise_exception
+from .exceptions import DisabledAccount
+from .exceptions import NotFound
+from .exceptions import ParsingError
+
+default_ttl: dict[Type[ParsingError], float] = {
+    NotFound: 60 * 60 * 24 * 30,
+    DisabledAccount: 60 * 60 * 24,
+}
+
+
+class NegativeCache:
+    """
+    Remember the submissions, journals, and users that raised NotFound or DisabledAccount, so that they can be
+    skipped without making a request until their entry expires.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", ttl: Optional[dict[Type[ParsingError], float]] = None):
+        """
+        :param path: The path to the database file used to keep the cache between sessions, ":memory:" to keep it in
+            memory only.
+        :param ttl: The time to live of the entries for each exception (seconds), added to the default ones
+            (30 days for NotFound and 1 day for DisabledAccount).
+        """
+        self.path: Union[str, Path] = path
+        self.ttl: dict[Type[ParsingError], float] = default_ttl | (ttl or {})
+        self.hits: int = 0  # Calls answered by the cache
+        self.connection: Connection = connect(path, check_same_thread=False)
+        self._lock: Lock = Lock()
+
+        with self._lock, self.connection:
+            self.connection.execute("pragma journal_mode = wal")
+            self.connection.execute(
+                """create table if not exists negative_cache (
+                    resource text not null,
+                    key text not null,
+                    error text not null,
+                    expires real not null,
+                    primary key (resource, key)
+                ) without rowid"""
+            )
+
+    def __enter__(self) -> "NegativeCache":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute(
+                "select count(*) from negative_cache where expires > ?", [time()]
+            ).fetchone()[0]
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({str(self.path)!r}, hits={self.hits})"
+
+    def close(self):
+        """
+        Close the connection to the database.
+        """
+        with self._lock:
+            self.connection.close()
+
+    def get(self, resource: str, key: Union[int, str]) -> Optional[ParsingError]:
+        """
+        Get the exception cached for a resource.
+
+        :param resource: The type of the resource (submission, journal, or user).
+        :param key: The ID of the submission or journal, or the URL-safe name of the user.
+        :return: A new instance of the cached exception, or None if the resource is not cached or its entry expired.
+        """
+        with self._lock:
+            row: Optional[tuple[str, float]] = self.connection.execute(
+                "select error, expires from negative_cache where resource = ? and key = ?", [resource, str(key)]
+            ).fetchone()
+        if row is None or row[1] <= time():
+            return None
+        errors: dict[str, Type[ParsingError]] = {e.__name__: e for e in self.ttl}
+        return errors[row[0]](f"Cached {resource} {key}") if row[0] in errors else None
+
+    def add(self, resource: str, key: Union[int, str], err: ParsingError):
+        """
+        Cache the exception raised by a resource. Exceptions without a time to live are ignored.
+
+        :param resource: The type of the resource (submission, journal, or user).
+        :param key: The ID of the submission or journal, or the URL-safe name of the user.
+        :param err: The exception raised when fetching the resource.
+        """
+        if (ttl := self.ttl.get(type(err))) is None:
+            return
+        with self._lock, self.connection:
+            self.connection.execute(
+                "insert or replace into negative_cache (resource, key, error, expires) values (?, ?, ?, ?)",
+                [resource, str(key), type(err).__name__, time() + ttl]
+            )
+
+    def remove(self, resource: str, key: Union[int, str]):
+        """
+        Remove a resource from the cache.
+
+        :param resource: The type of the resource (submission, journal, or user).
+        :param key: The ID of the submission or journal, or the URL-safe name of the user.
+        """
+        with self._lock, self.connection:
+            self.connection.execute("delete from negative_cache where resource = ? and key = ?", [resource, str(key)])
+
+    def purge(self):
+        """
+        Remove the expired entries from the cache.
+        """
+        with self._lock, self.connection:
+            self.connection.execute("delete from negative_cache where expires <= ?", [time()])
+
+    @contextmanager
+    def check(self, resource: str, key: Union[int, str]) -> Iterator[None]:
+        """
+        Raise the cached exception of a resource, if any, otherwise cache the exception raised inside the block.
+
+        :param resource: The type of the resource (submission, journal, or user).
+        :param key: The ID of the submission or journal, or the URL-safe name of the user.
+        """
+        if (cached := self.get(resource, key)) is not None:
+            with self._lock:
+                self.hits += 1
+            raise cached
+        try:
+            yield
+        except ParsingError as err:
+            self.add(resource, key, err)
+            raise
+
+
+class ResponseCache:
+    """
+    Keep the most recent responses in memory for a limited time, so that a request for the same path and parameters
+    can be answered without contacting the server. Used by the prefetcher to store the pages it fetches in advance.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 300):
+        """
+        :param max_size: The maximum number of responses kept, the least recently used are removed first.
+        :param ttl: The time to live of the responses (seconds).
+        """
+        assert max_size > 0, _raise_exception(ValueError("max_size must be greater than 0"))
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.hits: int = 0  # Requests answered by the cache
+        self.misses: int = 0  # Requests that were not in the cache
+        self.generation: int = 0  # Incremented by clear, so responses requested before a clear are not added
+        self._responses: OrderedDict[Hashable, tuple[float, Response]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._responses)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._responses and self._responses[key][0] > time()
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(size={len(self)}, hits={self.hits}, misses={self.misses})"
+
+    @staticmethod
+    def key(path: str, params: dict[str, Union[str, bytes, int, float]]) -> tuple:
+        """
+        Create the cache key of a request.
+
+        :param path: The path of the request.
+        :param params: The query parameters of the request.
+        :return: A tuple that identifies the request.
+        """
+        return (path.strip("/"), *sorted((k, str(v)) for k, v in params.items()))
+
+    def get(self, key: Hashable) -> Optional[Response]:
+        """
+        Get a cached response.
+
+        :param key: The key of the request (see ResponseCache.key).
+        :return: The response, or None if it is not cached or it expired.
+        """
+        with self._lock:
+            if (entry := self._responses.get(key)) is None or entry[0] <= time():
+                self._responses.pop(key, None)
+                self.misses += 1
+                return None
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def pop(self, key: Hashable) -> Optional[Response]:
+        """
+        Get a cached response and remove it from the cache, so that the next request for it reaches the server.
+
+        :param key: The key of the request (see ResponseCache.key).
+        :return: The response, or None if it is not cached or it expired.
+        """
+        with self._lock:
+            if (entry := self._responses.pop(key, None)) is None or entry[0] <= time():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def add(self, key: Hashable, response: Response, generation: Optional[int] = None) -> bool:
+        """
+        Cache a response. The content of the response is read before it is stored.
+
+        :param key: The key of the request (see ResponseCache.key).
+        :param response: The response to cache.
+        :param generation: The generation of the cache when the response was requested, the response is not added if
+            the cache was cleared since then.
+        :return: True if the response was added, False otherwise.
+        """
+        _ = response.content
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._responses[key] = (time() + self.ttl, response)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+            return True
+
+    def clear(self):
+        """
+        Remove all the responses from the cache.
+        """
+        with self._lock:
+            self._responses.clear()
+            self.generation += 1
@@ -0,0 +1,73 @@
+from threading import Event
+from threading import Lock
+from typing import Callable
+from typing import Generic
+from typing import Hashable
+from typing import Optional
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    def __init__(self):
+        self.done: Event = Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Share the result of a call between all the callers that make the same call while it is running.
+
+    The first caller for a key runs the call, and the callers that arrive before it ends wait for it and receive the
+    same result, or the same exception. Calls made after it ended run again.
+    """
+
+    def __init__(self):
+        self.calls: int = 0  # Calls that were run
+        self.shared: int = 0  # Calls that received the result of a call that was already running
+        self._flights: dict[Hashable, _Flight] = {}
+        self._lock: Lock = Lock()
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(calls={self.calls}, shared={self.shared})"
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def do(self, key: Hashable, call: Callable[[], T]) -> T:
+        """
+        Run a call, or wait for the running call with the same key and return its result.
+
+        :param key: The key identifying the call.
+        :param call: The function to run.
+        :return: The result of the call.
+        """
+        with self._lock:
+            if leader := (flight := self._flights.get(key)) is None:
+                flight = self._flights[key] = _Flight()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result  # type: ignore
+
+        try:
+            flight.result = call()
+            return flight.result
+        except BaseException as err:
+            flight.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
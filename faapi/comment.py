@@ -1,5 +1,5 @@
 from datetime import datetime
-from functools import reduce
+from typing import Any
 from typing import Optional
 from typing import Union
 
@@ -90,6 +90,9 @@ class Comment:
         yield "hidden", self.hidden
         yield "parent", None if self.parent is None else dict(self.parent)
 
+    def __getstate__(self) -> dict[str, Any]:
+        return {k: None if isinstance(v, Tag) else v for k, v in self.__dict__.items()}
+
     def __repr__(self):
         return self.__str__()
 
@@ -114,6 +117,30 @@ class Comment:
         """
         return "" if self.parent is None else f"{self.parent.url}#cid:{self.id}"
 
+    @classmethod
+    def from_dict(
+        cls, comment_dict: dict[str, Any],
+        parent: Optional[Union[faapi.submission.Submission, faapi.journal.Journal]] = None
+    ) -> "Comment":
+        """
+        Create a comment and its replies from a dictionary with the same keys as the one returned by dict().
+        The parent key is ignored, the parent object can be passed separately.
+
+        :param comment_dict: The dictionary containing the comment information.
+        :param parent: The parent object of the comment and its replies.
+        :return: A Comment object.
+        """
+        comment: Comment = cls(parent=parent)
+        comment.id = comment_dict["id"]
+        comment.author = faapi.user.UserPartial.from_dict(comment_dict["author"])
+        comment.date = comment_dict["date"]
+        comment.text = comment_dict["text"]
+        comment.reply_to = comment_dict["reply_to"]
+        comment.replies = [_set_reply_to(cls.from_dict(r, parent), comment) for r in comment_dict["replies"]]
+        comment.edited = comment_dict["edited"]
+        comment.hidden = comment_dict["hidden"]
+        return comment
+
     def parse(self, comment_tag: Optional[Tag] = None):
         """
         Parse a comment tag, overrides any information already present in the object.
@@ -150,8 +177,12 @@ def sort_comments(comments: list[Comment]) -> list[Comment]:
     :param comments: A list of Comment objects (flat or tree-structured)
     :return: A tree-structured list of comments with replies
     """
+    replies: dict[int, list[Comment]] = {}
     for comment in (comments := flatten_comments(comments)):
-        comment.replies = [_set_reply_to(c, comment) for c in comments if c.reply_to == comment]
+        if comment.reply_to is not None:
+            replies.setdefault(_reply_to_id(comment.reply_to), []).append(comment)
+    for comment in comments:
+        comment.replies = [_set_reply_to(c, comment) for c in replies.get(comment.id, []) if c.reply_to == comment]
     return [c for c in comments if c.reply_to is None]
 
 
@@ -172,32 +203,26 @@ def flatten_comments(comments: list[Comment]) -> list[Comment]:
     return sorted(set(comments_flat))
 
 
+def _reply_to_id(reply_to: Union[Comment, int]) -> int:
+    return reply_to.id if isinstance(reply_to, Comment) else reply_to
+
+
 def _set_reply_to(comment: Comment, reply_to: Union[Comment, int]) -> Comment:
     comment.reply_to = reply_to
     return comment
 
 
 def _sort_comments_dict(comments: list[Comment]) -> list[dict]:
-    comments_flat = flatten_comments(comments)
-    comments_levels: list[list[Comment]] = [[c for c in comments_flat if not c.reply_to]]
-
-    comments_flat = [c for c in comments_flat if c not in comments_levels[-1]]
-
-    while comments_flat:
-        comments_levels.append([c for c in comments_flat if c.reply_to in comments_levels[-1]])
-        comments_flat = [c for c in comments_flat if c not in comments_levels[-1]]
-
-    comments_levels.reverse()
-
-    comments_dicts: list[dict] = reduce(
-        lambda prev, curr: [
-            dict(_remove_recursion(c)) | {"replies": [cd for cd in prev if cd["reply_to"] == c]}
-            for c in curr
-        ],
-        comments_levels,
-        []
-    )
-    return comments_dicts
+    comments_flat: list[Comment] = flatten_comments(comments)
+    replies: dict[int, list[Comment]] = {}
+    for comment in comments_flat:
+        if comment.reply_to:
+            replies.setdefault(_reply_to_id(comment.reply_to), []).append(comment)
+
+    def comment_dict(comment: Comment) -> dict:
+        return dict(_remove_recursion(comment)) | {"replies": [comment_dict(r) for r in replies.get(comment.id, [])]}
+
+    return [comment_dict(c) for c in comments_flat if not c.reply_to]
 
 
 def _remove_recursion(comment: Comment) -> Comment:
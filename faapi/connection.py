@@ -4,6 +4,9 @@ from http.cookiejar import CookieJar
 from platform import python_version
 from platform import uname
 from re import compile as re_compile
+from re import Pattern
+from typing import Literal
+from typing import NamedTuple
 from typing import Optional
 from typing import Type
 from typing import TypedDict
@@ -12,12 +15,21 @@ from urllib.robotparser import RobotFileParser
 
 from requests import Response
 from requests import Session
+from requests.adapters import DEFAULT_POOLSIZE
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from urllib3.util import Retry
 
 from .__version__ import __version__
 from .exceptions import _raise_exception
 from .exceptions import Unauthorized
 
 root: str = "https://www.furaffinity.net"
+cdn_hosts: tuple[str, ...] = ("https://d.furaffinity.net", "https://t.furaffinity.net", "https://a.furaffinity.net")
+stream_chunk_size: int = 1 << 14
+file_url_timestamp: Pattern = re_compile(r"/art/[^/]+/(?:[a-z]+/)?(\d+)/")  # Upload time in submission file URLs
+
+SkipReason = Literal["timestamp", "etag", "last_modified", "size", "not_modified"]
 
 
 class CookieDict(TypedDict):
@@ -25,20 +37,71 @@ class CookieDict(TypedDict):
     value: str
 
 
+class FileMetadata(NamedTuple):
+    url: str
+    size: Optional[int] = None  # Content-Length of the file (bytes)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None  # Last-Modified header, as sent by the server
+
+
+class FileDownload(NamedTuple):
+    file: Optional[bytes]  # None if the download was skipped
+    metadata: FileMetadata  # Metadata to store for the next conditional download
+    skipped: Optional[SkipReason]  # Why the download was skipped, None if the file was downloaded
+
+
 def join_url(*url_comps: Union[str, int]) -> str:
     return "/".join(map(lambda e: str(e).strip(" /"), url_comps))
 
 
-def make_session(cookies: Union[list[CookieDict], CookieJar], cls: Type[Session]) -> Session:
+def make_retry(
+    total: int = 3, *, backoff_factor: float = 1,
+    status_forcelist: tuple[int, ...] = (500, 502, 503, 504)
+) -> Retry:
+    return Retry(
+        total=total,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def make_adapter(pool_size: int = DEFAULT_POOLSIZE, max_retries: Union[Retry, int, None] = None) -> HTTPAdapter:
+    return HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries or 0)
+
+
+def make_cookie_jar(cookies: Union[list[CookieDict], CookieJar]) -> RequestsCookieJar:
     assert len(cookies), _raise_exception(Unauthorized("No cookies for session"))
-    session: Session = cls()
-    session.headers["User-Agent"] = f"faapi/{__version__} Python/{python_version()} {(u := uname()).system}/{u.release}"
+    cookie_jar: RequestsCookieJar = RequestsCookieJar()
 
     for cookie in cookies:
         if isinstance(cookie, Cookie):
-            session.cookies.set(cookie.name, cookie.value or "")
+            cookie_jar.set(cookie.name, cookie.value or "")
         else:
-            session.cookies.set(cookie["name"], cookie["value"])
+            cookie_jar.set(cookie["name"], cookie["value"])
+
+    return cookie_jar
+
+
+def make_session(
+    cookies: Union[list[CookieDict], CookieJar], cls: Type[Session], *,
+    pool_size: int = DEFAULT_POOLSIZE, max_retries: Union[Retry, int, None] = None,
+    cdn_pool_size: Optional[int] = None, cdn_max_retries: Union[Retry, int, None] = None
+) -> Session:
+    cookie_jar: RequestsCookieJar = make_cookie_jar(cookies)
+    session: Session = cls()
+    session.headers["User-Agent"] = f"faapi/{__version__} Python/{python_version()} {(u := uname()).system}/{u.release}"
+
+    session.mount(root + "/", make_adapter(pool_size, max_retries))
+    for host in cdn_hosts:
+        session.mount(host + "/", make_adapter(
+            cdn_pool_size or pool_size,
+            max_retries if cdn_max_retries is None else cdn_max_retries
+        ))
+
+    session.cookies = cookie_jar
 
     return session
 
@@ -51,9 +114,9 @@ def get_robots(session: Session) -> RobotFileParser:
 
 def get(
     session: Session, path: str, *, timeout: Optional[int] = None,
-    params: Optional[dict[str, Union[str, bytes, int, float]]] = None
+    params: Optional[dict[str, Union[str, bytes, int, float]]] = None, stream: bool = False
 ) -> Response:
-    return session.get(join_url(root, path), params=params, timeout=timeout)
+    return session.get(join_url(root, path), params=params, timeout=timeout, stream=stream)
 
 
 def stream_binary(
@@ -62,10 +125,67 @@ def stream_binary(
 ) -> bytes:
     stream: Response = session.get(url, stream=True, timeout=timeout)
     stream.raise_for_status()
+    return read_binary(stream, chunk_size)
+
 
+def read_binary(stream: Response, chunk_size: Optional[int] = None) -> bytes:
     file_binary: bytes = bytes().join(stream.iter_content(chunk_size))
 
     if (length := int(stream.headers.get("Content-Length", 0))) > 0 and length != len(file_binary):
         raise IncompleteRead(file_binary, length - len(file_binary))
 
     return file_binary
+
+
+def file_timestamp(url: str) -> Optional[int]:
+    return int(match[1]) if (match := file_url_timestamp.search(url)) else None
+
+
+def file_metadata(url: str, response: Response) -> FileMetadata:
+    return FileMetadata(
+        url,
+        int(length) if (length := response.headers.get("Content-Length", "")).isdigit() else None,
+        response.headers.get("ETag"),
+        response.headers.get("Last-Modified"),
+    )
+
+
+def head_file(session: Session, url: str, *, timeout: Optional[int] = None) -> FileMetadata:
+    response: Response = session.head(url, timeout=timeout, allow_redirects=True)
+    response.raise_for_status()
+    return file_metadata(url, response)
+
+
+def unchanged_file(stored: FileMetadata, current: FileMetadata) -> Optional[SkipReason]:
+    # The strongest validator known on both sides decides, the size is only used when the server sends no validators
+    if (ts := file_timestamp(stored.url)) is not None and (ts_current := file_timestamp(current.url)) is not None:
+        return "timestamp" if ts == ts_current else None
+    elif stored.etag and current.etag:
+        return "etag" if stored.etag == current.etag else None
+    elif stored.last_modified and current.last_modified:
+        return "last_modified" if stored.last_modified == current.last_modified else None
+    elif stored.size is not None and current.size is not None:
+        return "size" if stored.size == current.size else None
+    return None
+
+
+def stream_binary_conditional(
+    session: Session, url: str, stored: FileMetadata, *, chunk_size: Optional[int] = None,
+    timeout: Optional[int] = None
+) -> FileDownload:
+    headers: dict[str, str] = {}
+    if stored.etag:
+        headers["If-None-Match"] = stored.etag
+    if stored.last_modified:
+        headers["If-Modified-Since"] = stored.last_modified
+
+    stream: Response = session.get(url, stream=True, timeout=timeout, headers=headers)
+    stream.raise_for_status()
+
+    if stream.status_code == 304:
+        stream.close()
+        etag: Optional[str] = stream.headers.get("ETag", stored.etag)
+        return FileDownload(None, stored._replace(url=url, etag=etag), "not_modified")
+
+    file_binary: bytes = read_binary(stream, chunk_size)
+    return FileDownload(file_binary, file_metadata(url, stream)._replace(size=len(file_binary)), None)
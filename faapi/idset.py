@@ -0,0 +1,386 @@
+from array import array
+from bisect import bisect_left
+from mmap import ACCESS_READ
+from mmap import mmap
+from pathlib import Path
+from struct import calcsize
+from struct import pack
+from struct import unpack_from
+from sys import byteorder
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import TypeVar
+from typing import Union
+
+from .exceptions import _raise_exception
+
+T = TypeVar("T")
+Container = Union[array, bytearray, memoryview]
+
+array_max: int = 4096  # Containers with more values are stored as bitmaps
+bitmap_size: int = 1 << 13  # 65536 bits
+magic: bytes = b"FAIDSET1"
+header_format: str = "<8sI"
+entry_format: str = "<HBIQ"  # high bits, is bitmap, cardinality, offset
+
+
+def _id(item: Any) -> int:
+    if isinstance(item, int):
+        return item
+    elif isinstance(item, dict):
+        return item["id"]
+    return item.id
+
+
+def _bitmap(values: Iterable[int]) -> bytearray:
+    bitmap: bytearray = bytearray(bitmap_size)
+    for value in values:
+        bitmap[value >> 3] |= 1 << (value & 7)
+    return bitmap
+
+
+def _bitmap_values(bitmap: Container) -> Iterator[int]:
+    for i, byte in enumerate(bitmap):
+        if byte:
+            for bit in range(8):
+                if byte >> bit & 1:
+                    yield (i << 3) | bit
+
+
+def _container(values: Iterable[int]) -> Container:
+    # values must be sorted and unique
+    container: array = array("H", values)
+    return _bitmap(container) if len(container) > array_max else container
+
+
+def _values(container: Container, cardinality: int) -> Iterable[int]:
+    return _bitmap_values(container) if cardinality > array_max else container
+
+
+class IdSet:
+    """
+    A compact set of non-negative integer IDs (up to 2^32), such as submission and journal IDs.
+
+    The IDs are split in blocks of 65536 by their high 16 bits, and each block stores the low 16 bits either as a
+    sorted array of 2-byte values or, when it holds more than 4096 IDs, as a bitmap of 8 KiB. A dense block of IDs costs
+    at most 1 bit for each possible ID, and a sparse one 2 bytes for each ID.
+
+    The set can be saved to a file and loaded with a memory map, in which case the blocks are read from the file when
+    they are first used and copied only when they are modified.
+    """
+
+    def __init__(self, ids: Iterable[Any] = ()):
+        """
+        :param ids: The initial IDs, as integers, objects with an id attribute (e.g. SubmissionPartial), or dictionaries
+            with an id key.
+        """
+        self._containers: dict[int, Container] = {}
+        self._cardinality: dict[int, int] = {}
+        self._mmap: Optional[mmap] = None
+        self.update(ids)
+
+    def __len__(self) -> int:
+        return sum(self._cardinality.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._cardinality)
+
+    def __contains__(self, item: Any) -> bool:
+        value: int = _id(item)
+        if (container := self._containers.get(value >> 16)) is None:
+            return False
+        low: int = value & 0xFFFF
+        if self._cardinality[value >> 16] > array_max:
+            return bool(container[low >> 3] >> (low & 7) & 1)
+        return (i := bisect_left(container, low)) < len(container) and container[i] == low
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._containers):
+            base: int = high << 16
+            for low in _values(self._containers[high], self._cardinality[high]):
+                yield base | low
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, IdSet):
+            return self._cardinality == other._cardinality and all(
+                list(_values(c, self._cardinality[h])) == list(_values(other._containers[h], other._cardinality[h]))
+                for h, c in self._containers.items()
+            )
+        return NotImplemented
+
+    def __or__(self, other: "IdSet") -> "IdSet":
+        return self.union(other)
+
+    def __and__(self, other: "IdSet") -> "IdSet":
+        return self.intersection(other)
+
+    def __sub__(self, other: "IdSet") -> "IdSet":
+        return self.difference(other)
+
+    def __xor__(self, other: "IdSet") -> "IdSet":
+        return self.symmetric_difference(other)
+
+    def __ior__(self, other: "IdSet") -> "IdSet":
+        for high, container in other._containers.items():
+            if high not in self._containers:
+                self._containers[high], self._cardinality[high] = container[:], other._cardinality[high]
+            else:
+                self._merge(high, lambda a, b: a | b, other)
+        return self
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(len={len(self)}, nbytes={self.nbytes})"
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"ids": bytes(self.dumps())}
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__init__()  # type: ignore
+        self._load(memoryview(state["ids"]))
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size of the stored values (bytes).
+        """
+        return sum(len(c) * (2 if isinstance(c, array) or (isinstance(c, memoryview) and c.format == "H") else 1)
+                   for c in self._containers.values())
+
+    def _mutable(self, high: int) -> Container:
+        container: Container = self._containers[high]
+        if isinstance(container, memoryview):
+            # Containers of memory-mapped sets are copied the first time they are modified
+            container = self._containers[high] = \
+                bytearray(container) if container.format == "B" else array("H", container)
+        return container
+
+    def add(self, item: Any):
+        """
+        Add an ID to the set.
+
+        :param item: The ID, an object with an id attribute, or a dictionary with an id key.
+        """
+        value: int = _id(item)
+        assert 0 <= value < 1 << 32, _raise_exception(ValueError(f"ID out of range {value}"))
+        high, low = value >> 16, value & 0xFFFF
+        if high not in self._containers:
+            self._containers[high], self._cardinality[high] = array("H", [low]), 1
+        elif self._cardinality[high] > array_max:
+            container: Container = self._mutable(high)
+            if not container[low >> 3] >> (low & 7) & 1:
+                container[low >> 3] |= 1 << (low & 7)
+                self._cardinality[high] += 1
+        else:
+            container = self._mutable(high)
+            if (i := bisect_left(container, low)) == len(container) or container[i] != low:
+                container.insert(i, low)  # type: ignore
+                if (cardinality := self._cardinality[high] + 1) > array_max:
+                    self._containers[high] = _bitmap(container)
+                self._cardinality[high] = cardinality
+
+    def discard(self, item: Any):
+        """
+        Remove an ID from the set if it is present.
+
+        :param item: The ID, an object with an id attribute, or a dictionary with an id key.
+        """
+        if item in self:
+            value: int = _id(item)
+            high: int = value >> 16
+            values: list[int] = [v for v in _values(self._containers[high], self._cardinality[high])
+                                 if v != value & 0xFFFF]
+            self._set(high, values)
+
+    def update(self, *items: Iterable[Any]):
+        """
+        Add IDs to the set.
+
+        :param items: Iterables of IDs, objects with an id attribute, or dictionaries with an id key.
+        """
+        groups: dict[int, set[int]] = {}
+        for value in (_id(i) for it in items for i in it):
+            assert 0 <= value < 1 << 32, _raise_exception(ValueError(f"ID out of range {value}"))
+            groups.setdefault(value >> 16, set()).add(value & 0xFFFF)
+        for high, lows in groups.items():
+            if high in self._containers and len(lows) * 16 < self._cardinality[high]:
+                # Inserting few values is cheaper than rebuilding the container
+                for low in lows:
+                    self.add((high << 16) | low)
+                continue
+            elif high in self._containers:
+                lows.update(_values(self._containers[high], self._cardinality[high]))
+            self._set(high, sorted(lows))
+
+    def unseen(self, items: Iterable[T]) -> list[T]:
+        """
+        Find the items whose ID is not in the set. An empty result means that every item has already been seen.
+
+        :param items: The IDs, objects with an id attribute, or dictionaries with an id key.
+        :return: The items that are not in the set, in their original order.
+        """
+        return [i for i in items if i not in self]
+
+    def issuperset(self, items: Iterable[Any]) -> bool:
+        """
+        Check whether all the items are in the set.
+
+        :param items: The IDs, objects with an id attribute, or dictionaries with an id key.
+        :return: True if every item is in the set, False otherwise.
+        """
+        return all(i in self for i in items)
+
+    def _set(self, high: int, values: list[int]):
+        if values:
+            self._containers[high], self._cardinality[high] = _container(values), len(values)
+        else:
+            self._containers.pop(high, None)
+            self._cardinality.pop(high, None)
+
+    def _merge(self, high: int, operation, other: "IdSet"):
+        a: Optional[Container] = self._containers.get(high)
+        b: Optional[Container] = other._containers.get(high)
+        if a is not None and self._cardinality[high] > array_max and \
+                b is not None and other._cardinality[high] > array_max:
+            bits: int = operation(int.from_bytes(a, "little"), int.from_bytes(b, "little"))
+            self._containers[high] = bytearray(bits.to_bytes(bitmap_size, "little"))
+            if (cardinality := bin(bits).count("1")) <= array_max:
+                self._containers[high] = _container(_bitmap_values(self._containers[high]))
+            self._cardinality[high] = cardinality
+            if not cardinality:
+                self._set(high, [])
+            return
+        values_a: set[int] = set(_values(a, self._cardinality[high])) if a is not None else set()
+        values_b: set[int] = set(_values(b, other._cardinality[high])) if b is not None else set()
+        self._set(high, sorted(operation(values_a, values_b)))
+
+    def copy(self) -> "IdSet":
+        """
+        Copy the set. The containers of memory-mapped sets are copied as well.
+
+        :return: A new IdSet object.
+        """
+        id_set: IdSet = IdSet()
+        id_set._cardinality = dict(self._cardinality)
+        id_set._containers = {
+            h: (bytearray(c) if c.format == "B" else array("H", c)) if isinstance(c, memoryview) else c[:]
+            for h, c in self._containers.items()
+        }
+        return id_set
+
+    def union(self, other: "IdSet") -> "IdSet":
+        """
+        :return: A new set with the IDs of both sets.
+        """
+        id_set: IdSet = self.copy()
+        id_set |= other
+        return id_set
+
+    def intersection(self, other: "IdSet") -> "IdSet":
+        """
+        :return: A new set with the IDs that are in both sets.
+        """
+        id_set: IdSet = self.copy()
+        for high in list(id_set._containers):
+            id_set._merge(high, lambda a, b: a & b, other)
+        return id_set
+
+    def difference(self, other: "IdSet") -> "IdSet":
+        """
+        :return: A new set with the IDs that are not in the other set.
+        """
+        id_set: IdSet = self.copy()
+        for high in list(id_set._containers):
+            if high in other._containers:
+                id_set._merge(high, lambda a, b: a & ~b if isinstance(a, int) else a - b, other)
+        return id_set
+
+    def symmetric_difference(self, other: "IdSet") -> "IdSet":
+        """
+        :return: A new set with the IDs that are in only one of the two sets.
+        """
+        id_set: IdSet = self.copy()
+        for high in {*id_set._containers, *other._containers}:
+            id_set._merge(high, lambda a, b: a ^ b, other)
+        return id_set
+
+    def dumps(self) -> bytearray:
+        """
+        Serialize the set. Values are stored as little-endian integers.
+
+        :return: The serialized set.
+        """
+        highs: list[int] = sorted(self._containers)
+        offset: int = calcsize(header_format) + calcsize(entry_format) * len(highs)
+        header: bytearray = bytearray(pack(header_format, magic, len(highs)))
+        data: bytearray = bytearray()
+        for high in highs:
+            container: Container = self._containers[high]
+            is_bitmap: bool = self._cardinality[high] > array_max
+            if not is_bitmap:
+                container = array("H", container)
+                if byteorder == "big":
+                    container.byteswap()
+            # Align the values to 8 bytes, so that memory maps can be cast to 2-byte arrays
+            data.extend(bytes(-(offset + len(data)) % 8))
+            header.extend(pack(entry_format, high, is_bitmap, self._cardinality[high], offset + len(data)))
+            data.extend(bytes(container))
+        return header + data
+
+    def save(self, path: Union[str, Path]):
+        """
+        Save the set to a file.
+
+        :param path: The path to the file.
+        """
+        Path(path).write_bytes(self.dumps())
+
+    @classmethod
+    def loads(cls, data: bytes) -> "IdSet":
+        """
+        Create a set from the output of dumps.
+
+        :param data: The serialized set.
+        :return: A new IdSet object.
+        """
+        id_set: IdSet = cls()
+        id_set._load(memoryview(bytes(data)))
+        return id_set.copy()
+
+    @classmethod
+    def load(cls, path: Union[str, Path], *, memory_map: bool = True) -> "IdSet":
+        """
+        Load a set saved with save.
+
+        :param path: The path to the file.
+        :param memory_map: Whether to read the values from a memory map of the file instead of loading them in memory.
+        :return: A new IdSet object.
+        """
+        if not memory_map or byteorder == "big":
+            return cls.loads(Path(path).read_bytes())
+        id_set: IdSet = cls()
+        with Path(path).open("rb") as f:
+            id_set._mmap = mmap(f.fileno(), 0, access=ACCESS_READ)
+        id_set._load(memoryview(id_set._mmap))
+        return id_set
+
+    def _load(self, data: memoryview):
+        file_magic, count = unpack_from(header_format, data)
+        assert file_magic == magic, _raise_exception(ValueError("Not an IdSet file"))
+        for i in range(count):
+            high, is_bitmap, cardinality, offset = unpack_from(
+                entry_format, data, calcsize(header_format) + calcsize(entry_format) * i
+            )
+            if is_bitmap:
+                self._containers[high] = data[offset:offset + bitmap_size]
+            else:
+                container: Union[array, memoryview] = data[offset:offset + cardinality * 2].cast("H")
+                if byteorder == "big":
+                    container = array("H", container)
+                    container.byteswap()
+                self._containers[high] = container
+            self._cardinality[high] = cardinality
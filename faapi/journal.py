@@ -1,11 +1,14 @@
 from collections import namedtuple
 from datetime import datetime
+from typing import Any
 from typing import Optional
+from typing import TYPE_CHECKING
 from typing import Union
 
 from .connection import join_url
 from .connection import root
 from .exceptions import _raise_exception
+from .metrics import phase
 from .parse import BeautifulSoup
 from .parse import check_page_raise
 from .parse import html_to_bbcode
@@ -15,6 +18,9 @@ from .parse import parse_journal_section
 from .parse import Tag
 from .user import UserPartial
 
+if TYPE_CHECKING:
+    from .comment import Comment
+
 
 class JournalStats(namedtuple("JournalStats", ["comments"])):
     """
@@ -82,6 +88,9 @@ class JournalBase:
         yield "content", self.content
         yield "mentions", self.mentions
 
+    def __getstate__(self) -> dict[str, Any]:
+        return {k: None if isinstance(v, Tag) else v for k, v in self.__dict__.items()}
+
     def __repr__(self):
         return self.__str__()
 
@@ -106,6 +115,16 @@ class JournalBase:
         """
         return join_url(root, "journal", self.id)
 
+    def _load_dict(self, journal_dict: dict[str, Any]):
+        self.id = journal_dict["id"]
+        self.title = journal_dict["title"]
+        self.rating = journal_dict["rating"]
+        self.date = journal_dict["date"]
+        self.author = UserPartial.from_dict(journal_dict["author"])
+        self.stats = JournalStats(**journal_dict["stats"])
+        self.content = journal_dict["content"]
+        self.mentions = list(journal_dict["mentions"])
+
 
 class JournalPartial(JournalBase):
     """
@@ -124,6 +143,18 @@ class JournalPartial(JournalBase):
 
         self.parse()
 
+    @classmethod
+    def from_dict(cls, journal_dict: dict[str, Any]) -> "JournalPartial":
+        """
+        Create a journal from a dictionary with the same keys as the one returned by dict().
+
+        :param journal_dict: The dictionary containing the journal information.
+        :return: A JournalPartial object.
+        """
+        journal: JournalPartial = cls()
+        journal._load_dict(journal_dict)
+        return journal
+
     def parse(self, journal_tag: Optional[Union[Tag, BeautifulSoup]] = None):
         """
         Parse a journal tag, overrides any information already present in the object.
@@ -160,9 +191,10 @@ class Journal(JournalBase):
     Contains complete journal information gathered from journal pages, including comments.
     """
 
-    def __init__(self, journal_page: Optional[BeautifulSoup] = None):
+    def __init__(self, journal_page: Optional[BeautifulSoup] = None, *, parse_comments: bool = True):
         """
         :param journal_page: The page from which to parse the journal.
+        :param parse_comments: Whether to parse the comments with the journal, or on first access to comments.
         """
         assert journal_page is None or isinstance(journal_page, BeautifulSoup), \
             _raise_exception(TypeError(f"journal_item must be {None} or {BeautifulSoup.__name__}"))
@@ -172,10 +204,9 @@ class Journal(JournalBase):
 
         self.header: str = ""
         self.footer: str = ""
-        from .comment import Comment
-        self.comments: list[Comment] = []
+        self._comments: Optional[list[Comment]] = []
 
-        self.parse()
+        self.parse(parse_comments=parse_comments)
 
     def __iter__(self):
         for k, v in super(Journal, self).__iter__():
@@ -203,11 +234,49 @@ class Journal(JournalBase):
         """
         return html_to_bbcode(self.footer)
 
-    def parse(self, journal_page: Optional[Union[Tag, BeautifulSoup]] = None):
+    @classmethod
+    def from_dict(cls, journal_dict: dict[str, Any]) -> "Journal":
+        """
+        Create a journal from a dictionary with the same keys as the one returned by dict(), including the comments.
+
+        :param journal_dict: The dictionary containing the journal information.
+        :return: A Journal object.
+        """
+        from .comment import Comment
+        journal: Journal = cls()
+        journal._load_dict(journal_dict)
+        journal.header = journal_dict["header"]
+        journal.footer = journal_dict["footer"]
+        journal.comments = [Comment.from_dict(c, journal) for c in journal_dict["comments"]]
+        return journal
+
+    def __getstate__(self) -> dict[str, Any]:
+        state: dict[str, Any] = super().__getstate__()
+        state["_comments"] = self.comments
+        return state
+
+    @property
+    def comments(self) -> list["Comment"]:
+        """
+        The comments of the journal, parsed from the journal page on first access if they were not parsed with the rest
+        of the journal
+
+        :return: A tree-structured list of comments
+        """
+        if self._comments is None:
+            self._comments = self._parse_comments()
+        return self._comments
+
+    @comments.setter
+    def comments(self, comments: list["Comment"]):
+        self._comments = comments
+
+    def parse(self, journal_page: Optional[Union[Tag, BeautifulSoup]] = None, *, parse_comments: bool = True):
         """
         Parse a journal page, overrides any information already present in the object.
 
         :param journal_page: The page from which to parse the journal.
+        :param parse_comments: Whether to parse the comments now, or on first access to comments.
         """
         assert journal_page is None or isinstance(journal_page, BeautifulSoup), \
             _raise_exception(TypeError(f"journal_item must be {None} or {BeautifulSoup.__name__}"))
@@ -216,9 +285,11 @@ class Journal(JournalBase):
         if self.journal_page is None:
             return
 
-        check_page_raise(self.journal_page)
+        with phase("check"):
+            check_page_raise(self.journal_page)
 
-        parsed: dict = parse_journal_page(self.journal_page)
+        with phase("extract"):
+            parsed: dict = parse_journal_page(self.journal_page)
 
         # noinspection DuplicatedCode
         self.id = parsed["id"]
@@ -236,5 +307,11 @@ class Journal(JournalBase):
         self.header = parsed["header"]
         self.footer = parsed["footer"]
         self.mentions = parsed["mentions"]
+        self._comments = self._parse_comments() if parse_comments else None
+
+    def _parse_comments(self) -> list["Comment"]:
+        if self.journal_page is None:
+            return []
         from .comment import sort_comments, Comment
-        self.comments = sort_comments([Comment(t, self) for t in parse_comments(self.journal_page)])
+        with phase("comments"):
+            return sort_comments([Comment(t, self) for t in parse_comments(self.journal_page)])
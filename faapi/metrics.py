@@ -0,0 +1,200 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from math import ceil
+from threading import Lock
+from time import perf_counter
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+phases: tuple[str, ...] = ("delay", "network", "tree", "check", "extract", "comments")
+
+
+class RequestMetrics:
+    """
+    Timings of a single FAAPI call, broken down by phase:
+    * delay: time spent waiting for the crawl delay
+    * network: time spent sending the request and receiving the response
+    * tree: time spent building the page tree
+    * check: time spent checking the page for errors and login status
+    * extract: time spent extracting fields and creating objects
+    * comments: time spent building the comments tree
+    """
+
+    def __init__(self, endpoint: str, path: str = ""):
+        """
+        :param endpoint: The name of the FAAPI method that was called.
+        :param path: The path of the first request made by the call.
+        """
+        self.endpoint: str = endpoint
+        self.path: str = path
+        self.phases: dict[str, float] = {}
+        self.total: float = 0
+        self.bytes: int = 0
+        self.requests: int = 0
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.start: float = perf_counter()
+
+    def __iter__(self):
+        yield "endpoint", self.endpoint
+        yield "path", self.path
+        yield "phases", dict(self.phases)
+        yield "total", self.total
+        yield "bytes", self.bytes
+        yield "requests", self.requests
+        yield "status", self.status
+        yield "error", self.error
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.endpoint} {self.path} {self.total * 1000:.1f}ms " + \
+            " ".join(f"{p}={t * 1000:.1f}ms" for p, t in self.phases.items())
+
+    def add(self, phase: str, seconds: float):
+        """
+        Add time to a phase.
+
+        :param phase: The name of the phase.
+        :param seconds: The time to add.
+        """
+        self.phases[phase] = self.phases.get(phase, 0) + seconds
+
+
+_current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("_current_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """
+    Get the metrics of the call being measured in the current context.
+
+    :return: A RequestMetrics object, or None if no call is being measured.
+    """
+    return _current_metrics.get()
+
+
+@contextmanager
+def measure(endpoint: str, observers: list[Callable[[RequestMetrics], None]]) -> Iterator[Optional[RequestMetrics]]:
+    """
+    Measure a call and send its metrics to the observers once it is over.
+    Calls nested inside an already measured call are added to the outer metrics.
+
+    :param endpoint: The name of the call.
+    :param observers: The callbacks that receive the metrics.
+    :return: The RequestMetrics object of the call, or None if there are no observers.
+    """
+    if (metrics := _current_metrics.get()) is not None or not observers:
+        yield metrics
+        return
+
+    metrics = RequestMetrics(endpoint)
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    except BaseException as err:
+        metrics.error = type(err).__name__
+        raise
+    finally:
+        metrics.total = perf_counter() - metrics.start
+        _current_metrics.reset(token)
+        for observer in observers:
+            observer(metrics)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Add the time spent in the block to a phase of the call being measured, if any.
+
+    :param name: The name of the phase.
+    """
+    if (metrics := _current_metrics.get()) is None:
+        yield
+        return
+
+    start: float = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(name, perf_counter() - start)
+
+
+def count_bytes(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Add the size of the chunks to the bytes of the call being measured, if any, as they are consumed.
+
+    :param chunks: The chunks of a response body.
+    :return: The same chunks.
+    """
+    for chunk in chunks:
+        if (metrics := _current_metrics.get()) is not None:
+            metrics.bytes += len(chunk)
+        yield chunk
+
+
+class MetricsAggregator:
+    """
+    An observer that collects the metrics of the latest calls and reports their percentiles.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        """
+        :param max_samples: The number of latest samples kept for each endpoint.
+        """
+        self.max_samples: int = max_samples
+        self.samples: dict[str, deque[RequestMetrics]] = {}
+        self.errors: dict[str, int] = {}
+        self._lock: Lock = Lock()
+
+    def __call__(self, metrics: RequestMetrics):
+        with self._lock:
+            self.samples.setdefault(metrics.endpoint, deque(maxlen=self.max_samples)).append(metrics)
+            if metrics.error:
+                self.errors[metrics.endpoint] = self.errors.get(metrics.endpoint, 0) + 1
+
+    def percentiles(
+        self, endpoint: str, phase_name: str = "total", percentiles: tuple[float, ...] = (50, 90, 99)
+    ) -> dict[float, float]:
+        """
+        Compute the percentiles of a phase for an endpoint (nearest-rank method).
+
+        :param endpoint: The name of the endpoint.
+        :param phase_name: The name of the phase, "total" for the whole call, or "bytes" for the received bytes.
+        :param percentiles: The percentiles to compute.
+        :return: A dictionary of percentile to value.
+        """
+        with self._lock:
+            samples: list[RequestMetrics] = list(self.samples.get(endpoint, []))
+        if not samples:
+            return {}
+        values: list[float] = sorted(
+            m.total if phase_name == "total" else m.bytes if phase_name == "bytes" else m.phases.get(phase_name, 0)
+            for m in samples
+        )
+        return {p: values[min(len(values), max(1, ceil(len(values) * p / 100))) - 1] for p in percentiles}
+
+    def report(self, percentiles: tuple[float, ...] = (50, 90, 99)) -> dict[str, dict[str, dict[float, float]]]:
+        """
+        Compute the percentiles of all the phases for all the endpoints.
+
+        :param percentiles: The percentiles to compute.
+        :return: A dictionary of endpoint to phase to percentiles.
+        """
+        with self._lock:
+            endpoints: list[str] = sorted(self.samples)
+        return {
+            e: {p: self.percentiles(e, p, percentiles) for p in ("total", *phases, "bytes")}
+            for e in endpoints
+        }
+
+    def reset(self):
+        """
+        Remove all collected samples.
+        """
+        with self._lock:
+            self.samples.clear()
+            self.errors.clear()
@@ -1,3 +1,4 @@
+from collections import namedtuple
 from datetime import datetime
 from re import compile as re_compile
 from re import Match
@@ -7,12 +8,14 @@ from re import Pattern
 from re import search
 from re import sub
 from typing import Any
+from typing import Iterable
 from typing import Optional
 from typing import Union
 from urllib.parse import quote
 
 from bbcode import Parser as BBCodeParser  # type:ignore
 from bs4 import BeautifulSoup
+from bs4.element import Comment as HTMLComment
 from bs4.element import NavigableString
 from bs4.element import Tag
 from dateutil.parser import parse as parse_date
@@ -31,6 +34,7 @@ from .exceptions import ServerError
 
 relative_url: Pattern = re_compile(r"^(?:https?://(?:www\.)?furaffinity\.net)?(.*)")
 mentions_regexp: Pattern = re_compile(r"^(?:(?:https?://)?(?:www\.)?furaffinity\.net)?/user/([^/#]+).*$")
+comment_parent_regexp: Pattern = re_compile(r'<a class="comment-parent" href="(#cid:\d+)"')
 url_username_regexp: Pattern = re_compile(r"/(?:user|gallery|scraps|favorites|journals|commissions)/([^/]+)(/.*)?")
 not_found_messages: tuple[str, ...] = ("not in our database", "cannot be found", "could not be found", "user not found")
 deactivated_messages: tuple[str, ...] = ("deactivated", "pending deletion")
@@ -45,27 +49,101 @@ def get_attr(tag: Tag, attr: str) -> str:
     return value[0] if isinstance(value := tag.attrs[attr], list) else value
 
 
-def parse_page(text: str) -> BeautifulSoup:
-    return BeautifulSoup(text, "lxml")
+def parse_page(content: Union[str, bytes, Iterable[bytes]], encoding: str = "utf-8") -> BeautifulSoup:
+    if isinstance(content, str):
+        return BeautifulSoup(content, "lxml")
+    elif isinstance(content, bytes):
+        return BeautifulSoup(content, "lxml", from_encoding=encoding)
+
+    # Feed the chunks to lxml as they arrive, so the tree is built while the rest of the page is being received
+    page: BeautifulSoup = BeautifulSoup("", "lxml")
+    page.reset()
+    page.original_encoding = encoding  # type:ignore
+    page.builder.initialize_soup(page)
+    page.builder.reset()
+    try:
+        parser = page.builder.parser_for(encoding)  # type:ignore
+        parser.feed(b"")  # Closing a parser that received no data raises an error
+        for chunk in content:
+            parser.feed(chunk)
+        parser.close()
+        page.endData()
+        while page.currentTag is not None and page.currentTag.name != page.ROOT_TAG_NAME:
+            page.popTag()
+    finally:
+        page.builder.soup = None
+    return page
+
+
+class PageEnvelope(
+    namedtuple("PageEnvelope", ["classic", "title", "error", "notice", "loggedin_user"])
+):
+    """
+    This object contains the page-level information used to check a page:
+    * classic: whether the page uses the classic theme
+    * title: the title of the page in lowercase
+    * error: the text of the error section (only for system error pages)
+    * notice: the text of the notice message, or None if the page has none
+    * loggedin_user: the name of the logged-in user, or None if the page is not from a login session
+    """
+
+
+def parse_page_envelope(page: BeautifulSoup) -> PageEnvelope:
+    if (envelope := page.__dict__.get("faapi_envelope")) is not None:
+        return envelope
+
+    # Find all the tags in one walk over the page, the notice is missing from most pages and would need its own
+    body: Optional[Tag] = None
+    title: Optional[Tag] = None
+    error: Optional[Tag] = None
+    notice: Optional[Tag] = None
+    avatar: Optional[Tag] = None
+    for tag in page.descendants:
+        if not isinstance(tag, Tag):
+            continue
+        elif (name := tag.name) == "div":
+            if error is None and "section-body" in tag.attrs.get("class", ()):
+                error = tag
+        elif name == "img":
+            if avatar is None and "loggedin_user_avatar" in tag.attrs.get("class", ()):
+                avatar = tag
+        elif name == "section":
+            if notice is None and "notice-message" in tag.attrs.get("class", ()):
+                notice = tag
+        elif name == "title":
+            title = tag if title is None else title
+        elif name == "body":
+            body = tag if body is None else body
+
+    envelope = PageEnvelope(
+        body is not None and "classic" in body.attrs.get("data-static-path", ""),
+        title_text := title.text.lower() if title else "",
+        error.text if error and title_text == "system error" else "",
+        notice.text if notice else None,
+        get_attr(avatar, "alt") if avatar else None,
+    )
+    setattr(page, "faapi_envelope", envelope)
+    return envelope
 
 
 def check_page_raise(page: BeautifulSoup) -> None:
     if page is None:
         raise NonePage
-    elif page.body and "classic" in page.body.attrs.get("data-static-path", ""):
+
+    envelope: PageEnvelope = parse_page_envelope(page)
+    if envelope.classic:
         raise ClassicTheme
-    elif not (title := page.title.text.lower() if page.title else ""):
+    elif not (title := envelope.title):
         raise NoTitle
     elif title.startswith("account disabled"):
         raise DisabledAccount
     elif title == "system error":
-        error_text: str = error.text if (error := page.select_one("div.section-body")) else ""
+        error_text: str = envelope.error
         if any(m in error_text.lower() for m in not_found_messages):
             raise NotFound
         else:
             raise ServerError(*filter(bool, map(str.strip, error_text.splitlines())))
-    elif notice := page.select_one("section.notice-message"):
-        notice_text: str = notice.text
+    elif (notice_text := envelope.notice) is not None:
         if any(m in notice_text.lower() for m in deactivated_messages):
             raise DisabledAccount
         elif any(m in notice_text.lower() for m in not_found_messages):
@@ -352,6 +430,8 @@ def parse_mentions(tag: Tag) -> list[str]:
 
 
 def parse_loggedin_user(page: BeautifulSoup) -> Optional[str]:
+    if (envelope := page.__dict__.get("faapi_envelope")) is not None:
+        return envelope.loggedin_user
     return get_attr(avatar, "alt") if (avatar := page.select_one("img.loggedin_user_avatar")) else None
 
 
@@ -735,16 +815,50 @@ def parse_user_page(user_page: BeautifulSoup) -> dict[str, Any]:
 
 
 def parse_comment_tag(tag: Tag) -> dict:
-    tag_id: Optional[Tag] = tag.select_one("a.comment_anchor")
-    tag_user_name: Optional[Tag] = tag.select_one("comment-username a.c-usernameBlock__userName")
-    tag_user_symbol: Optional[Tag] = tag_user_name.select_one(".c-usernameBlock__symbol") if tag_user_name else None
-    tag_user_display_name: Optional[Tag] = tag.select_one("comment-username a.c-usernameBlock__displayName")
-    tag_avatar: Optional[Tag] = tag.select_one("div.avatar img.comment_useravatar")
-    tag_user_title: Optional[Tag] = tag.select_one("comment-title")
-    tag_body: Optional[Tag] = tag.select_one("comment-user-text")
-    # TODO: update when they implement parent link
-    # tag_parent_link: Optional[Tag] = tag.select_one("a.comment-parent")
-    tag_edited: Optional[Tag] = tag.select_one("img.edited")
+    tag_id: Optional[Tag] = None
+    tag_user_name: Optional[Tag] = None
+    tag_user_symbol: Optional[Tag] = None
+    tag_user_display_name: Optional[Tag] = None
+    tag_avatar: Optional[Tag] = None
+    tag_user_title: Optional[Tag] = None
+    tag_body: Optional[Tag] = None
+    tag_edited: Optional[Tag] = None
+    attr_parent_href: Optional[str] = None
+
+    # Walk the comment once in document order, the user text is not searched as none of the tags can be inside it
+    stack: list = [tag]
+    while stack:
+        element = stack.pop()
+        if isinstance(element, Tag):
+            name: str = element.name
+            classes: Union[str, list[str]] = element.attrs.get("class", [])
+            if name == "comment-user-text":
+                tag_body = element if tag_body is None else tag_body
+                continue
+            elif name == "comment-title":
+                tag_user_title = element if tag_user_title is None else tag_user_title
+            elif name == "a":
+                if "comment_anchor" in classes:
+                    tag_id = element if tag_id is None else tag_id
+                elif "c-usernameBlock__userName" in classes:
+                    tag_user_name = element if tag_user_name is None else tag_user_name
+                elif "c-usernameBlock__displayName" in classes:
+                    tag_user_display_name = element if tag_user_display_name is None else tag_user_display_name
+                elif "comment-parent" in classes and attr_parent_href is None:
+                    attr_parent_href = get_attr(element, "href") if "href" in element.attrs else None
+            elif name == "img":
+                if "comment_useravatar" in classes:
+                    tag_avatar = element if tag_avatar is None else tag_avatar
+                elif "edited" in classes:
+                    tag_edited = element if tag_edited is None else tag_edited
+            elif name == "span" and "c-usernameBlock__symbol" in classes and tag_user_symbol is None:
+                if tag_user_name is not None and any(p is tag_user_name for p in element.parents):
+                    tag_user_symbol = element
+            stack.extend(reversed(element.contents))
+        elif isinstance(element, HTMLComment) and attr_parent_href is None and "comment-parent" in element:
+            # TODO: remove when they implement parent link
+            if m := comment_parent_regexp.search(element):
+                attr_parent_href = m[1]
 
     assert tag_id is not None, _raise_exception(ParsingError("Missing link tag"))
     assert tag_body is not None, _raise_exception(ParsingError("Missing body tag"))
@@ -775,12 +889,6 @@ def parse_comment_tag(tag: Tag) -> dict:
 
     attr_timestamp: Optional[str] = tag.attrs.get("data-timestamp")
     attr_avatar: Optional[str] = tag_avatar.attrs.get("src")
-    # TODO: update when they implement parent link
-    # attr_parent_href: Optional[str] = tag_parent_link.attrs.get("href") if tag_parent_link is not None else None
-    # TODO: remove when they implement parent link
-    attr_parent_href: Optional[str] = None
-    if m := search(r'<a class="comment-parent" href="(#cid:\d+)"', tag.decode_contents()):
-        attr_parent_href = m[1]
 
     assert attr_timestamp is not None, _raise_exception(ParsingError("Missing timestamp attribute"))
     assert attr_avatar is not None, _raise_exception(ParsingError("Missing user icon src attribute"))
@@ -806,7 +914,10 @@ def parse_comment_tag(tag: Tag) -> dict:
 
 
 def parse_comments(page: BeautifulSoup) -> list[Tag]:
-    return page.select("div.comment_container")
+    return [
+        t for t in page.descendants
+        if isinstance(t, Tag) and t.name == "div" and "comment_container" in t.attrs.get("class", ())
+    ]
 
 
 def parse_user_tag(user_tag: Tag) -> dict[str, Any]:
@@ -904,3 +1015,66 @@ def parse_watchlist(watch_page: BeautifulSoup) -> tuple[list[tuple[str, str]], O
         watches.append((status, username))
 
     return watches, next_page
+
+
+def parse_inbox_submissions(inbox_page: BeautifulSoup) -> dict[str, Any]:
+    tag_next_page: Optional[Tag] = next(
+        (a for a in inbox_page.select('a.button[href^="/msg/submissions/"]') if a.text.lower().startswith("next")),
+        None
+    )
+    next_page: str = get_attr(tag_next_page, "href").removeprefix("/msg/submissions/").strip("/") \
+        if tag_next_page else ""
+
+    return {
+        "figures": parse_submission_figures(inbox_page),
+        "next_page": next_page,
+    }
+
+
+def parse_inbox_journal(journal_tag: Tag) -> dict[str, Any]:
+    tag_id: Optional[Tag] = journal_tag.select_one('input[name="journals[]"]')
+    tag_title: Optional[Tag] = journal_tag.select_one('a[href^="/journal/"]')
+    tag_author: Optional[Tag] = journal_tag.select_one('a[href^="/user/"]')
+    tag_date: Optional[Tag] = journal_tag.select_one("span.popup_date")
+
+    assert tag_id is not None, _raise_exception(ParsingError("Missing ID tag"))
+    assert tag_title is not None, _raise_exception(ParsingError("Missing title tag"))
+    assert tag_author is not None, _raise_exception(ParsingError("Missing author tag"))
+    assert tag_date is not None, _raise_exception(ParsingError("Missing date tag"))
+
+    id_: int = int(get_attr(tag_id, "value") or 0)
+    title: str = tag_title.text.strip()
+    author: str = get_attr(tag_author, "href").removeprefix("/user/").strip("/")
+    author_display: str = tag_author.text.strip()
+    date: datetime = parse_date(
+        get_attr(tag_date, "title").strip()
+        if match(r"^[A-Za-z]+ \d+,.*$", get_attr(tag_date, "title"))
+        else tag_date.text.strip()
+    )
+
+    assert id_ != 0, _raise_exception(ParsingError("Missing ID"))
+
+    return {
+        "id": id_,
+        "title": title,
+        "author": author,
+        "author_display_name": author_display,
+        "date": date,
+    }
+
+
+def parse_inbox_journals(others_page: BeautifulSoup) -> list[Tag]:
+    return [t for t in others_page.select("#messages-journals li") if t.select_one('input[name="journals[]"]')]
+
+
+def parse_search_submissions(search_page: BeautifulSoup) -> dict[str, Any]:
+    figures: list[Tag] = parse_submission_figures(search_page)
+    last_page: bool = not figures or not any(
+        (b.text or b.attrs.get("value", "")).strip().lower().startswith("next")
+        for b in search_page.select("form button.button, form input.button[type='submit'], a.button")
+    )
+
+    return {
+        "figures": figures,
+        "last_page": last_page,
+    }
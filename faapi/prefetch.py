@@ -0,0 +1,168 @@
+from collections import deque
+from threading import Condition
+from threading import Thread
+from typing import Iterable
+from typing import Optional
+from typing import TYPE_CHECKING
+from typing import Union
+
+from .cache import ResponseCache
+from .connection import join_url
+from .metrics import measure
+from .parse import check_page_raise
+from .parse import get_attr
+from .parse import parse_page
+from .parse import Tag
+from .scheduler import priority
+
+if TYPE_CHECKING:
+    from .base import FAAPI
+
+prefetch_priority: int = -(1 << 30)  # Lower than any real request, even after aging
+
+
+class Prefetcher:
+    """
+    Fetch the pages that are likely to be requested next while the crawl delay slots are idle, and store them in the
+    response cache of the FAAPI object.
+
+    Prefetches wait in the scheduler with the lowest priority, so they only receive a slot when no real request is
+    waiting for one. The queue keeps the most recent suggestions, and the newest ones are fetched first. Only pages that
+    pass the page checks are cached, and each cached page answers a single request.
+    """
+
+    def __init__(
+        self, api: "FAAPI", *, max_queue: int = 32, submissions: bool = True, pages: bool = True,
+        authors: bool = False
+    ):
+        """
+        :param api: The FAAPI object used to fetch the pages.
+        :param max_queue: The maximum number of pages waiting to be fetched, the oldest are dropped first.
+        :param submissions: Whether to prefetch the previous and next submissions of a submission.
+        :param pages: Whether to prefetch the next page of galleries, scraps, favorites, journals, searches, and
+            browse listings.
+        :param authors: Whether to prefetch the user pages of the authors of the submissions in a listing.
+        """
+        self.api: "FAAPI" = api
+        self.submissions: bool = submissions
+        self.pages: bool = pages
+        self.authors: bool = authors
+        self.fetched: int = 0  # Pages fetched in advance
+        self.dropped: int = 0  # Suggestions dropped because the queue was full
+        self.api.response_cache = self.api.response_cache or ResponseCache()
+        self._queue: deque[tuple[str, dict[str, Union[str, bytes, int, float]]]] = deque(maxlen=max_queue)
+        self._condition: Condition = Condition()
+        self._running: bool = False
+        self._thread: Optional[Thread] = None
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(queued={len(self)}, fetched={self.fetched}, dropped={self.dropped})"
+
+    def add(self, path: str, **params: Union[str, bytes, int, float]):
+        """
+        Suggest a page to fetch in advance. Pages that are already cached or queued are ignored.
+
+        :param path: The path of the page.
+        :param params: The query parameters of the page.
+        """
+        cache: Optional[ResponseCache] = self.api.response_cache
+        if cache is not None and ResponseCache.key(path, params) in cache:
+            return
+        with self._condition:
+            if (path, params) in self._queue:
+                return
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append((path, params))
+            self._condition.notify()
+
+    def suggest_submission(self, prev_id: Optional[int], next_id: Optional[int]):
+        """
+        Suggest the neighbours of a submission.
+
+        :param prev_id: The ID of the previous submission, if any.
+        :param next_id: The ID of the next submission, if any.
+        """
+        if self.submissions:
+            for submission_id in (prev_id, next_id):
+                if submission_id:
+                    self.add(join_url("view", submission_id))
+
+    def suggest_listing(
+        self, next_path: Optional[str], figures: Iterable[Tag] = (), **params: Union[str, bytes, int, float]
+    ):
+        """
+        Suggest the next page of a listing, and the authors of its submissions.
+
+        :param next_path: The path of the next page, None if the listing has no next page.
+        :param figures: The submission figures of the listing.
+        :param params: The query parameters of the next page.
+        """
+        if self.authors:
+            for figure in figures:
+                if (tag_author := figure.select_one("figcaption a[href^='/user/']")) is not None:
+                    self.add(get_attr(tag_author, "href"))
+        if self.pages and next_path is not None:
+            self.add(next_path, **params)
+
+    def start(self) -> "Prefetcher":
+        """
+        Start fetching the queued pages in a background thread, and attach the prefetcher to the FAAPI object.
+
+        :return: The prefetcher itself.
+        """
+        with self._condition:
+            if self._running:
+                return self
+            self._running = True
+        self.api.prefetcher = self
+        self._thread = Thread(target=self._run, name="prefetcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the background thread and detach the prefetcher from the FAAPI object. Queued pages are discarded.
+        """
+        with self._condition:
+            self._running = False
+            self._queue.clear()
+            self._condition.notify_all()
+        if self.api.prefetcher is self:
+            self.api.prefetcher = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._queue:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                path, params = self._queue.pop()
+            self._fetch(path, params)
+
+    def _fetch(self, path: str, params: dict[str, Union[str, bytes, int, float]]):
+        cache: Optional[ResponseCache] = self.api.response_cache
+        if cache is None or (key := ResponseCache.key(path, params)) in cache:
+            return
+        generation: int = cache.generation
+        try:
+            with priority(prefetch_priority), measure("prefetch", self.api.observers):
+                response = self.api.get(path, **params)
+                response.raise_for_status()
+                # Error pages are sent with a 200 status, they must not be served again instead of a new request
+                check_page_raise(parse_page(response.content))
+        except Exception:
+            return
+        if cache.add(key, response, generation):
+            self.fetched += 1
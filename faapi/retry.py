@@ -0,0 +1,123 @@
+from http.client import IncompleteRead
+from random import uniform
+from threading import Lock
+from typing import Optional
+
+from requests.exceptions import ChunkedEncodingError
+from requests.exceptions import ConnectionError
+from requests.exceptions import HTTPError
+from requests.exceptions import Timeout
+
+from .exceptions import ServerError
+from .throttle import parse_retry_after
+
+transient_status_codes: tuple[int, ...] = (429, 500, 502, 503, 504, 520, 521, 522, 523, 524)
+
+
+class RetryStats:
+    """
+    Counters collected by a RetryPolicy.
+    """
+
+    def __init__(self):
+        self.retries: int = 0  # Total number of retried attempts
+        self.recovered: int = 0  # Calls that succeeded after at least one retry
+        self.exhausted: int = 0  # Calls that failed after using all the retries
+        self.permanent: int = 0  # Calls that failed with a non-transient error
+        self.wait: float = 0  # Total time spent waiting between retries (seconds)
+        self.errors: dict[str, int] = {}  # Retried errors by exception name
+        self._lock: Lock = Lock()
+
+    def __iter__(self):
+        yield "retries", self.retries
+        yield "recovered", self.recovered
+        yield "exhausted", self.exhausted
+        yield "permanent", self.permanent
+        yield "wait", self.wait
+        yield "errors", dict(self.errors)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return " ".join(f"{k}={v}" for k, v in self)
+
+    def record_retry(self, err: BaseException, wait: float):
+        with self._lock:
+            self.retries += 1
+            self.wait += wait
+            self.errors[type(err).__name__] = self.errors.get(type(err).__name__, 0) + 1
+
+    def record_recovered(self):
+        with self._lock:
+            self.recovered += 1
+
+    def record_exhausted(self):
+        with self._lock:
+            self.exhausted += 1
+
+    def record_permanent(self):
+        with self._lock:
+            self.permanent += 1
+
+
+class RetryPolicy:
+    """
+    Decides which errors are transient and how long to wait before retrying them.
+    """
+
+    def __init__(self, max_retries: int = 3, *, backoff_factor: float = 2, backoff_max: float = 120,
+                 jitter: float = 0.5):
+        """
+        :param max_retries: The maximum number of retries for a single call (0 disables retries).
+        :param backoff_factor: The base wait time in seconds, doubled at every retry.
+        :param backoff_max: The maximum wait time in seconds before jitter is applied.
+        :param jitter: The maximum fraction of the wait time that is randomly added to it.
+        """
+        self.max_retries: int = max_retries
+        self.backoff_factor: float = backoff_factor
+        self.backoff_max: float = backoff_max
+        self.jitter: float = jitter
+        self.stats: RetryStats = RetryStats()
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(max_retries={self.max_retries}) {self.stats}"
+
+    @staticmethod
+    def is_transient(err: BaseException) -> bool:
+        """
+        Check whether an error is transient, and the call that raised it can be retried.
+
+        :param err: The error raised by the call.
+        :return: True if the error is transient, False otherwise.
+        """
+        if isinstance(err, HTTPError):
+            return err.response is not None and err.response.status_code in transient_status_codes
+        return isinstance(err, (ServerError, Timeout, ConnectionError, ChunkedEncodingError, IncompleteRead))
+
+    def backoff(self, retry: int, crawl_delay: float = 0) -> float:
+        """
+        Compute the wait time before a retry. The wait is never shorter than the crawl delay.
+
+        :param retry: The number of retries already made (starting from 0).
+        :param crawl_delay: The crawl delay in use.
+        :return: The wait time in seconds.
+        """
+        wait: float = max(crawl_delay, min(self.backoff_max, self.backoff_factor * (2 ** retry)))
+        return wait + uniform(0, wait * self.jitter)
+
+    def retry_after(self, err: BaseException) -> Optional[float]:
+        """
+        Get the wait time requested by the server with a Retry-After header, if any.
+
+        :param err: The error raised by the call.
+        :return: The wait time in seconds, or None if the server did not set one.
+        """
+        if not isinstance(err, HTTPError) or err.response is None:
+            return None
+        if (wait := parse_retry_after(err.response.headers.get("Retry-After"))) is None:
+            return None
+        return min(wait, self.backoff_max)
@@ -0,0 +1,154 @@
+from re import compile as re_compile
+from re import Pattern
+from threading import Event
+from threading import Thread
+from typing import Callable
+from typing import NamedTuple
+from typing import Optional
+from urllib.robotparser import RobotFileParser
+from weakref import ref
+
+max_decisions: int = 1 << 12
+plain_path: Pattern = re_compile(r"/(?!/)[A-Za-z0-9_.~/-]*")  # Paths that RobotFileParser does not change
+
+
+class _Compiled(NamedTuple):
+    constant: Optional[bool]  # Decision for every path, if the rules do not depend on it
+    rules: tuple[tuple[str, bool], ...]  # Path prefixes and their allowance, the first match counts
+    crawl_delay: float
+    lengths: dict[str, int]  # Length of the path prefix that decides the rules for each first path segment
+    decisions: dict[str, bool]  # Decisions for each deciding path prefix
+
+
+class RobotsPolicy:
+    """
+    The rules of a robots.txt resolved once for a user agent.
+
+    The entry that applies to the user agent and its crawl delay are found when the policy is compiled, and the
+    decision for each path is cached under the shortest path prefix that decides it, so checking a path usually costs
+    two dictionary lookups. Paths that need quoting are checked with RobotFileParser directly.
+    """
+
+    def __init__(self, robots: RobotFileParser, user_agent: str):
+        """
+        :param robots: The parsed robots.txt.
+        :param user_agent: The user agent the rules are resolved for.
+        """
+        self.robots: RobotFileParser = robots
+        self.user_agent: str = user_agent
+        self.refreshes: int = 0  # Times the robots.txt was replaced
+        self._compiled: _Compiled = self._compile(robots, user_agent)
+        self._stop: Event = Event()
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({self.user_agent!r}, crawl_delay={self.crawl_delay})"
+
+    @staticmethod
+    def _compile(robots: RobotFileParser, user_agent: str) -> _Compiled:
+        constant: Optional[bool] = None
+        if getattr(robots, "disallow_all"):
+            constant = False
+        elif getattr(robots, "allow_all"):
+            constant = True
+        elif not robots.mtime():
+            constant = False
+        entries: list = [e for e in getattr(robots, "entries") if e.applies_to(user_agent)]
+        entry = entries[0] if entries else getattr(robots, "default_entry")
+        rules: tuple[tuple[str, bool], ...] = tuple(
+            ("" if line.path == "*" else line.path, line.allowance) for line in (entry.rulelines if entry else [])
+        )
+        if constant is None and not rules:
+            constant = True
+        return _Compiled(constant, rules, float(robots.crawl_delay(user_agent) or 1), {}, {})
+
+    def compile(self):
+        """
+        Resolve the rules and crawl delay again, after the robots.txt object or the user agent were changed.
+        """
+        self._compiled = self._compile(self.robots, self.user_agent)
+
+    def refresh(self, robots: RobotFileParser, user_agent: Optional[str] = None):
+        """
+        Replace the robots.txt and compile its rules. Checks made at the same time use either the old or the new rules.
+
+        :param robots: The new parsed robots.txt.
+        :param user_agent: The new user agent, if it changed.
+        """
+        user_agent = user_agent or self.user_agent
+        compiled: _Compiled = self._compile(robots, user_agent)
+        self.robots, self.user_agent, self._compiled = robots, user_agent, compiled
+        self.refreshes += 1
+
+    @property
+    def crawl_delay(self) -> float:
+        """
+        Crawl delay for the user agent (defaults to 1 second)
+        """
+        return self._compiled.crawl_delay
+
+    def can_fetch(self, path: str) -> bool:
+        """
+        Check whether a path is allowed for the user agent.
+
+        :param path: The path to check, starting with a slash.
+        :return: True if the path is allowed, False otherwise.
+        """
+        compiled: _Compiled = self._compiled
+        if compiled.constant is not None:
+            return compiled.constant
+        segment: str = path[:path.find("/", 1) + 1] or path
+        if (length := compiled.lengths.get(segment)) is None:
+            if not plain_path.fullmatch(path):
+                return self.robots.can_fetch(self.user_agent, path)
+            # Only the rules that start with the segment, or that the segment starts with, can match the path
+            length = compiled.lengths[segment] = max(
+                [len(segment)] + [len(r) for r, _ in compiled.rules if segment.startswith(r) or r.startswith(segment)]
+            )
+        if (allowed := compiled.decisions.get(key := path[:length])) is None:
+            if not plain_path.fullmatch(path):
+                return self.robots.can_fetch(self.user_agent, path)
+            allowed = next((a for r, a in compiled.rules if key.startswith(r)), True)
+            if len(compiled.decisions) >= max_decisions:
+                compiled.decisions.clear()
+            compiled.decisions[key] = allowed
+        return allowed
+
+    def start_refresh(self, fetch: Callable[[], RobotFileParser], interval: float) -> Thread:
+        """
+        Refresh the robots.txt periodically in a background thread. Failed refreshes keep the current rules.
+        The thread stops when stop_refresh is called or, at the next refresh, when the policy was deleted. The thread
+        keeps fetch alive, so fetch must not hold a strong reference to the policy or to an object that owns it.
+
+        :param fetch: The function that downloads and parses the robots.txt.
+        :param interval: The time between two refreshes (seconds).
+        :return: The background thread.
+        """
+        self._stop.set()
+        self._stop = stop = Event()
+        policy_ref = ref(self)
+
+        def run():
+            while not stop.wait(interval):
+                if policy_ref() is None:
+                    return
+                try:
+                    robots: RobotFileParser = fetch()
+                except Exception:
+                    continue
+                if (policy := policy_ref()) is None:
+                    return
+                policy.refresh(robots)
+                del policy
+
+        thread: Thread = Thread(target=run, name="robots-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def stop_refresh(self):
+        """
+        Stop the background refresh of the robots.txt.
+        """
+        self._stop.set()
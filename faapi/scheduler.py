@@ -0,0 +1,131 @@
+from asyncio import get_running_loop
+from contextlib import contextmanager
+from contextvars import ContextVar
+from contextvars import copy_context
+from itertools import count
+from threading import Condition
+from time import time
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+
+
+class RequestPriority(NamedTuple):
+    priority: int  # Higher values are served first
+    deadline: Optional[float]  # UNIX time by which the request should be sent
+
+
+_request_priority: ContextVar[RequestPriority] = ContextVar("_request_priority", default=RequestPriority(0, None))
+
+
+@contextmanager
+def priority(value: int, deadline: Optional[float] = None) -> Iterator[None]:
+    """
+    Set the priority of the requests made inside the block, in the current thread or task.
+
+    :param value: The priority, requests with higher values are sent first (the default priority is 0).
+    :param deadline: The time by which the requests should be sent (UNIX time), requests close to their deadline are
+        sent before all the others.
+    """
+    token = _request_priority.set(RequestPriority(value, deadline))
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def current_priority() -> RequestPriority:
+    """
+    Get the priority of the requests made in the current context.
+
+    :return: A RequestPriority object.
+    """
+    return _request_priority.get()
+
+
+class _Waiter(NamedTuple):
+    priority: int
+    deadline: Optional[float]
+    arrival: float
+    sequence: int
+
+
+class Scheduler:
+    """
+    Hand out request slots separated by the crawl delay, to the waiting request with the highest priority.
+
+    Requests that have waited longer gain one priority level every aging seconds, so background requests are never
+    starved by a constant flow of higher priority ones. Requests whose deadline is closer than the crawl delay are
+    served before all the others, earliest deadline first. Requests with the same priority are served in arrival order.
+    """
+
+    def __init__(self, last_get: float = 0, aging: float = 30):
+        """
+        :param last_get: The time of the last request (UNIX time).
+        :param aging: The waiting time after which a request gains one priority level (seconds).
+        """
+        self.last_get: float = last_get  # Time of the last slot (UNIX time)
+        self.aging: float = aging
+        self.served: int = 0  # Slots handed out
+        self._waiters: list[_Waiter] = []
+        self._sequence: count = count()
+        self._condition: Condition = Condition()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._waiters)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}(waiting={len(self)}, served={self.served})"
+
+    def _rank(self, waiter: _Waiter, now: float, delay: float) -> tuple:
+        if waiter.deadline is not None and waiter.deadline - now <= delay:
+            return 0, waiter.deadline, waiter.sequence
+        return 1, -(waiter.priority + (now - waiter.arrival) / self.aging), waiter.sequence
+
+    def acquire(self, delay: float, request_priority: Optional[RequestPriority] = None) -> float:
+        """
+        Wait for a request slot.
+
+        :param delay: The minimum time between two slots (seconds).
+        :param request_priority: The priority of the request (defaults to the priority of the current context).
+        :return: The time waited (seconds).
+        """
+        request_priority = request_priority or current_priority()
+        start: float = time()
+        waiter: _Waiter = _Waiter(request_priority.priority, request_priority.deadline, start, next(self._sequence))
+        with self._condition:
+            self._waiters.append(waiter)
+            try:
+                while True:
+                    now: float = time()
+                    best: _Waiter = min(self._waiters, key=lambda w: self._rank(w, now, delay))
+                    if best is waiter and (wait := self.last_get + delay - now) <= 0:
+                        break
+                    elif best is waiter:
+                        self._condition.wait(wait)
+                    else:
+                        # The order only changes when a request leaves, or when this request gets close to its deadline
+                        self._condition.wait(
+                            max(waiter.deadline - delay - now, 0.01) if waiter.deadline is not None else self.aging
+                        )
+                self.last_get = slot = time()
+                self.served += 1
+            finally:
+                self._waiters.remove(waiter)
+                self._condition.notify_all()
+        return slot - start
+
+    async def acquire_async(self, delay: float, request_priority: Optional[RequestPriority] = None) -> float:
+        """
+        Wait for a request slot without blocking the event loop. The wait happens in the default executor of the loop.
+
+        :param delay: The minimum time between two slots (seconds).
+        :param request_priority: The priority of the request (defaults to the priority of the current context).
+        :return: The time waited (seconds).
+        """
+        context = copy_context()
+        return await get_running_loop().run_in_executor(None, context.run, self.acquire, delay, request_priority)
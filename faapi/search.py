@@ -0,0 +1,113 @@
+from datetime import date
+from typing import Iterable
+from typing import Literal
+from typing import Optional
+from typing import Union
+
+from .exceptions import _raise_exception
+
+Rating = Literal["general", "mature", "adult"]
+SubmissionType = Literal["art", "music", "flash", "story", "photo", "poetry"]
+DateRange = Literal["1day", "3days", "7days", "30days", "90days", "1year", "3years", "5years", "all"]
+OrderBy = Literal["relevancy", "date", "popularity"]
+SearchMode = Literal["all", "any", "extended"]
+
+ratings: tuple[Rating, ...] = ("general", "mature", "adult")
+submission_types: tuple[SubmissionType, ...] = ("art", "music", "flash", "story", "photo", "poetry")
+date_ranges: tuple[DateRange, ...] = ("1day", "3days", "7days", "30days", "90days", "1year", "3years", "5years", "all")
+orders: tuple[OrderBy, ...] = ("relevancy", "date", "popularity")
+search_modes: tuple[SearchMode, ...] = ("all", "any", "extended")
+
+
+def _check_ratings(rating: Iterable[Rating]) -> set[Rating]:
+    rating_set: set[Rating] = set(rating)
+    assert rating_set, _raise_exception(ValueError("At least one rating is needed"))
+    assert rating_set <= set(ratings), _raise_exception(ValueError(f"Unknown ratings {rating_set - set(ratings)}"))
+    return rating_set
+
+
+def search_params(
+    query: str, page: int = 1, *,
+    rating: Iterable[Rating] = ratings, type_: Iterable[SubmissionType] = submission_types,
+    date_range: DateRange = "all", date_from: Optional[date] = None, date_to: Optional[date] = None,
+    order_by: OrderBy = "relevancy", ascending: bool = False, mode: SearchMode = "extended"
+) -> dict[str, Union[str, int]]:
+    """
+    Create the query parameters of a search page.
+
+    :param query: The search query.
+    :param page: The page to fetch.
+    :param rating: The ratings of the submissions.
+    :param type_: The types of the submissions.
+    :param date_range: The upload date range, ignored if date_from or date_to are set.
+    :param date_from: The first upload date.
+    :param date_to: The last upload date.
+    :param order_by: The order of the results.
+    :param ascending: Whether to sort the results in ascending order.
+    :param mode: How the query words are matched (all, any, or extended syntax).
+    :return: A dictionary of query parameters.
+    """
+    type_set: set[SubmissionType] = set(type_)
+    assert query.strip(), _raise_exception(ValueError("Empty search query"))
+    assert int(page) > 0, _raise_exception(ValueError("Page must be greater than 0"))
+    assert type_set, _raise_exception(ValueError("At least one type is needed"))
+    assert type_set <= set(submission_types), \
+        _raise_exception(ValueError(f"Unknown types {type_set - set(submission_types)}"))
+    assert date_range in date_ranges, _raise_exception(ValueError(f"Unknown date range {date_range!r}"))
+    assert order_by in orders, _raise_exception(ValueError(f"Unknown order {order_by!r}"))
+    assert mode in search_modes, _raise_exception(ValueError(f"Unknown search mode {mode!r}"))
+    assert date_from is None or date_to is None or date_from <= date_to, \
+        _raise_exception(ValueError("date_from must not be after date_to"))
+
+    rating_set: set[Rating] = _check_ratings(rating)
+    params: dict[str, Union[str, int]] = {
+        "q": query.strip(),
+        "page": int(page),
+        "order-by": order_by,
+        "order-direction": "asc" if ascending else "desc",
+        "mode": mode,
+        **{f"rating-{r}": 1 for r in ratings if r in rating_set},
+        **{f"type-{t}": 1 for t in submission_types if t in type_set},
+    }
+
+    if date_from is not None or date_to is not None:
+        params["range"] = "manual"
+        params["range_from"] = date_from.isoformat() if date_from else ""
+        params["range_to"] = date_to.isoformat() if date_to else ""
+    else:
+        params["range"] = date_range
+
+    return params
+
+
+def browse_params(
+    page: int = 1, *, rating: Iterable[Rating] = ratings, category: int = 1, art_type: int = 1, species: int = 1,
+    gender: int = 0, per_page: Literal[24, 48, 72] = 72
+) -> dict[str, Union[str, int]]:
+    """
+    Create the query parameters of a browse page.
+    Category, art type, species, and gender are the IDs used by the browse form (1, 1, 1, and 0 select all).
+
+    :param page: The page to fetch.
+    :param rating: The ratings of the submissions.
+    :param category: The ID of the category.
+    :param art_type: The ID of the art type (theme).
+    :param species: The ID of the species.
+    :param gender: The ID of the gender.
+    :param per_page: The number of submissions on each page.
+    :return: A dictionary of query parameters.
+    """
+    assert int(page) > 0, _raise_exception(ValueError("Page must be greater than 0"))
+    assert per_page in (24, 48, 72), _raise_exception(ValueError("per_page must be 24, 48, or 72"))
+    assert min(category, art_type, species) > 0 and gender >= 0, _raise_exception(ValueError("Invalid filter ID"))
+
+    rating_set: set[Rating] = _check_ratings(rating)
+    return {
+        "cat": int(category),
+        "atype": int(art_type),
+        "species": int(species),
+        "gender": int(gender),
+        "perpage": per_page,
+        "page": int(page),
+        **{f"rating_{r}": 1 for r in ratings if r in rating_set},
+    }
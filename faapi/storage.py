@@ -0,0 +1,377 @@
+from datetime import datetime
+from itertools import islice
+from json import dumps
+from pathlib import Path
+from sqlite3 import connect
+from sqlite3 import Connection
+from threading import Lock
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import TypeVar
+from typing import Union
+
+from .comment import Comment
+from .comment import flatten_comments
+from .exceptions import _raise_exception
+from .journal import Journal
+from .journal import JournalPartial
+from .parse import username_url
+from .submission import Submission
+from .submission import SubmissionPartial
+from .user import User
+from .user import UserPartial
+
+T = TypeVar("T")
+
+schema: tuple[str, ...] = (
+    """create table if not exists users (
+        name_url text primary key,
+        name text not null,
+        display_name text,
+        status text,
+        title text,
+        join_date text,
+        profile text,
+        views integer,
+        submissions integer,
+        favorites integer,
+        comments_earned integer,
+        comments_made integer,
+        journals integer,
+        watched_by integer,
+        watching integer,
+        info text,
+        contacts text,
+        avatar_url text,
+        banner_url text
+    ) without rowid""",
+    """create table if not exists submissions (
+        id integer primary key,
+        title text not null,
+        author text not null,
+        date text,
+        category text,
+        species text,
+        gender text,
+        rating text,
+        views integer,
+        comments integer,
+        favorites integer,
+        type text,
+        description text,
+        footer text,
+        mentions text,
+        folder text,
+        file_url text,
+        thumbnail_url text,
+        prev integer,
+        next integer
+    )""",
+    """create table if not exists tags (
+        submission_id integer not null,
+        position integer not null,
+        tag text not null,
+        primary key (submission_id, position)
+    ) without rowid""",
+    "create index if not exists tags_tag on tags (tag)",
+    """create table if not exists user_folders (
+        submission_id integer not null,
+        position integer not null,
+        name text not null,
+        url text not null,
+        "group" text,
+        primary key (submission_id, position)
+    ) without rowid""",
+    """create table if not exists journals (
+        id integer primary key,
+        title text not null,
+        author text not null,
+        rating text,
+        date text,
+        comments integer,
+        content text,
+        mentions text,
+        header text,
+        footer text
+    )""",
+    """create table if not exists comments (
+        parent_type text not null,
+        parent_id integer not null,
+        id integer not null,
+        reply_to integer,
+        author text not null,
+        date text,
+        text text,
+        edited integer,
+        hidden integer,
+        primary key (parent_type, id)
+    ) without rowid""",
+    "create index if not exists comments_parent on comments (parent_type, parent_id)",
+    "create index if not exists submissions_author on submissions (author)",
+    "create index if not exists journals_author on journals (author)",
+)
+
+
+def _upsert(table: str, columns: tuple[str, ...], keys: tuple[str, ...]) -> str:
+    # Columns set to NULL by partial objects keep the value already stored
+    return f"insert into {table} ({', '.join(columns)}) values ({', '.join('?' * len(columns))}) " \
+           f"on conflict ({', '.join(keys)}) do update set " + \
+        ", ".join(f"{c} = coalesce(excluded.{c}, {c})" for c in columns if c not in keys)
+
+
+users_columns: tuple[str, ...] = (
+    "name_url", "name", "display_name", "status", "title", "join_date", "profile",
+    "views", "submissions", "favorites", "comments_earned", "comments_made", "journals", "watched_by", "watching",
+    "info", "contacts", "avatar_url", "banner_url",
+)
+submissions_columns: tuple[str, ...] = (
+    "id", "title", "author", "date", "category", "species", "gender", "rating", "views", "comments", "favorites",
+    "type", "description", "footer", "mentions", "folder", "file_url", "thumbnail_url", "prev", "next",
+)
+journals_columns: tuple[str, ...] = (
+    "id", "title", "author", "rating", "date", "comments", "content", "mentions", "header", "footer",
+)
+comments_columns: tuple[str, ...] = (
+    "parent_type", "parent_id", "id", "reply_to", "author", "date", "text", "edited", "hidden",
+)
+
+users_upsert: str = _upsert("users", users_columns, ("name_url",))
+submissions_upsert: str = _upsert("submissions", submissions_columns, ("id",))
+journals_upsert: str = _upsert("journals", journals_columns, ("id",))
+comments_upsert: str = _upsert("comments", comments_columns, ("parent_type", "id"))
+
+
+def _batches(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator: Iterator[T] = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _date(date: Union[datetime, str]) -> Optional[str]:
+    # JournalPartial authors without a join date use an empty string
+    if not isinstance(date, datetime):
+        return date or None
+    return None if date == datetime.fromtimestamp(0) else date.isoformat()
+
+
+def _user_row(user: Union[User, UserPartial]) -> tuple:
+    if isinstance(user, User):
+        return (
+            username_url(user.name), user.name, user.display_name, user.status, user.title, _date(user.join_date),
+            user.profile, *user.stats, dumps(user.info), dumps(user.contacts), user.avatar_url, user.banner_url,
+        )
+    return (
+        username_url(user.name), user.name, user.display_name or None, user.status or None, user.title or None,
+        _date(user.join_date), None, *(None,) * 8, None, None, user.avatar_url or None, None,
+    )
+
+
+def _user_rows(users: Iterable[Union[User, UserPartial]]) -> list[tuple]:
+    # Listings repeat the same author on every row, only the last occurrence of each user is written
+    return list({row[0]: row for row in map(_user_row, users)}.values())
+
+
+def _submission_row(submission: Union[Submission, SubmissionPartial]) -> tuple:
+    if isinstance(submission, Submission):
+        return (
+            submission.id, submission.title, username_url(submission.author.name), _date(submission.date),
+            submission.category, submission.species, submission.gender, submission.rating, *submission.stats,
+            submission.type, submission.description, submission.footer, dumps(submission.mentions),
+            submission.folder, submission.file_url, submission.thumbnail_url, submission.prev, submission.next,
+        )
+    return (
+        submission.id, submission.title, username_url(submission.author.name), None, None, None, None,
+        submission.rating or None, None, None, None, submission.type or None, None, None, None, None, None,
+        submission.thumbnail_url or None, None, None,
+    )
+
+
+def _journal_row(journal: Union[Journal, JournalPartial]) -> tuple:
+    return (
+        journal.id, journal.title, username_url(journal.author.name), journal.rating or None, _date(journal.date),
+        journal.stats.comments, journal.content or None, dumps(journal.mentions),
+        journal.header if isinstance(journal, Journal) else None,
+        journal.footer if isinstance(journal, Journal) else None,
+    )
+
+
+def _comment_row(comment: Comment) -> tuple:
+    reply_to: Optional[int] = comment.reply_to.id if isinstance(comment.reply_to, Comment) else comment.reply_to
+    return (
+        "journal" if isinstance(comment.parent, Journal) else "submission", comment.parent.id if comment.parent else 0,
+        comment.id, reply_to, username_url(comment.author.name), _date(comment.date), comment.text,
+        comment.edited, comment.hidden,
+    )
+
+
+class Database:
+    """
+    Store users, submissions, journals, and comments in a SQLite database.
+
+    Objects are written in batches with a single transaction for each call, and existing rows are updated in place.
+    Partial objects only update the columns they contain, so saving a SubmissionPartial after a Submission does not
+    remove the information of the latter.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", *, batch_size: int = 1000):
+        """
+        :param path: The path to the database file, ":memory:" for a database that is not saved to disk.
+        :param batch_size: The number of rows written with each executemany call.
+        """
+        self.path: Union[str, Path] = path
+        self.batch_size: int = batch_size
+        self.connection: Connection = connect(path, check_same_thread=False)
+        self._lock: Lock = Lock()
+
+        with self._lock, self.connection:
+            self.connection.execute("pragma journal_mode = wal")
+            self.connection.execute("pragma synchronous = normal")
+            for statement in schema:
+                self.connection.execute(statement)
+
+    def __enter__(self) -> "Database":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({str(self.path)!r})"
+
+    def close(self):
+        """
+        Close the connection to the database.
+        """
+        with self._lock:
+            self.connection.close()
+
+    def _write(self, statement: str, rows: Iterable[tuple]):
+        for batch in _batches(rows, self.batch_size):
+            self.connection.executemany(statement, batch)
+
+    def save_users(self, users: Iterable[Union[User, UserPartial]]):
+        """
+        Insert or update users.
+
+        :param users: The User or UserPartial objects to save.
+        """
+        with self._lock, self.connection:
+            self._write(users_upsert, map(_user_row, users))
+
+    def save_submissions(self, submissions: Iterable[Union[Submission, SubmissionPartial]]):
+        """
+        Insert or update submissions together with their authors. The tags, user folders, and comments of Submission
+        objects replace those already stored.
+
+        :param submissions: The Submission or SubmissionPartial objects to save.
+        """
+        with self._lock, self.connection:
+            for batch in _batches(submissions, self.batch_size):
+                self.connection.executemany(users_upsert, _user_rows(s.author for s in batch))
+                self.connection.executemany(submissions_upsert, map(_submission_row, batch))
+                full: list[Submission] = [s for s in batch if isinstance(s, Submission)]
+                if not full:
+                    continue
+                self.connection.executemany("delete from tags where submission_id = ?", ((s.id,) for s in full))
+                self.connection.executemany(
+                    "insert into tags (submission_id, position, tag) values (?, ?, ?)",
+                    ((s.id, i, t) for s in full for i, t in enumerate(s.tags))
+                )
+                self.connection.executemany(
+                    "delete from user_folders where submission_id = ?", ((s.id,) for s in full)
+                )
+                self.connection.executemany(
+                    'insert into user_folders (submission_id, position, name, url, "group") values (?, ?, ?, ?, ?)',
+                    ((s.id, i, *f) for s in full for i, f in enumerate(s.user_folders))
+                )
+                self.connection.executemany(
+                    "delete from comments where parent_type = 'submission' and parent_id = ?", ((s.id,) for s in full)
+                )
+                self._write_comments(c for s in full for c in flatten_comments(s.comments))
+
+    def save_journals(self, journals: Iterable[Union[Journal, JournalPartial]]):
+        """
+        Insert or update journals together with their authors. The comments of Journal objects replace those already
+        stored.
+
+        :param journals: The Journal or JournalPartial objects to save.
+        """
+        with self._lock, self.connection:
+            for batch in _batches(journals, self.batch_size):
+                self.connection.executemany(users_upsert, _user_rows(j.author for j in batch))
+                self.connection.executemany(journals_upsert, map(_journal_row, batch))
+                full: list[Journal] = [j for j in batch if isinstance(j, Journal)]
+                self.connection.executemany(
+                    "delete from comments where parent_type = 'journal' and parent_id = ?", ((j.id,) for j in full)
+                )
+                self._write_comments(c for j in full for c in flatten_comments(j.comments))
+
+    def save_comments(self, comments: Iterable[Comment]):
+        """
+        Insert or update comments and their replies together with their authors. Comments are stored under the
+        submission or journal they belong to, so their parent must be set.
+
+        :param comments: The Comment objects to save.
+        """
+        with self._lock, self.connection:
+            self._write_comments(flatten_comments(list(comments)))
+
+    def _write_comments(self, comments: Iterable[Comment]):
+        for batch in _batches(comments, self.batch_size):
+            assert all(c.parent is not None for c in batch), _raise_exception(ValueError("comments must have a parent"))
+            self.connection.executemany(users_upsert, _user_rows(c.author for c in batch))
+            self.connection.executemany(comments_upsert, map(_comment_row, batch))
+
+    def _stored(self, table: str, column: str, values: Iterable[Any]) -> set:
+        found: set = set()
+        with self._lock:
+            # Stay below the default limit of 999 variables of older SQLite versions
+            for batch in _batches(values, 900):
+                found.update(r for [r] in self.connection.execute(
+                    f"select {column} from {table} where {column} in ({', '.join('?' * len(batch))})", batch
+                ))
+        return found
+
+    def stored_submissions(self, submission_ids: Iterable[int]) -> set[int]:
+        """
+        Find which submissions are already stored.
+
+        :param submission_ids: The IDs of the submissions to check.
+        :return: The IDs that are stored in the database.
+        """
+        return self._stored("submissions", "id", submission_ids)
+
+    def stored_journals(self, journal_ids: Iterable[int]) -> set[int]:
+        """
+        Find which journals are already stored.
+
+        :param journal_ids: The IDs of the journals to check.
+        :return: The IDs that are stored in the database.
+        """
+        return self._stored("journals", "id", journal_ids)
+
+    def stored_users(self, usernames: Iterable[str]) -> set[str]:
+        """
+        Find which users are already stored. The usernames are compared in their URL form.
+
+        :param usernames: The names of the users to check.
+        :return: The URL-safe usernames that are stored in the database.
+        """
+        return self._stored("users", "name_url", map(username_url, usernames))
+
+    def count(self, table: str) -> int:
+        """
+        Count the rows of a table.
+
+        :param table: The name of the table (users, submissions, tags, user_folders, journals, or comments).
+        :return: The number of rows.
+        """
+        assert table in ("users", "submissions", "tags", "user_folders", "journals", "comments"), \
+            _raise_exception(ValueError(f"unknown table {table!r}"))
+        with self._lock:
+            return self.connection.execute(f"select count(*) from {table}").fetchone()[0]
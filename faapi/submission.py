@@ -1,10 +1,13 @@
 from collections import namedtuple
 from datetime import datetime
+from typing import Any
 from typing import Optional
+from typing import TYPE_CHECKING
 
 from .connection import join_url
 from .connection import root
 from .exceptions import _raise_exception
+from .metrics import phase
 from .parse import BeautifulSoup
 from .parse import check_page_raise
 from .parse import html_to_bbcode
@@ -14,6 +17,9 @@ from .parse import parse_submission_page
 from .parse import Tag
 from .user import UserPartial
 
+if TYPE_CHECKING:
+    from .comment import Comment
+
 
 class SubmissionStats(namedtuple("SubmissionStats", ["views", "comments", "favorites"])):
     """
@@ -86,6 +92,9 @@ class SubmissionBase:
         yield "title", self.title
         yield "author", dict(self.author)
 
+    def __getstate__(self) -> dict[str, Any]:
+        return {k: None if isinstance(v, Tag) else v for k, v in self.__dict__.items()}
+
     def __repr__(self):
         return self.__str__()
 
@@ -131,6 +140,23 @@ class SubmissionPartial(SubmissionBase):
         yield "type", self.type
         yield "thumbnail_url", self.thumbnail_url
 
+    @classmethod
+    def from_dict(cls, submission_dict: dict[str, Any]) -> "SubmissionPartial":
+        """
+        Create a submission from a dictionary with the same keys as the one returned by dict().
+
+        :param submission_dict: The dictionary containing the submission information.
+        :return: A SubmissionPartial object.
+        """
+        submission: SubmissionPartial = cls()
+        submission.id = submission_dict["id"]
+        submission.title = submission_dict["title"]
+        submission.author = UserPartial.from_dict(submission_dict["author"])
+        submission.rating = submission_dict["rating"]
+        submission.type = submission_dict["type"]
+        submission.thumbnail_url = submission_dict["thumbnail_url"]
+        return submission
+
     def parse(self, submission_figure: Optional[Tag] = None):
         """
         Parse a submission figure Tag, overrides any information already present in the object.
@@ -159,9 +185,10 @@ class Submission(SubmissionBase):
     Contains complete submission information gathered from submission pages, including comments.
     """
 
-    def __init__(self, submission_page: Optional[BeautifulSoup] = None):
+    def __init__(self, submission_page: Optional[BeautifulSoup] = None, *, parse_comments: bool = True):
         """
         :param submission_page: The page from which to parse the submission information.
+        :param parse_comments: Whether to parse the comments with the submission, or on first access to comments.
         """
         assert submission_page is None or isinstance(submission_page, BeautifulSoup), \
             _raise_exception(TypeError(f"submission_page must be {None} or {BeautifulSoup.__name__}"))
@@ -188,10 +215,9 @@ class Submission(SubmissionBase):
         self.next: Optional[int] = None
         self.favorite: bool = False
         self.favorite_toggle_link: str = ""
-        from .comment import Comment
-        self.comments: list[Comment] = []
+        self._comments: Optional[list[Comment]] = []
 
-        self.parse()
+        self.parse(parse_comments=parse_comments)
 
     def __iter__(self):
         yield "id", self.id
@@ -237,11 +263,68 @@ class Submission(SubmissionBase):
         """
         return html_to_bbcode(self.footer)
 
-    def parse(self, submission_page: Optional[BeautifulSoup] = None):
+    @classmethod
+    def from_dict(cls, submission_dict: dict[str, Any]) -> "Submission":
+        """
+        Create a submission from a dictionary with the same keys as the one returned by dict(), including the comments.
+
+        :param submission_dict: The dictionary containing the submission information.
+        :return: A Submission object.
+        """
+        from .comment import Comment
+        submission: Submission = cls()
+        submission.id = submission_dict["id"]
+        submission.title = submission_dict["title"]
+        submission.author = UserPartial.from_dict(submission_dict["author"])
+        submission.date = submission_dict["date"]
+        submission.tags = list(submission_dict["tags"])
+        submission.category = submission_dict["category"]
+        submission.species = submission_dict["species"]
+        submission.gender = submission_dict["gender"]
+        submission.rating = submission_dict["rating"]
+        submission.stats = SubmissionStats(**submission_dict["stats"])
+        submission.type = submission_dict["type"]
+        submission.description = submission_dict["description"]
+        submission.footer = submission_dict["footer"]
+        submission.mentions = list(submission_dict["mentions"])
+        submission.folder = submission_dict["folder"]
+        submission.user_folders = [SubmissionUserFolder(**f) for f in submission_dict["user_folders"]]
+        submission.file_url = submission_dict["file_url"]
+        submission.thumbnail_url = submission_dict["thumbnail_url"]
+        submission.prev = submission_dict["prev"]
+        submission.next = submission_dict["next"]
+        submission.favorite = submission_dict["favorite"]
+        submission.favorite_toggle_link = submission_dict["favorite_toggle_link"]
+        submission.comments = [Comment.from_dict(c, submission) for c in submission_dict["comments"]]
+        return submission
+
+    def __getstate__(self) -> dict[str, Any]:
+        state: dict[str, Any] = super().__getstate__()
+        state["_comments"] = self.comments
+        return state
+
+    @property
+    def comments(self) -> list["Comment"]:
+        """
+        The comments of the submission, parsed from the submission page on first access if they were not parsed with
+        the rest of the submission
+
+        :return: A tree-structured list of comments
+        """
+        if self._comments is None:
+            self._comments = self._parse_comments()
+        return self._comments
+
+    @comments.setter
+    def comments(self, comments: list["Comment"]):
+        self._comments = comments
+
+    def parse(self, submission_page: Optional[BeautifulSoup] = None, *, parse_comments: bool = True):
         """
         Parse a submission page, overrides any information already present in the object.
 
         :param submission_page: The optional page from which to parse the submission.
+        :param parse_comments: Whether to parse the comments now, or on first access to comments.
         """
         assert submission_page is None or isinstance(submission_page, BeautifulSoup), \
             _raise_exception(TypeError(f"submission_page must be {None} or {BeautifulSoup.__name__}"))
@@ -250,9 +333,11 @@ class Submission(SubmissionBase):
         if self.submission_page is None:
             return
 
-        check_page_raise(self.submission_page)
+        with phase("check"):
+            check_page_raise(self.submission_page)
 
-        parsed: dict = parse_submission_page(self.submission_page)
+        with phase("extract"):
+            parsed: dict = parse_submission_page(self.submission_page)
 
         self.id = parsed["id"]
         self.title = parsed["title"]
@@ -279,5 +364,11 @@ class Submission(SubmissionBase):
         self.next = parsed["next"]
         self.favorite = parsed["unfav_link"] is not None
         self.favorite_toggle_link = parsed["fav_link"] or parsed["unfav_link"]
+        self._comments = self._parse_comments() if parse_comments else None
+
+    def _parse_comments(self) -> list["Comment"]:
+        if self.submission_page is None:
+            return []
         from .comment import sort_comments, Comment
-        self.comments = sort_comments([Comment(t, self) for t in parse_comments(self.submission_page)])
+        with phase("comments"):
+            return sort_comments([Comment(t, self) for t in parse_comments(self.submission_page)])
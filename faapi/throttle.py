@@ -0,0 +1,150 @@
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import time
+from typing import Optional
+
+
+class AdaptiveDelayState(
+    namedtuple(
+        "AdaptiveDelayState", ["delay", "hold_until", "latency", "baseline_latency", "backoffs", "successes"]
+    )
+):
+    """
+    This object contains the state of an AdaptiveDelay:
+    * delay: the current delay, before the robots.txt minimum is applied (seconds)
+    * hold_until: the time before which no request is sent because of a Retry-After header (UNIX time)
+    * latency: the moving average of the response times (seconds)
+    * baseline_latency: the slow moving average of the response times of a healthy server (seconds)
+    * backoffs: the number of times the delay was increased
+    * successes: the number of successful responses since the last increase
+    """
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the value of a Retry-After header.
+
+    :param value: The value of the header, in seconds or as an HTTP date.
+    :return: The time to wait in seconds, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveDelay:
+    """
+    Adjust the crawl delay to the responses of the server with additive increase, multiplicative decrease (AIMD)
+    applied to the request rate.
+
+    The delay is multiplied when the server shows distress (429 and 5xx statuses, server error pages, timeouts, and
+    connection errors, or response times much slower than usual), and it goes back down by a fixed step after each
+    successful response. The delay is never shorter than the crawl delay of the robots.txt, and no request is sent
+    before the time requested by a Retry-After header.
+    """
+
+    def __init__(
+        self, *, backoff_factor: float = 2, recovery_step: float = 0.1, max_delay: float = 60,
+        latency_threshold: float = 3, latency_alpha: float = 0.2, baseline_alpha: float = 0.01
+    ):
+        """
+        :param backoff_factor: The factor the delay is multiplied by when the server shows distress.
+        :param recovery_step: The time removed from the delay after each successful response (seconds).
+        :param max_delay: The maximum delay (seconds).
+        :param latency_threshold: The ratio of the average response time to the baseline that counts as distress.
+        :param latency_alpha: The weight of each response in the average response time.
+        :param baseline_alpha: The weight of each response in the baseline response time.
+        """
+        self.backoff_factor: float = backoff_factor
+        self.recovery_step: float = recovery_step
+        self.max_delay: float = max_delay
+        self.latency_threshold: float = latency_threshold
+        self.latency_alpha: float = latency_alpha
+        self.baseline_alpha: float = baseline_alpha
+        self._delay: float = 0
+        self._hold_until: float = 0
+        self._latency: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._backoffs: int = 0
+        self._successes: int = 0
+        self._lock: Lock = Lock()
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        return f"{self.__class__.__name__}({' '.join(f'{k}={v}' for k, v in self.state._asdict().items())})"
+
+    @property
+    def state(self) -> AdaptiveDelayState:
+        """
+        The current state of the controller
+        """
+        with self._lock:
+            return AdaptiveDelayState(
+                self._delay, self._hold_until, self._latency, self._baseline, self._backoffs, self._successes
+            )
+
+    def delay(self, minimum: float, last_get: float = 0) -> float:
+        """
+        Compute the delay to use before the next request.
+
+        :param minimum: The crawl delay from the robots.txt.
+        :param last_get: The time of the last request (UNIX time), used to respect Retry-After.
+        :return: The delay in seconds.
+        """
+        with self._lock:
+            return max(minimum, self._delay, self._hold_until - last_get)
+
+    def record_success(self, latency: Optional[float], minimum: float):
+        """
+        Record a successful response.
+        If the response time is much slower than usual, the delay is increased, otherwise it is reduced.
+
+        :param latency: The response time (seconds), None if it cannot be compared with the others (e.g. downloads
+            of large files), in which case the delay is only reduced.
+        :param minimum: The crawl delay from the robots.txt.
+        """
+        with self._lock:
+            if latency is None:
+                self._delay = max(minimum, self._delay - self.recovery_step)
+                self._successes += 1
+                return
+            self._latency = latency if self._latency is None else \
+                self._latency + self.latency_alpha * (latency - self._latency)
+            if self._baseline is not None and self._latency > self._baseline * self.latency_threshold:
+                # A slow server is only backed off once for every window of responses, so that the delay can settle
+                if self._successes >= 1 / self.latency_alpha:
+                    self._backoff(minimum)
+                else:
+                    self._successes += 1
+                return
+            self._baseline = latency if self._baseline is None else \
+                self._baseline + self.baseline_alpha * (latency - self._baseline)
+            self._delay = max(minimum, self._delay - self.recovery_step)
+            self._successes += 1
+
+    def record_distress(self, minimum: float, retry_after: Optional[float] = None):
+        """
+        Record an error that shows the server is overloaded, and increase the delay.
+
+        :param minimum: The crawl delay from the robots.txt.
+        :param retry_after: The time requested by the server with a Retry-After header, if any (seconds).
+        """
+        with self._lock:
+            self._backoff(minimum)
+            if retry_after is not None:
+                self._hold_until = max(self._hold_until, time() + retry_after)
+
+    def _backoff(self, minimum: float):
+        self._delay = min(self.max_delay, max(minimum, self._delay) * self.backoff_factor)
+        self._backoffs += 1
+        self._successes = 0
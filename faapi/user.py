@@ -1,11 +1,13 @@
 from collections import namedtuple
 from datetime import datetime
+from typing import Any
 from typing import Optional
 from urllib.parse import quote
 
 from .connection import join_url
 from .connection import root
 from .exceptions import _raise_exception
+from .metrics import phase
 from .parse import BeautifulSoup
 from .parse import check_page_raise
 from .parse import html_to_bbcode
@@ -87,6 +89,9 @@ class UserBase:
         yield "display_name", self.display_name
         yield "status", self.status
 
+    def __getstate__(self) -> dict[str, Any]:
+        return {k: None if isinstance(v, Tag) else v for k, v in self.__dict__.items()}
+
     def __repr__(self):
         return self.__str__()
 
@@ -149,6 +154,23 @@ class UserPartial(UserBase):
         yield "join_date", self.join_date
         yield "avatar_url", self.avatar_url
 
+    @classmethod
+    def from_dict(cls, user_dict: dict[str, Any]) -> "UserPartial":
+        """
+        Create a user from a dictionary with the same keys as the one returned by dict().
+
+        :param user_dict: The dictionary containing the user information.
+        :return: A UserPartial object.
+        """
+        user: UserPartial = cls()
+        user.name = user_dict["name"]
+        user.display_name = user_dict["display_name"]
+        user.status = user_dict["status"]
+        user.title = user_dict["title"]
+        user.join_date = user_dict["join_date"]
+        user.avatar_url = user_dict["avatar_url"]
+        return user
+
     def parse(self, user_tag: Optional[Tag] = None):
         """
         Parse a user page, overrides any information already present in the object.
@@ -226,6 +248,32 @@ class User(UserBase):
         """
         return html_to_bbcode(self.profile)
 
+    @classmethod
+    def from_dict(cls, user_dict: dict[str, Any]) -> "User":
+        """
+        Create a user from a dictionary with the same keys as the one returned by dict().
+
+        :param user_dict: The dictionary containing the user information.
+        :return: A User object.
+        """
+        user: User = cls()
+        user.name = user_dict["name"]
+        user.display_name = user_dict["display_name"]
+        user.status = user_dict["status"]
+        user.title = user_dict["title"]
+        user.join_date = user_dict["join_date"]
+        user.profile = user_dict["profile"]
+        user.stats = UserStats(**user_dict["stats"])
+        user.info = dict(user_dict["info"])
+        user.contacts = dict(user_dict["contacts"])
+        user.avatar_url = user_dict["avatar_url"]
+        user.banner_url = user_dict["banner_url"]
+        user.watched = user_dict["watched"]
+        user.watched_toggle_link = user_dict["watched_toggle_link"]
+        user.blocked = user_dict["blocked"]
+        user.blocked_toggle_link = user_dict["blocked_toggle_link"]
+        return user
+
     def parse(self, user_page: Optional[BeautifulSoup] = None):
         """
         Parse a user page, overrides any information already present in the object.
@@ -239,9 +287,11 @@ class User(UserBase):
         if self.user_page is None:
             return
 
-        check_page_raise(self.user_page)
+        with phase("check"):
+            check_page_raise(self.user_page)
 
-        parsed: dict = parse_user_page(self.user_page)
+        with phase("extract"):
+            parsed: dict = parse_user_page(self.user_page)
 
         self.name = parsed["name"]
         self.display_name = parsed["display_name"]
@@ -0,0 +1,282 @@
+"""
+A local stand-in for Fur Affinity that serves the pages stored in tests/pages.
+
+The server can add latency, errors, and rate limits to responses, and it records every request it receives. FAAPI can be
+pointed at it by overriding faapi.connection.root before creating the FAAPI object:
+
+    with MockServer(crawl_delay=1) as server:
+        faapi.connection.root = server.url
+        api = faapi.FAAPI([{"name": "a", "value": "a"}])
+"""
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from random import Random
+from re import compile as re_compile
+from re import Match
+from re import Pattern
+from socket import SHUT_RDWR
+from threading import Lock
+from threading import Thread
+from time import sleep
+from time import time
+from typing import NamedTuple
+from typing import Optional
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+pages_folder: Path = Path(__file__).resolve().parent / "pages"
+next_button: Pattern = re_compile(r'<form[^>]*><button[^>]*>Next</button></form>')
+next_search: Pattern = re_compile(r'<input class="button standard" type="submit" name="next_page" value="Next">')
+next_favorites: Pattern = re_compile(r'<form class="floatright" action="/favorites/[^"]*/next".*?</form>')
+next_journals: Pattern = re_compile(r'<a class="button standard" href="/journals/[^"]*">Older</a>')
+next_inbox: Pattern = re_compile(r'<a class="button standard more-half" href="/msg/submissions/[^"]*">Next 72</a>')
+inbox_cursor: Pattern = re_compile(r"new~(\d+)@\d+")
+next_watchlist: Pattern = re_compile(r'<div class="floatright"><form method="get".*?</form></div>')
+error_kinds: tuple[str, ...] = ("503", "system_error", "reset")
+file_last_modified: str = "Tue, 14 Nov 2023 22:13:20 GMT"
+
+
+class MockRequest(NamedTuple):
+    time: float
+    path: str
+    status: int
+    cookie: str = ""  # Cookie header of the request
+    port: int = 0  # Client port, identifies the connection
+
+
+class MockServer:
+    """
+    Serve recorded pages for /view, /user, /gallery, /scraps, /favorites, /journals, /journal, /watchlist, /msg,
+    /search, and /browse, the robots.txt, and binary files for any path under /art.
+    Binary files have an ETag that changes with file_size, and conditional requests that match it receive a 304.
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, *, crawl_delay: int = 1, latency: float = 0,
+        error_rate: float = 0, rate_limit: float = 0, pages: int = 3, file_size: int = 1 << 16,
+        disabled_users: tuple[str, ...] = ("disabled",), seed: Optional[int] = None
+    ):
+        """
+        :param host: The host to listen on.
+        :param port: The port to listen on (0 to use any free port).
+        :param crawl_delay: The Crawl-delay value set in the robots.txt.
+        :param latency: The time waited before answering each request (seconds).
+        :param error_rate: The probability that a page request fails with a random error.
+        :param rate_limit: The minimum time between two requests; faster requests receive a 429 response (seconds).
+        :param pages: The number of pages of each paginated listing.
+        :param file_size: The size of the binary files (bytes).
+        :param disabled_users: Users whose pages return the account disabled page.
+        :param seed: The seed used for random errors.
+        """
+        self.crawl_delay: int = crawl_delay
+        self.latency: float = latency
+        self.error_rate: float = error_rate
+        self.rate_limit: float = rate_limit
+        self.pages: int = pages
+        self.file_size: int = file_size
+        self.disabled_users: tuple[str, ...] = disabled_users
+        self.random: Random = Random(seed)
+        self.requests: list[MockRequest] = []
+        self.errors: list[str] = []  # Errors returned by the next page requests, one of error_kinds
+        self.set_cookie: str = ""  # Set-Cookie header sent with every response, if not empty
+        self.file_errors: list[int] = []  # Statuses returned by the next file requests, with a Retry-After header
+        self.templates: dict[str, str] = {p.stem: p.read_text(encoding="utf-8") for p in pages_folder.glob("*.html")}
+        self._lock: Lock = Lock()
+        self._last_request: float = 0
+        self._httpd: ThreadingHTTPServer = ThreadingHTTPServer((host, port), MockHandler)
+        self._httpd.daemon_threads = True
+        setattr(self._httpd, "mock", self)
+        self._thread: Thread = Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "MockServer":
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def fail_next(self, *kinds: str):
+        """
+        Make the next page requests fail.
+
+        :param kinds: The errors to return, one for each request ("503", "system_error", or "reset").
+        """
+        assert all(k in error_kinds for k in kinds)
+        with self._lock:
+            self.errors.extend(kinds)
+
+    def record(self, path: str, status: int, cookie: str = "", port: int = 0):
+        with self._lock:
+            self.requests.append(MockRequest(time(), path, status, cookie, port))
+
+    def check_rate(self) -> bool:
+        with self._lock:
+            now: float = time()
+            allowed: bool = now - self._last_request >= self.rate_limit
+            self._last_request = now
+            return allowed
+
+    def next_error(self) -> Optional[str]:
+        with self._lock:
+            if self.errors:
+                return self.errors.pop(0)
+            elif self.error_rate and self.random.random() < self.error_rate:
+                return self.random.choice(error_kinds)
+            return None
+
+    def robots(self) -> str:
+        return "\n".join([
+            "User-agent: *",
+            f"Crawl-delay: {self.crawl_delay}",
+            "Disallow: /fav/",
+            "Disallow: /unfav/",
+            "Disallow: /watch/",
+            "Disallow: /unwatch/",
+            "Disallow: /block/",
+            "Disallow: /unblock/",
+            "",
+        ])
+
+    def page(self, path: str, query: dict[str, list[str]]) -> tuple[int, str]:
+        parts: list[str] = [p for p in path.split("/") if p]
+        section: str = parts[0] if parts else ""
+        user: str = parts[1].lower() if len(parts) > 1 else ""
+        number: int = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 1
+
+        if section in ("user", "gallery", "scraps", "favorites", "journals") and user in self.disabled_users:
+            return 200, self.templates["disabled"]
+        elif section == "":
+            return 200, self.templates["gallery"]
+        elif section == "view" and user.isdigit():
+            sub_id: int = int(user)
+            if sub_id % 1000 == 404:
+                return 200, self.templates["not_found"]
+            page: str = self.templates["submission_comments" if sub_id % 100 == 99 else "submission"]
+            page = page.replace("/view/50000000/", f"/view/{sub_id}/").replace("/view/50000013/", f"/view/{sub_id}/")
+            return 200, page
+        elif section == "user" and user:
+            return 200, self.templates["user"]
+        elif section in ("gallery", "scraps") and user:
+            page = self.templates["gallery"]
+            return 200, page if number < self.pages else next_button.sub("", page)
+        elif section == "favorites" and user:
+            page = self.templates["favorites"]
+            number = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else 0
+            if number < self.pages - 1:
+                return 200, page.replace("/favorites/artist/1234567890/next", f"/favorites/{user}/{number + 1}/next")
+            return 200, next_favorites.sub("", page)
+        elif section == "journals" and user:
+            page = self.templates["journals"]
+            return 200, page if number < self.pages else next_journals.sub("", page)
+        elif section == "journal" and user.isdigit():
+            return 200, self.templates["journal"]
+        elif section == "search":
+            page = self.templates["search"]
+            number = int(query.get("page", ["1"])[0])
+            return 200, page if number < self.pages else next_search.sub("", page)
+        elif section == "browse":
+            page = self.templates["gallery"]
+            number = int(query.get("page", ["1"])[0])
+            return 200, page if number < self.pages else next_button.sub("", page)
+        elif section == "msg" and user == "submissions":
+            page = self.templates["msg_submissions"]
+            cursor: Optional[Match] = inbox_cursor.match(parts[2] if len(parts) > 2 else "")
+            number = (50000000 - int(cursor[1])) // 100 + 1 if cursor else 1
+            if number < self.pages:
+                return 200, page.replace("new~49999900@72", f"new~{50000000 - number * 100}@72")
+            return 200, next_inbox.sub("", page)
+        elif section == "msg" and user == "others":
+            return 200, self.templates["msg_others"]
+        elif section == "watchlist" and len(parts) > 2:
+            page = self.templates["watchlist"]
+            number = int(query.get("page", ["1"])[0])
+            if number < self.pages:
+                return 200, page.replace('name="page" value="2"', f'name="page" value="{number + 1}"')
+            return 200, next_watchlist.sub("", page)
+        return 404, self.templates["not_found"]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server_version = "MockFurAffinity/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_):
+        pass
+
+    @property
+    def mock(self) -> MockServer:
+        return getattr(self.server, "mock")
+
+    def send(self, status: int, body: bytes, content_type: str = "text/html; charset=UTF-8",
+             headers: Optional[dict[str, str]] = None):
+        # Recorded before answering, so the request is listed as soon as the client receives the response
+        self.mock.record(self.path, status, self.headers.get("Cookie", ""), self.client_address[1])
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.mock.set_cookie:
+            self.send_header("Set-Cookie", self.mock.set_cookie)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+
+        if self.mock.latency:
+            sleep(self.mock.latency)
+
+        if url.path == "/robots.txt":
+            return self.send(200, self.mock.robots().encode(), "text/plain")
+        elif url.path.startswith("/art/"):
+            if self.mock.file_errors:
+                status: int = self.mock.file_errors.pop(0)
+                return self.send(status, b"Service Unavailable", "text/plain", {"Retry-After": "0.3"})
+            validators: dict[str, str] = {"ETag": f'"{self.mock.file_size:x}"', "Last-Modified": file_last_modified}
+            if (etag := self.headers.get("If-None-Match")) is not None:
+                not_modified: bool = etag == validators["ETag"]
+            else:
+                not_modified = self.headers.get("If-Modified-Since") == file_last_modified
+            if not_modified:
+                return self.send(304, b"", "image/png", validators)
+            body: bytes = bytes(i % 251 for i in range(self.mock.file_size))
+            return self.send(200, body, "image/png", validators)
+
+        if self.mock.rate_limit and not self.mock.check_rate():
+            return self.send(429, b"Too Many Requests", "text/plain", {"Retry-After": str(self.mock.rate_limit)})
+
+        if error := self.mock.next_error():
+            if error == "503":
+                return self.send(503, b"Service Unavailable", "text/plain")
+            elif error == "system_error":
+                page: str = self.mock.templates["not_found"].replace(
+                    "The submission you are trying to find is not in our database.",
+                    "An unexpected error has occurred. Please try again later."
+                )
+                return self.send(200, page.encode())
+            self.mock.record(self.path, 0, self.headers.get("Cookie", ""), self.client_address[1])
+            self.connection.shutdown(SHUT_RDWR)
+            self.close_connection = True
+            return
+
+        status, text = self.mock.page(url.path, parse_qs(url.query))
+        self.send(status, text.encode())
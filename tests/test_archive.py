@@ -0,0 +1,83 @@
+from pathlib import Path
+
+from pytest import fixture
+from pytest import raises
+
+from faapi.archive import ArchiveReader
+from faapi.archive import ArchiveRecord
+from faapi.archive import ArchiveWriter
+from faapi.archive import index_name
+from faapi.archive import train_dictionary
+
+__root__: Path = Path(__file__).resolve().parent
+
+
+@fixture
+def pages() -> dict[str, bytes]:
+    return {p.name.removesuffix(".html"): p.read_bytes() for p in (__root__ / "pages").glob("*.html")}
+
+
+def test_archive(pages: dict[str, bytes], tmp_path: Path):
+    binary: bytes = bytes(range(256)) * 64
+
+    with ArchiveWriter(tmp_path, codec="zlib", segment_size=1 << 16) as writer:
+        records: list[ArchiveRecord] = [writer.add(f"https://www.furaffinity.net/{n}/", p) for n, p in pages.items()]
+        record_binary: ArchiveRecord = writer.add("https://d.furaffinity.net/art/file.png", binary, 1)
+        writer.add("https://www.furaffinity.net/user/", b"old user page", 0)
+
+    assert all(r.codec == "zlib" and r.length < r.size for r in records)
+    assert record_binary.codec in ("raw", "zlib")
+    assert len({r.segment for r in records}) > 1
+
+    with ArchiveReader(tmp_path) as reader:
+        assert len(reader) == len(pages) + 2
+        assert all(reader.get(f"https://www.furaffinity.net/{n}/") == p for n, p in pages.items())
+        assert reader.get("https://d.furaffinity.net/art/file.png") == binary
+        assert reader.get("https://www.furaffinity.net/user/") == pages["user"]
+        assert reader.get("https://www.furaffinity.net/user/", before=0) == b"old user page"
+        assert reader.get("https://www.furaffinity.net/missing/") is None
+        assert "https://www.furaffinity.net/journal/" in reader
+
+
+def test_archive_dictionary(pages: dict[str, bytes], tmp_path: Path):
+    dictionary: bytes = train_dictionary([pages["submission"], pages["journal"], pages["user"], pages["gallery"]])
+
+    with ArchiveWriter(tmp_path / "plain", codec="zlib") as writer:
+        size_plain: int = writer.add("/", pages["favorites"]).length
+    with ArchiveWriter(tmp_path / "dictionary", codec="zlib", dictionary=dictionary) as writer:
+        size_dictionary: int = writer.add("/", pages["favorites"]).length
+
+    assert size_dictionary < size_plain
+    assert ArchiveReader(tmp_path / "dictionary").get("/") == pages["favorites"]
+
+    with raises(ValueError):
+        ArchiveWriter(tmp_path / "plain", codec="zlib", dictionary=dictionary)
+
+
+def test_archive_interrupted_write(tmp_path: Path):
+    with ArchiveWriter(tmp_path, codec="zlib") as writer:
+        writer.add("/a/", b"a" * 100)
+    with (tmp_path / index_name).open("a") as f:
+        f.write("0\t0\t100")
+
+    assert len(ArchiveReader(tmp_path)) == 1
+
+    with ArchiveWriter(tmp_path, codec="zlib") as writer:
+        writer.add("/b/", b"b" * 100)
+
+    with ArchiveReader(tmp_path) as reader:
+        assert len(reader) == 2
+        assert reader.get("/b/") == b"b" * 100
+
+
+def test_archive_empty_segment(tmp_path: Path):
+    with ArchiveWriter(tmp_path, codec="zlib", segment_size=1) as writer:
+        writer.add("/a/", b"a" * 100)
+        writer.add("/empty/", b"")
+        writer.add("/empty/", b"", 0)
+    assert (tmp_path / "segment-00001.bin").stat().st_size == 0
+
+    with ArchiveReader(tmp_path) as reader:
+        assert reader.get("/empty/") == b""
+        assert reader.get("/a/") == b"a" * 100
+        assert [content for _, content in reader] == [b"a" * 100, b"", b""]
@@ -0,0 +1,88 @@
+from pathlib import Path
+from time import sleep
+
+from pytest import raises
+from requests import Response
+
+from faapi.cache import NegativeCache
+from faapi.cache import ResponseCache
+from faapi.exceptions import DisabledAccount
+from faapi.exceptions import NotFound
+from faapi.exceptions import ServerError
+
+
+def test_negative_cache(tmp_path: Path):
+    with NegativeCache(tmp_path / "cache.sqlite", {DisabledAccount: 0}) as cache:
+        cache.add("submission", 404, NotFound())
+        cache.add("user", "disabled", DisabledAccount())
+        cache.add("journal", 1, ServerError())
+
+        assert isinstance(cache.get("submission", 404), NotFound)
+        assert cache.get("submission", "404") is not None
+        assert cache.get("journal", 404) is None
+        assert cache.get("user", "disabled") is None
+        assert cache.get("journal", 1) is None
+        assert len(cache) == 1
+
+        with raises(NotFound):
+            with cache.check("submission", 404):
+                raise AssertionError
+        assert cache.hits == 1
+
+        with raises(NotFound):
+            with cache.check("journal", 2):
+                raise NotFound
+        with raises(ServerError):
+            with cache.check("journal", 3):
+                raise ServerError
+        assert cache.get("journal", 2) is not None
+        assert cache.get("journal", 3) is None
+
+    with NegativeCache(tmp_path / "cache.sqlite") as cache:
+        assert len(cache) == 2
+        cache.remove("submission", 404)
+        cache.purge()
+        assert cache.get("submission", 404) is None
+        assert cache.connection.execute("select count(*) from negative_cache").fetchone()[0] == 1
+
+
+def make_response(content: bytes) -> Response:
+    response: Response = Response()
+    response.status_code = 200
+    response._content = content
+    return response
+
+
+def test_response_cache():
+    cache: ResponseCache = ResponseCache(max_size=2, ttl=0.2)
+    assert ResponseCache.key("/view/1/", {}) == ResponseCache.key("view/1", {})
+    assert ResponseCache.key("search", {"page": 2}) == ResponseCache.key("search", {"page": "2"})
+
+    cache.add(ResponseCache.key("view/1", {}), make_response(b"1"))
+    cache.add(ResponseCache.key("view/2", {}), make_response(b"2"))
+    assert (response := cache.get(ResponseCache.key("view/1", {}))) is not None and response.content == b"1"
+    cache.add(ResponseCache.key("view/3", {}), make_response(b"3"))
+    assert ResponseCache.key("view/2", {}) not in cache
+    assert ResponseCache.key("view/1", {}) in cache
+    assert len(cache) == 2
+    assert cache.get(ResponseCache.key("view/2", {})) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    sleep(0.25)
+    assert cache.get(ResponseCache.key("view/1", {})) is None
+    assert ResponseCache.key("view/3", {}) not in cache
+
+
+def test_response_cache_pop_clear():
+    cache: ResponseCache = ResponseCache()
+    key: tuple = ResponseCache.key("view/1", {})
+    assert cache.add(key, make_response(b"1"))
+    assert (response := cache.pop(key)) is not None and response.content == b"1"
+    assert cache.pop(key) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    generation: int = cache.generation
+    cache.clear()
+    assert not cache.add(key, make_response(b"1"), generation)
+    assert key not in cache
+    assert cache.add(key, make_response(b"1"), cache.generation)
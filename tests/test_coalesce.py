@@ -0,0 +1,51 @@
+from threading import Barrier
+from threading import Event
+from threading import Thread
+from time import sleep
+
+from pytest import raises
+
+from faapi.coalesce import SingleFlight
+
+
+def test_single_flight():
+    flight: SingleFlight = SingleFlight()
+    barrier: Barrier = Barrier(5)
+    release: Event = Event()
+    results: list[object] = []
+    calls: list[int] = []
+
+    def call() -> object:
+        calls.append(1)
+        release.wait()
+        return object()
+
+    def caller():
+        barrier.wait()
+        results.append(flight.do("key", call))
+
+    threads: list[Thread] = [Thread(target=caller) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.shared < 4:
+        sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5 and all(r is results[0] for r in results)
+    assert (flight.calls, flight.shared, len(flight)) == (1, 4, 0)
+    assert flight.do("key", object) is not results[0]
+
+
+def test_single_flight_error():
+    flight: SingleFlight = SingleFlight()
+
+    def call():
+        raise ValueError
+
+    with raises(ValueError):
+        flight.do("key", call)
+    assert len(flight) == 0
+    assert flight.do("key", lambda: 1) == 1
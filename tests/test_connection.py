@@ -5,12 +5,19 @@ from urllib.robotparser import RobotFileParser
 from pytest import fixture
 from pytest import raises
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
 from requests.cookies import RequestsCookieJar
 
+from faapi.connection import cdn_hosts
+from faapi.connection import file_timestamp
+from faapi.connection import FileMetadata
 from faapi.connection import get_robots
 from faapi.connection import join_url
+from faapi.connection import make_cookie_jar
+from faapi.connection import make_retry
 from faapi.connection import make_session
 from faapi.connection import root
+from faapi.connection import unchanged_file
 from faapi.exceptions import Unauthorized
 
 __root__: Path = Path(__file__).resolve().parent
@@ -26,6 +33,37 @@ def cookies(data: dict) -> RequestsCookieJar:
     return data["cookies"]
 
 
+def test_make_cookie_jar():
+    cookie_jar = RequestsCookieJar()
+    cookie_jar.set("a", "a")
+    assert make_cookie_jar(cookie_jar).get_dict() == {"a": "a"}
+    cookie_jar = make_cookie_jar([{"name": "a", "value": "a"}, {"name": "b", "value": "b"}])
+    assert cookie_jar.get_dict() == {"a": "a", "b": "b"}
+    with raises(Unauthorized):
+        make_cookie_jar([])
+
+
+def test_unchanged_file():
+    url: str = "https://d.furaffinity.net/art/artist/1700000000/1700000000.artist_file.png"
+    url_new: str = "https://d.furaffinity.net/art/artist/1700000500/1700000000.artist_file.png"
+    assert file_timestamp(url) == 1700000000
+    assert file_timestamp("https://d.furaffinity.net/art/artist/stories/1700000000/1700000000.artist_s.txt") == \
+        1700000000
+    assert file_timestamp("https://example.com/file.png") is None
+
+    assert unchanged_file(FileMetadata(url), FileMetadata(url)) == "timestamp"
+    assert unchanged_file(FileMetadata(url, 10, '"a"'), FileMetadata(url_new, 10, '"a"')) is None
+    assert unchanged_file(FileMetadata(url, 10), FileMetadata(url_new, 10)) is None
+
+    other: str = "https://example.com/file.png"
+    assert unchanged_file(FileMetadata(url, 10, '"a"'), FileMetadata(other, 10, '"a"')) == "etag"
+    assert unchanged_file(FileMetadata(url, 10, '"a"'), FileMetadata(other, 10, '"b"')) is None
+    assert unchanged_file(FileMetadata(url, 10, None, "date"), FileMetadata(other, 11, '"b"', "date")) == \
+        "last_modified"
+    assert unchanged_file(FileMetadata(url, 10), FileMetadata(other, 10)) == "size"
+    assert unchanged_file(FileMetadata(url), FileMetadata(other, 10)) is None
+
+
 def test_make_session_cookie_jar():
     cookie_jar = RequestsCookieJar()
     cookie_jar.set("a", "a")
@@ -43,6 +81,22 @@ def test_make_session_error():
         make_session([], Session)
 
 
+def test_make_session_adapters():
+    result = make_session(
+        [{"name": "a", "value": "a"}], Session,
+        pool_size=4, max_retries=make_retry(2), cdn_pool_size=8, cdn_max_retries=5
+    )
+    adapter_root = result.get_adapter(join_url(root, "view", 1))
+    adapter_cdn = result.get_adapter(join_url(cdn_hosts[0], "art", "user", "file.png"))
+    assert isinstance(adapter_root, HTTPAdapter)
+    assert isinstance(adapter_cdn, HTTPAdapter)
+    assert adapter_root is not adapter_cdn
+    assert adapter_root.poolmanager.connection_pool_kw["maxsize"] == 4
+    assert adapter_cdn.poolmanager.connection_pool_kw["maxsize"] == 8
+    assert adapter_root.max_retries.total == 2
+    assert adapter_cdn.max_retries.total == 5
+
+
 def test_get_robots(cookies: RequestsCookieJar):
     result = get_robots(make_session(cookies, Session))
     assert isinstance(result, RobotFileParser)
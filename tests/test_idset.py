@@ -0,0 +1,67 @@
+from pathlib import Path
+from pickle import dumps
+from pickle import loads
+from random import Random
+
+from pytest import raises
+
+from faapi import SubmissionPartial
+from faapi.idset import IdSet
+from faapi.parse import parse_page
+from faapi.parse import parse_user_submissions
+
+__root__: Path = Path(__file__).resolve().parent
+
+
+def test_idset():
+    random: Random = Random(0)
+    ids_a: set[int] = {*random.sample(range(1 << 20), 20000), *range(1 << 16, (1 << 16) + 5000), 0, (1 << 32) - 1}
+    ids_b: set[int] = {*random.sample(range(1 << 20), 3000), *range((1 << 16) + 2000, (1 << 16) + 9000)}
+    set_a: IdSet = IdSet(ids_a)
+    set_b: IdSet = IdSet()
+    for i in ids_b:
+        set_b.add(i)
+
+    assert len(set_a) == len(ids_a)
+    assert list(set_a) == sorted(ids_a)
+    assert all((i in set_a) == (i in ids_a) for i in range(0, 1 << 20, 7))
+    assert set(set_a | set_b) == ids_a | ids_b
+    assert set(set_a & set_b) == ids_a & ids_b
+    assert set(set_a - set_b) == ids_a - ids_b
+    assert set(set_a ^ set_b) == ids_a ^ ids_b
+    assert set_a.nbytes < len(ids_a) * 2
+
+    set_b.discard(min(ids_b))
+    set_b.update(range(10))
+    assert set(set_b) == (ids_b - {min(ids_b)}) | set(range(10))
+
+    with raises(ValueError):
+        set_a.add(-1)
+
+
+def test_idset_persistence(tmp_path: Path):
+    ids: set[int] = {*range(0, 1 << 18, 3), *range(1 << 20, (1 << 20) + 100)}
+    id_set: IdSet = IdSet(ids)
+    id_set.save(tmp_path / "ids")
+
+    id_set_mmap: IdSet = IdSet.load(tmp_path / "ids")
+    assert id_set_mmap == id_set == IdSet.load(tmp_path / "ids", memory_map=False) == loads(dumps(id_set))
+    id_set_mmap.update([1, 1 << 24])
+    id_set_mmap.discard(3)
+    assert set(id_set_mmap) == (ids | {1, 1 << 24}) - {3}
+    assert IdSet.load(tmp_path / "ids") == id_set
+
+
+def test_idset_submissions():
+    page: str = (__root__ / "pages" / "gallery.html").read_text(encoding="utf-8")
+    submissions: list[SubmissionPartial] = [
+        SubmissionPartial(f) for f in parse_user_submissions(parse_page(page))["figures"]
+    ]
+    id_set: IdSet = IdSet(submissions[:10])
+
+    assert id_set.unseen(submissions) == submissions[10:]
+    assert not id_set.issuperset(submissions)
+    id_set.update(submissions, [{"id": 1}])
+    assert id_set.issuperset(submissions)
+    assert id_set.unseen(submissions) == []
+    assert {"id": 1} in id_set
@@ -0,0 +1,64 @@
+from pytest import raises
+
+from faapi.metrics import current_metrics
+from faapi.metrics import measure
+from faapi.metrics import MetricsAggregator
+from faapi.metrics import phase
+from faapi.metrics import RequestMetrics
+
+
+def test_measure_phases():
+    collected: list[RequestMetrics] = []
+
+    with measure("submission", [collected.append]) as metrics:
+        assert metrics is not None
+        assert current_metrics() is metrics
+        with measure("get_parsed", [collected.append]) as metrics_inner:
+            assert metrics_inner is metrics
+            with phase("network"):
+                pass
+        with phase("network"):
+            pass
+        with phase("extract"):
+            pass
+
+    assert current_metrics() is None
+    assert len(collected) == 1
+    assert collected[0].endpoint == "submission"
+    assert set(collected[0].phases) == {"network", "extract"}
+    assert collected[0].total >= sum(collected[0].phases.values())
+    assert collected[0].error is None
+
+
+def test_measure_error():
+    collected: list[RequestMetrics] = []
+
+    with raises(ValueError):
+        with measure("user", [collected.append]):
+            raise ValueError
+
+    assert collected[0].error == "ValueError"
+
+
+def test_measure_no_observers():
+    with measure("user", []) as metrics:
+        assert metrics is None
+        with phase("tree"):
+            pass
+
+
+def test_aggregator_percentiles():
+    aggregator: MetricsAggregator = MetricsAggregator(max_samples=100)
+
+    for i in range(1, 201):
+        metrics: RequestMetrics = RequestMetrics("gallery")
+        metrics.total = i
+        metrics.add("network", i / 2)
+        aggregator(metrics)
+
+    assert aggregator.percentiles("gallery", "total", (50, 90, 100)) == {50: 150, 90: 190, 100: 200}
+    assert aggregator.percentiles("gallery", "network", (50,)) == {50: 75}
+    assert aggregator.percentiles("user") == {}
+    assert set(aggregator.report()["gallery"]) == {
+        "total", "delay", "network", "tree", "check", "extract", "comments", "bytes"
+    }
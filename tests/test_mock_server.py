@@ -0,0 +1,393 @@
+from gc import collect
+from pathlib import Path
+from time import sleep
+from time import time
+from threading import active_count
+from threading import Thread
+from typing import Iterator
+from typing import Optional
+from weakref import ref
+
+from pytest import fixture
+from pytest import MonkeyPatch
+from pytest import raises
+
+import faapi.connection
+from faapi.archive import ArchiveReader
+from faapi.archive import ArchiveWriter
+from faapi.cache import NegativeCache
+from faapi.connection import FileDownload
+from faapi import FAAPI
+from faapi import JournalPartial
+from faapi import Submission
+from faapi import SubmissionPartial
+from faapi import User
+from faapi.exceptions import DisabledAccount
+from faapi.exceptions import NotFound
+from faapi.exceptions import ServerError
+from faapi.metrics import RequestMetrics
+from faapi.prefetch import Prefetcher
+from faapi.parse import parse_page
+from faapi.retry import RetryPolicy
+from faapi.throttle import AdaptiveDelay
+from mock_server import MockServer
+
+
+@fixture
+def server(monkeypatch: MonkeyPatch) -> Iterator[MockServer]:
+    with MockServer(crawl_delay=1, pages=3) as mock_server:
+        monkeypatch.setattr(faapi.connection, "root", mock_server.url)
+        yield mock_server
+
+
+@fixture
+def api(server: MockServer) -> FAAPI:
+    api: FAAPI = FAAPI([{"name": "a", "value": "a"}])
+    api.robots.default_entry.delay = 0.05  # type: ignore
+    api.robots_policy.compile()
+    api.retry_policy = RetryPolicy(3, backoff_factor=0.01)
+    return api
+
+
+def test_robots(api: FAAPI):
+    assert api.crawl_delay == 0.05
+    assert api.check_path("/view/1/")
+    assert not api.check_path("/fav/1/")
+
+
+def test_submission(api: FAAPI, server: MockServer):
+    submission, file = api.submission(123)
+    assert isinstance(submission, Submission)
+    assert submission.id == 123
+    assert file is None
+
+    submission.file_url = server.url + "/art/artist/1700000000/1700000000.artist_file.png"
+    assert len(api.submission_file(submission)) == server.file_size
+
+
+def test_submission_file_conditional(api: FAAPI, server: MockServer):
+    submission, _ = api.submission(123)
+    submission.file_url = server.url + "/art/artist/1700000000/1700000000.artist_file.png"
+    download: FileDownload = api.submission_file_conditional(submission)
+    assert download.skipped is None and download.file is not None and len(download.file) == server.file_size
+    assert download.metadata.size == server.file_size and download.metadata.etag is not None
+
+    requests: int = len(server.requests)
+    assert api.submission_file_conditional(submission, download.metadata).skipped == "timestamp"
+    assert len(server.requests) == requests
+
+    submission.file_url = server.url + "/art/artist/1700000500/1700000500.artist_file.png"
+    skipped: FileDownload = api.submission_file_conditional(submission, download.metadata)
+    assert skipped.skipped == "not_modified" and skipped.file is None
+    assert skipped.metadata == download.metadata._replace(url=submission.file_url)
+    assert server.requests[-1].status == 304
+    assert api.submission_file_conditional(submission, download.metadata._replace(url=""), head=True).skipped == \
+        "etag"
+
+    server.file_size //= 2
+    changed: FileDownload = api.submission_file_conditional(submission, skipped.metadata._replace(url=""), head=True)
+    assert changed.skipped is None and changed.file is not None and len(changed.file) == server.file_size
+    assert changed.metadata.etag != download.metadata.etag
+
+
+def test_refresh_robots(api: FAAPI, server: MockServer):
+    server.crawl_delay = 2
+    api.refresh_robots()
+    assert api.crawl_delay == 2
+    assert api.robots_policy.refreshes == 1
+    assert not api.check_path("/fav/1/")
+
+
+def test_refresh_robots_deleted(server: MockServer):
+    api: FAAPI = FAAPI([{"name": "a", "value": "a"}], robots_refresh=0.01)
+    api_ref = ref(api)
+    threads: int = active_count()
+    del api
+    collect()
+    assert api_ref() is None
+    time_start: float = time()
+    while active_count() >= threads and time() - time_start < 5:
+        sleep(0.01)
+    assert active_count() < threads
+
+
+def test_swap_cookies(api: FAAPI, server: MockServer):
+    api.user("artist")
+    previous = api.swap_cookies([{"name": "b", "value": "b"}])
+    assert previous.get("a") == "a"
+    api.user("artist")
+    api.load_cookies(previous)
+    api.user("artist")
+    requests = [r for r in server.requests if r.path == "/user/artist"]
+    assert [r.cookie for r in requests] == ["a=a", "b=b", "a=a"]
+    assert len({r.port for r in requests}) == 1
+
+
+def test_swap_cookies_threads(api: FAAPI, server: MockServer):
+    api.robots.default_entry.delay = 0.01  # type: ignore
+    api.robots_policy.compile()
+    errors: list[Exception] = []
+
+    def crawl():
+        try:
+            for _ in range(10):
+                api.user("artist")
+        except Exception as err:
+            errors.append(err)
+
+    threads: list[Thread] = [Thread(target=crawl) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while any(t.is_alive() for t in threads):
+        api.swap_cookies([{"name": "a", "value": "1"}, {"name": "b", "value": "1"}])
+        api.swap_cookies([{"name": "a", "value": "2"}, {"name": "b", "value": "2"}])
+    for thread in threads:
+        thread.join()
+    assert not errors
+    cookies = {r.cookie for r in server.requests if r.path == "/user/artist"}
+    assert cookies <= {"a=a", "a=1; b=1", "a=2; b=2"}
+
+
+def test_swap_cookies_in_flight(api: FAAPI, server: MockServer):
+    server.latency = 0.3
+    server.set_cookie = "c=a; Path=/"
+    thread: Thread = Thread(target=api.user, args=["artist"])
+    thread.start()
+    sleep(0.1)
+    previous = api.swap_cookies([{"name": "b", "value": "b"}])
+    assert previous.get("c") == "a"
+    assert api.session.cookies.get_dict() == {"b": "b"}
+    thread.join()
+
+
+def test_stream_pages(api: FAAPI):
+    metrics: list[RequestMetrics] = []
+    api.observers.append(metrics.append)
+
+    submission, _ = api.submission(199)
+    api.stream_pages = True
+    submission_stream, _ = api.submission(199)
+
+    assert dict(submission_stream) == dict(submission)
+    assert len(submission_stream.comments) > 0
+    assert metrics[1].bytes == metrics[0].bytes > 0
+
+
+def test_archive(api: FAAPI, server: MockServer, tmp_path: Path):
+    api.archive = ArchiveWriter(tmp_path, codec="zlib")
+    submission, _ = api.submission(123)
+    api.stream_pages = True
+    api.submission(199)
+    submission.file_url = server.url + "/art/artist/1700000000/1700000000.artist_file.png"
+    file: bytes = api.submission_file(submission)
+    api.archive.close()
+
+    with ArchiveReader(tmp_path) as reader:
+        assert len(reader) == 3
+        assert Submission(parse_page(reader.get(server.url + "/view/123") or b"")).title == submission.title
+        assert Submission(parse_page(reader.get(server.url + "/view/199") or b"")).id == 199
+        assert reader.get(submission.file_url) == file
+
+
+def test_negative_cache(api: FAAPI, server: MockServer):
+    api.negative_cache = NegativeCache()
+
+    for _ in range(3):
+        with raises(NotFound):
+            api.submission(1404)
+        with raises(DisabledAccount):
+            api.gallery("disabled", 2)
+        with raises(DisabledAccount):
+            api.user("Disabled")
+
+    assert [r.path for r in server.requests if r.path != "/robots.txt"] == ["/view/1404", "/gallery/disabled/2"]
+    assert api.negative_cache.hits == 7
+
+
+def test_coalesce(api: FAAPI, server: MockServer):
+    server.latency = 0.2
+    users: list[User] = []
+    threads: list[Thread] = [Thread(target=lambda: users.append(api.user("artist"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(users) == 4 and len({u.name for u in users}) == 1
+    assert [r.path for r in server.requests if r.path != "/robots.txt"] == ["/user/artist"]
+
+    api.single_flight = None
+    api.user("artist")
+    assert [r.path for r in server.requests if r.path != "/robots.txt"] == ["/user/artist"] * 2
+
+
+def test_pagination(api: FAAPI):
+    submissions: list[SubmissionPartial] = []
+    page: Optional[int] = 1
+    while page:
+        submissions_page, page = api.gallery("artist", page)
+        submissions.extend(submissions_page)
+    assert len(submissions) == 72 * 3
+
+    favorites: list[SubmissionPartial] = []
+    page_favorites: Optional[str] = ""
+    while page_favorites is not None:
+        favorites_page, page_favorites = api.favorites("artist", page_favorites)
+        favorites.extend(favorites_page)
+    assert len(favorites) == 72 * 3
+
+
+def test_raw_listings(api: FAAPI):
+    submissions, page = api.gallery("artist", 1)
+    records, page_raw = api.gallery("artist", 1, raw=True)
+    assert page_raw == page == 2
+    assert [r["id"] for r in records] == [s.id for s in submissions]
+    assert all(r["author"] == s.author.name and r["thumbnail_url"] == s.thumbnail_url
+               for r, s in zip(records, submissions))
+
+    favorites, page_favorites = api.favorites("artist", raw=True)
+    assert len(favorites) == 72
+    assert page_favorites == "1/next"
+    assert set(favorites[0]) == {"id", "title", "author", "rating", "type", "thumbnail_url"}
+
+    journals, _ = api.journals("artist")
+    journals_raw, _ = api.journals("artist", raw=True)
+    assert [j["id"] for j in journals_raw] == [j.id for j in journals]
+    assert all(j["content"] == journal.content for j, journal in zip(journals_raw, journals))
+    assert all(j["author"] == journal.author.name for j, journal in zip(journals_raw, journals))
+
+
+def test_inbox(api: FAAPI, server: MockServer):
+    submissions: list[SubmissionPartial] = []
+    page: Optional[str] = ""
+    while page is not None:
+        submissions_page, page = api.inbox_submissions(page)
+        submissions.extend(submissions_page)
+    assert len(submissions) == 72 * server.pages
+    assert [r.path for r in server.requests if r.path.startswith("/msg/")] == [
+        "/msg/submissions", "/msg/submissions/new~49999900@72", "/msg/submissions/new~49999800@72"
+    ]
+
+    journals: list[JournalPartial] = api.inbox_journals()
+    assert len(journals) == 12
+    assert journals[0].id == 10500000
+    assert journals[0].author.name_url != ""
+    assert api.inbox_journals(raw=True)[0]["id"] == 10500000
+
+
+def test_search(api: FAAPI, server: MockServer):
+    submissions, next_page = api.search("cat", rating=["general"], type_=["art"], date_range="1year")
+    assert len(submissions) == 72 and next_page == 2
+    submissions_raw, next_page = api.search("cat", server.pages, raw=True)
+    assert len(submissions_raw) == 72 and next_page is None
+    paths: list[str] = [r.path for r in server.requests if r.path.startswith("/search")]
+    assert "q=cat" in paths[0] and "rating-general=1" in paths[0] and "rating-adult" not in paths[0]
+
+    page: Optional[int] = 1
+    pages: int = 0
+    while page is not None:
+        submissions, page = api.browse(page, category=2)
+        pages += 1
+    assert pages == server.pages
+    assert all("cat=2" in r.path for r in server.requests if r.path.startswith("/browse"))
+
+
+def test_prefetch(api: FAAPI, server: MockServer):
+    prefetcher: Prefetcher = Prefetcher(api).start()
+    assert api.prefetcher is prefetcher and api.response_cache is not None
+    try:
+        api.gallery("artist", 1)
+        submission, _ = api.submission(50000000)
+        time_start: float = time()
+        while prefetcher.fetched < 3 and time() - time_start < 5:
+            sleep(0.01)
+        assert prefetcher.fetched == 3
+
+        assert len(api.gallery("artist", 2)[0]) == 72
+        assert submission.next is not None
+        assert api.submission(submission.next)[0].id == submission.next
+        assert api.response_cache.hits == 2
+        paths: list[str] = [r.path for r in server.requests]
+        assert paths.count("/gallery/artist/2") == 1
+        assert paths.count(f"/view/{submission.next}") == 1
+        assert paths.count(f"/view/{submission.prev}") == 1
+    finally:
+        prefetcher.stop()
+    assert api.prefetcher is None
+
+
+def test_prefetch_errors(api: FAAPI, server: MockServer):
+    prefetcher: Prefetcher = Prefetcher(api)
+    assert api.response_cache is not None
+    server.fail_next("system_error")
+    prefetcher._fetch("gallery/artist/2", {})
+    assert len(api.response_cache) == 0 and prefetcher.fetched == 0
+
+    prefetcher._fetch("gallery/artist/2", {})
+    assert prefetcher.fetched == 1
+    assert len(api.gallery("artist", 2)[0]) == 72
+    assert len(api.gallery("artist", 2)[0]) == 72
+    assert [r.path for r in server.requests].count("/gallery/artist/2") == 3
+
+    prefetcher._fetch("gallery/artist/2", {})
+    api.swap_cookies([{"name": "b", "value": "b"}])
+    assert len(api.response_cache) == 0
+
+
+def test_errors(api: FAAPI, server: MockServer):
+    with raises(NotFound):
+        api.submission(1404)
+    with raises(DisabledAccount):
+        api.user("disabled")
+
+    server.fail_next("503", "system_error", "reset")
+    assert api.submission(1)[0].id == 1
+    assert api.retry_policy.stats.recovered == 1
+    assert api.retry_policy.stats.retries == 3
+
+    api.retry_policy.max_retries = 0
+    server.fail_next("system_error")
+    with raises(ServerError):
+        api.submission(1)
+
+
+def test_adaptive_delay(api: FAAPI, server: MockServer):
+    api.adaptive_delay = AdaptiveDelay(backoff_factor=2, recovery_step=0.05)
+    api.user("artist")
+    assert api.crawl_delay == 0.05
+
+    server.fail_next("503", "reset")
+    api.user("artist")
+    assert api.adaptive_delay.state.backoffs == 2
+    assert abs(api.crawl_delay - 0.15) < 1e-9
+    times: list[float] = [r.time for r in server.requests]
+    assert times[-1] - times[-2] >= 0.2 * 0.9
+
+    for _ in range(3):
+        api.user("artist")
+    assert api.crawl_delay == 0.05
+
+
+def test_adaptive_delay_files(api: FAAPI, server: MockServer):
+    api.adaptive_delay = AdaptiveDelay(backoff_factor=2, recovery_step=0.05)
+    submission, _ = api.submission(123)
+    submission.file_url = server.url + "/art/artist/1700000000/1700000000.artist_file.png"
+    server.file_errors = [503]
+    time_start: float = time()
+    assert len(api.submission_file(submission)) == server.file_size
+    assert time() - time_start >= 0.3 * 0.9
+    assert api.adaptive_delay.state.backoffs == 1
+    assert api.adaptive_delay.state.successes == 1
+    assert api.adaptive_delay.state.latency is not None and api.adaptive_delay.state.latency < 0.3
+
+    server.file_errors = [429]
+    assert api.submission_file_conditional(submission).file is not None
+    assert api.adaptive_delay.state.backoffs == 2
+
+
+def test_crawl_delay(api: FAAPI, server: MockServer):
+    for _ in range(5):
+        api.user("artist")
+    times: list[float] = [r.time for r in server.requests if r.path.startswith("/user/")]
+    assert len(times) == 5
+    assert all(b - a >= api.crawl_delay * 0.9 for a, b in zip(times, times[1:]))
@@ -0,0 +1,279 @@
+from datetime import datetime
+from pathlib import Path
+from pickle import dumps
+from pickle import loads
+
+from pytest import fixture
+from pytest import raises
+
+from faapi import Journal
+from faapi import JournalPartial
+from faapi import Submission
+from faapi import SubmissionPartial
+from faapi import User
+from faapi import UserPartial
+from faapi.comment import Comment
+from faapi.comment import flatten_comments
+from faapi.exceptions import DisabledAccount
+from faapi.exceptions import NotFound
+from faapi.parse import BeautifulSoup
+from faapi.parse import check_page_raise
+from faapi.parse import parse_comment_tag
+from faapi.parse import parse_comments
+from faapi.parse import parse_inbox_journal
+from faapi.parse import parse_inbox_journals
+from faapi.parse import parse_inbox_submissions
+from faapi.parse import parse_loggedin_user
+from faapi.parse import PageEnvelope
+from faapi.parse import parse_page
+from faapi.parse import parse_page_envelope
+from faapi.parse import parse_search_submissions
+from faapi.parse import parse_user_favorites
+from faapi.parse import parse_user_journals
+from faapi.parse import parse_user_submissions
+from faapi.parse import parse_watchlist
+
+__root__: Path = Path(__file__).resolve().parent
+
+
+@fixture
+def pages() -> dict[str, str]:
+    return {p.name.removesuffix(".html"): p.read_text(encoding="utf-8") for p in (__root__ / "pages").glob("*.html")}
+
+
+def test_check_page(pages: dict[str, str]):
+    check_page_raise(parse_page(pages["submission"]))
+
+    with raises(NotFound):
+        check_page_raise(parse_page(pages["not_found"]))
+
+    with raises(DisabledAccount):
+        check_page_raise(parse_page(pages["disabled"]))
+
+    assert parse_loggedin_user(parse_page(pages["gallery"])) == "tester"
+
+
+def test_page_envelope(pages: dict[str, str]):
+    page: BeautifulSoup = parse_page(pages["submission"])
+    envelope: PageEnvelope = parse_page_envelope(page)
+
+    assert envelope.classic is False
+    assert envelope.title.endswith("fur affinity [dot] net")
+    assert envelope.error == ""
+    assert envelope.notice is None
+    assert envelope.loggedin_user == "tester"
+    assert parse_page_envelope(page) is envelope
+
+    envelope_not_found: PageEnvelope = parse_page_envelope(parse_page(pages["not_found"]))
+    assert envelope_not_found.title == "system error"
+    assert "not in our database" in envelope_not_found.error
+
+
+def test_parse_page_bytes(pages: dict[str, str]):
+    page_text: BeautifulSoup = parse_page(pages["submission_comments"])
+    page_bytes: BeautifulSoup = parse_page(pages["submission_comments"].encode("utf-8"))
+
+    assert page_bytes.original_encoding == "utf-8"
+    assert str(page_bytes) == str(page_text)
+    assert dict(Submission(page_bytes)) == dict(Submission(page_text))
+
+
+def test_parse_page_chunks(pages: dict[str, str]):
+    content: bytes = pages["submission_comments"].encode("utf-8")
+    page: BeautifulSoup = parse_page(content)
+
+    for chunk_size in (1, 1000, 1 << 14):
+        page_chunks: BeautifulSoup = parse_page(content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+        assert page_chunks.original_encoding == "utf-8"
+        assert str(page_chunks) == str(page)
+
+
+def test_submission(pages: dict[str, str]):
+    submission: Submission = Submission(parse_page(pages["submission"]))
+
+    assert submission.id == 50000000
+    assert submission.title == "Red Fox Portrait"
+    assert submission.author.name == "artist"
+    assert submission.author.display_name == "Artist"
+    assert submission.author.title == "Digital Artist"
+    assert submission.date == datetime.fromtimestamp(1700000000)
+    assert submission.tags == ["fox", "digital", "commission", "red", "sketch", "portrait"]
+    assert submission.category == "Artwork (Digital) / Portraits"
+    assert submission.species == "Fox"
+    assert submission.rating == "General"
+    assert submission.type == "image"
+    assert submission.stats.comments == 12
+    assert submission.mentions == ["friend1", "buddy1"]
+    assert submission.folder == "gallery"
+    assert [f.name for f in submission.user_folders] == ["Commissions", "Sketches"]
+    assert submission.file_url == "https://d.furaffinity.net/art/artist/1700000000/1700000000.artist_file%20name.png"
+    assert submission.prev == 50000007
+    assert submission.next == 49999995
+    assert not submission.favorite
+    assert "linkusername" in submission.footer and "submission-footer" not in submission.description
+    assert len(flatten_comments(submission.comments)) == 12
+    assert all(c.reply_to is None for c in submission.comments)
+    assert all(c.parent is submission for c in flatten_comments(submission.comments))
+
+
+def test_submission_comments(pages: dict[str, str]):
+    submission: Submission = Submission(parse_page(pages["submission_comments"]))
+    comments = flatten_comments(submission.comments)
+
+    assert len(comments) == 600
+    assert len([c for c in comments if c.hidden]) == 16
+    assert len([c for c in comments if c.edited]) == 54
+    assert len([c for c in comments if c.reply_to is not None]) == 195
+    assert all(r.reply_to is c for c in comments for r in c.replies)
+
+
+def test_lazy_comments(pages: dict[str, str]):
+    submission: Submission = Submission(parse_page(pages["submission_comments"]), parse_comments=False)
+    assert submission._comments is None
+    assert len(flatten_comments(submission.comments)) == 600
+    assert submission.comments is submission.comments
+    assert all(c.parent is submission for c in flatten_comments(submission.comments))
+
+    journal: Journal = Journal(parse_page(pages["journal"]), parse_comments=False)
+    assert journal._comments is None
+    assert dict(journal) == dict(Journal(parse_page(pages["journal"])))
+
+    submission.comments = []
+    assert submission.comments == []
+
+
+def test_comment_parent_link(pages: dict[str, str]):
+    page_comment: str = pages["submission_comments"]
+    page_link: str = page_comment.replace(
+        '<!-- <a class="comment-parent" href="#cid:', '<a class="comment-parent" href="#cid:'
+    ).replace('">Parent</a> -->', '">Parent</a>')
+    assert page_link != page_comment
+
+    comments_comment: list[dict] = [parse_comment_tag(t) for t in parse_comments(parse_page(page_comment))]
+    comments_link: list[dict] = [parse_comment_tag(t) for t in parse_comments(parse_page(page_link))]
+
+    assert len([c for c in comments_link if c["parent"] is not None]) == 195
+    assert comments_link == comments_comment
+
+
+def test_user(pages: dict[str, str]):
+    user: User = User(parse_page(pages["user"]))
+
+    assert user.name == "artist"
+    assert user.status == "~"
+    assert user.title == "Digital Artist"
+    assert user.join_date == datetime(2015, 4, 1, 10, 20)
+    assert tuple(user.stats) == (123456, 789, 4567, 8910, 1112, 13, 1234, 56)
+    assert user.info == {"Species": "Red Fox", "Commissions": "Open"}
+    assert user.contacts == {"Twitter": "https://twitter.com/artist", "Website": "https://example.com"}
+    assert user.watched_toggle_link == "https://www.furaffinity.net/watch/artist/?key=abcdef0123456789"
+    assert not user.watched
+
+
+def test_journal(pages: dict[str, str]):
+    journal: Journal = Journal(parse_page(pages["journal"]))
+
+    assert journal.id == 10000000
+    assert journal.author.name == "artist"
+    assert journal.rating == "General"
+    assert journal.date == datetime.fromtimestamp(1700000000)
+    assert journal.stats.comments == 150
+    assert journal.header and journal.footer and journal.content
+    assert len(flatten_comments(journal.comments)) == 150
+
+
+def test_listings(pages: dict[str, str]):
+    gallery: dict = parse_user_submissions(parse_page(pages["gallery"]))
+    scraps: dict = parse_user_submissions(parse_page(pages["scraps"]))
+    favorites: dict = parse_user_favorites(parse_page(pages["favorites"]))
+    journals: dict = parse_user_journals(parse_page(pages["journals"]))
+    watchlist_page: BeautifulSoup = parse_page(pages["watchlist"])
+
+    assert gallery["name"] == "artist"
+    assert len(gallery["figures"]) == 72 and not gallery["last_page"]
+    assert len(scraps["figures"]) == 72 and scraps["last_page"]
+    assert favorites["next_page"] == "1234567890/next"
+    assert len(journals["sections"]) == 25 and not journals["last_page"]
+
+    submission: SubmissionPartial = SubmissionPartial(gallery["figures"][1])
+    assert submission.id == 49999987
+    assert submission.rating == "mature"
+    assert submission.type == "text"
+
+    journal: JournalPartial = JournalPartial(journals["sections"][0])
+    assert journal.id == 10000000
+    assert journal.stats.comments == 0
+
+    users, next_page = parse_watchlist(watchlist_page)
+    assert len(users) == 200
+    assert users[1] == ("!", "watcher1")
+    assert next_page == 2
+
+
+def test_inbox(pages: dict[str, str]):
+    submissions: dict = parse_inbox_submissions(parse_page(pages["msg_submissions"]))
+    assert len(submissions["figures"]) == 72
+    assert submissions["next_page"] == "new~49999900@72"
+
+    submission: SubmissionPartial = SubmissionPartial(submissions["figures"][0])
+    assert submission.id == 50000000
+    assert submission.author.name != ""
+
+    journals: list[dict] = list(map(parse_inbox_journal, parse_inbox_journals(parse_page(pages["msg_others"]))))
+    assert len(journals) == 12
+    assert journals[0]["id"] == 10500000
+    assert journals[0]["title"] != ""
+    assert journals[0]["date"] == datetime(2026, 10, 18, 12, 15)
+    assert all(j["author"] and j["author_display_name"] for j in journals)
+
+
+def test_search(pages: dict[str, str]):
+    results: dict = parse_search_submissions(parse_page(pages["search"]))
+    assert len(results["figures"]) == 72 and not results["last_page"]
+    last_page: str = pages["search"].replace('name="next_page" value="Next"', 'name="previous_page" value="Back"')
+    assert parse_search_submissions(parse_page(last_page))["last_page"]
+    assert not parse_search_submissions(parse_page(pages["gallery"]))["last_page"]
+    assert parse_search_submissions(parse_page(pages["scraps"]))["last_page"]
+    assert parse_search_submissions(parse_page(pages["not_found"]))["last_page"]
+
+
+def test_from_dict(pages: dict[str, str]):
+    submission: Submission = Submission(parse_page(pages["submission_comments"]))
+    submission_new: Submission = Submission.from_dict(dict(submission))
+    assert dict(submission_new) == dict(submission)
+    assert all(c.parent is submission_new for c in flatten_comments(submission_new.comments))
+    assert all(r.reply_to is c for c in flatten_comments(submission_new.comments) for r in c.replies)
+
+    journal: Journal = Journal(parse_page(pages["journal"]))
+    assert dict(Journal.from_dict(dict(journal))) == dict(journal)
+
+    user: User = User(parse_page(pages["user"]))
+    assert dict(User.from_dict(dict(user))) == dict(user)
+    assert dict(UserPartial.from_dict(dict(submission.author))) == dict(submission.author)
+
+    partial: SubmissionPartial = SubmissionPartial(parse_user_submissions(parse_page(pages["gallery"]))["figures"][0])
+    assert dict(SubmissionPartial.from_dict(dict(partial))) == dict(partial)
+
+    journal_partial: JournalPartial = JournalPartial(parse_user_journals(parse_page(pages["journals"]))["sections"][0])
+    assert dict(JournalPartial.from_dict(dict(journal_partial))) == dict(journal_partial)
+
+    comment: Comment = submission.comments[0]
+    comment_new: Comment = Comment.from_dict(dict(comment), submission_new)
+    assert comment_new.parent is submission_new
+    assert dict(comment_new) == dict(comment) | {"parent": dict(submission_new)}
+
+
+def test_pickle(pages: dict[str, str]):
+    submission: Submission = Submission(parse_page(pages["submission_comments"]), parse_comments=False)
+    submission_new: Submission = loads(dumps(submission))
+    assert submission_new.submission_page is None
+    assert dict(submission_new) == dict(submission)
+    assert all(c.comment_tag is None and c.parent is submission_new for c in flatten_comments(submission_new.comments))
+
+    journal: Journal = Journal(parse_page(pages["journal"]))
+    assert dict(loads(dumps(journal))) == dict(journal)
+
+    user: User = User(parse_page(pages["user"]))
+    user_new: User = loads(dumps(user))
+    assert user_new.user_page is None
+    assert dict(user_new) == dict(user)
@@ -0,0 +1,58 @@
+from email.utils import formatdate
+from http.client import IncompleteRead
+from time import time
+
+from requests import Response
+from requests.exceptions import HTTPError
+from requests.exceptions import Timeout
+
+from faapi.exceptions import DisabledAccount
+from faapi.exceptions import NotFound
+from faapi.exceptions import ServerError
+from faapi.retry import RetryPolicy
+
+
+def http_error(status_code: int, headers: dict[str, str]) -> HTTPError:
+    response: Response = Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    return HTTPError(response=response)
+
+
+def test_is_transient():
+    assert RetryPolicy.is_transient(ServerError("System Error"))
+    assert RetryPolicy.is_transient(Timeout())
+    assert RetryPolicy.is_transient(IncompleteRead(b"", 10))
+    assert RetryPolicy.is_transient(http_error(503, {}))
+    assert not RetryPolicy.is_transient(http_error(404, {}))
+    assert not RetryPolicy.is_transient(NotFound())
+    assert not RetryPolicy.is_transient(DisabledAccount())
+
+
+def test_backoff():
+    policy: RetryPolicy = RetryPolicy(backoff_factor=1, backoff_max=10, jitter=0.5)
+    assert 5 <= policy.backoff(0, 5) <= 7.5
+    assert 4 <= policy.backoff(2, 1) <= 6
+    assert 10 <= policy.backoff(10, 1) <= 15
+
+
+def test_retry_after():
+    policy: RetryPolicy = RetryPolicy(backoff_max=60)
+    assert policy.retry_after(http_error(503, {"Retry-After": "30"})) == 30
+    assert policy.retry_after(http_error(503, {"Retry-After": "3600"})) == 60
+    assert policy.retry_after(http_error(503, {})) is None
+    assert policy.retry_after(http_error(503, {"Retry-After": "soon"})) is None
+    assert 0 < (policy.retry_after(http_error(503, {"Retry-After": formatdate(time() + 30, usegmt=True)})) or 0) <= 30
+    assert policy.retry_after(http_error(503, {"Retry-After": formatdate(time() + 3600, usegmt=True)})) == 60
+    assert policy.retry_after(ServerError()) is None
+
+
+def test_stats():
+    policy: RetryPolicy = RetryPolicy()
+    policy.stats.record_retry(ServerError(), 2)
+    policy.stats.record_retry(Timeout(), 3)
+    policy.stats.record_recovered()
+    assert dict(policy.stats) == {
+        "retries": 2, "recovered": 1, "exhausted": 0, "permanent": 0, "wait": 5,
+        "errors": {"ServerError": 1, "Timeout": 1},
+    }
@@ -0,0 +1,107 @@
+from gc import collect
+from time import sleep
+from time import time
+from urllib.robotparser import RobotFileParser
+from weakref import ref
+
+from faapi.robots import RobotsPolicy
+
+robots_txt: list[str] = [
+    "User-agent: badbot",
+    "Disallow: /",
+    "",
+    "User-agent: *",
+    "Crawl-delay: 2",
+    "Allow: /view/1/",
+    "Disallow: /view/1",
+    "Disallow: /fav/",
+    "Disallow: /controls/settings/",
+    "Disallow: /msg/pms/",
+    "Disallow: /search",
+    "",
+]
+
+paths: list[str] = [
+    "/", "/view/1/", "/view/12/", "/view/1", "/view/123456/", "/view/", "/view", "/fav/", "/fav/123/", "/fav",
+    "/controls/", "/controls/settings/", "/controls/settings/x/", "/msg/pms/", "/msg/submissions/", "/search",
+    "/search/", "/search?q=a", "/searching/", "/fa%76/1/", "/user/name with spaces/", "/user/é/", "//fav/",
+    "/gallery/user/2/?folder=1", "/journal/1;a",
+]
+
+
+def make_robots(lines: list[str]) -> RobotFileParser:
+    robots: RobotFileParser = RobotFileParser()
+    robots.parse(lines)
+    return robots
+
+
+def test_can_fetch():
+    robots: RobotFileParser = make_robots(robots_txt)
+    for user_agent in ("faapi/3.13.0 Python/3.9", "BadBot/1.0"):
+        policy: RobotsPolicy = RobotsPolicy(robots, user_agent)
+        for _ in range(2):
+            assert [policy.can_fetch(p) for p in paths] == [robots.can_fetch(user_agent, p) for p in paths]
+
+
+def test_crawl_delay():
+    assert RobotsPolicy(make_robots(robots_txt), "faapi/3.13.0").crawl_delay == 2
+    assert RobotsPolicy(make_robots(["User-agent: *", "Disallow: /fav/"]), "faapi/3.13.0").crawl_delay == 1
+
+
+def test_constant():
+    assert RobotsPolicy(make_robots([]), "faapi/3.13.0").can_fetch("/fav/")
+    assert not RobotsPolicy(RobotFileParser(), "faapi/3.13.0").can_fetch("/view/1/")
+
+
+def test_compile():
+    robots: RobotFileParser = make_robots(robots_txt)
+    policy: RobotsPolicy = RobotsPolicy(robots, "faapi/3.13.0")
+    getattr(robots, "default_entry").delay = 5
+    assert policy.crawl_delay == 2
+    policy.compile()
+    assert policy.crawl_delay == 5
+
+
+def test_refresh():
+    policy: RobotsPolicy = RobotsPolicy(make_robots(robots_txt), "faapi/3.13.0")
+    assert not policy.can_fetch("/fav/1/")
+    policy.refresh(make_robots(["User-agent: *", "Crawl-delay: 3", "Disallow: /user/"]))
+    assert policy.can_fetch("/fav/1/")
+    assert not policy.can_fetch("/user/name/")
+    assert policy.crawl_delay == 3
+    assert policy.refreshes == 1
+
+
+def test_start_refresh():
+    fetches: list[float] = []
+
+    def fetch() -> RobotFileParser:
+        fetches.append(time())
+        if len(fetches) == 1:
+            raise ConnectionError
+        return make_robots(["User-agent: *", "Disallow: /user/"])
+
+    policy: RobotsPolicy = RobotsPolicy(make_robots(robots_txt), "faapi/3.13.0")
+    thread = policy.start_refresh(fetch, 0.01)
+    time_start: float = time()
+    while policy.refreshes < 2 and time() - time_start < 5:
+        sleep(0.01)
+    policy.stop_refresh()
+    thread.join(1)
+    assert not thread.is_alive()
+    assert policy.refreshes >= 2
+    assert not policy.can_fetch("/user/name/")
+
+
+def test_start_refresh_deleted():
+    def fetch() -> RobotFileParser:
+        return make_robots(robots_txt)
+
+    policy: RobotsPolicy = RobotsPolicy(make_robots(robots_txt), "faapi/3.13.0")
+    policy_ref = ref(policy)
+    thread = policy.start_refresh(fetch, 0.01)
+    del policy
+    collect()
+    assert policy_ref() is None
+    thread.join(1)
+    assert not thread.is_alive()
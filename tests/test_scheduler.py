@@ -0,0 +1,66 @@
+from asyncio import gather
+from asyncio import run
+from threading import Thread
+from time import sleep
+from time import time
+
+from faapi.scheduler import current_priority
+from faapi.scheduler import priority
+from faapi.scheduler import RequestPriority
+from faapi.scheduler import Scheduler
+
+
+def run_threads(scheduler: Scheduler, delay: float, priorities: list[RequestPriority]) -> list[tuple[int, float]]:
+    served: list[tuple[int, float]] = []
+
+    def request(i: int, request_priority: RequestPriority):
+        scheduler.acquire(delay, request_priority)
+        served.append((i, time()))
+
+    threads: list[Thread] = [Thread(target=request, args=(i, p)) for i, p in enumerate(priorities)]
+    for thread in threads:
+        thread.start()
+        sleep(0.01)
+    for thread in threads:
+        thread.join()
+    return served
+
+
+def test_scheduler_priority():
+    scheduler: Scheduler = Scheduler(time())
+    served: list[tuple[int, float]] = run_threads(scheduler, 0.1, [
+        RequestPriority(0, None), RequestPriority(0, None), RequestPriority(10, None), RequestPriority(5, None),
+    ])
+
+    assert [i for i, _ in served] == [2, 3, 0, 1]
+    assert all(b - a >= 0.09 for (_, a), (_, b) in zip(served, served[1:]))
+    assert scheduler.served == 4 and len(scheduler) == 0
+
+
+def test_scheduler_deadline_aging():
+    scheduler: Scheduler = Scheduler(time())
+    served: list[tuple[int, float]] = run_threads(scheduler, 0.1, [
+        RequestPriority(10, None), RequestPriority(20, None), RequestPriority(0, time() + 0.15),
+    ])
+    assert [i for i, _ in served] == [2, 1, 0]
+
+    scheduler = Scheduler(time(), aging=0.01)
+    served = run_threads(scheduler, 0.1, [RequestPriority(0, None), RequestPriority(1, None)])
+    assert [i for i, _ in served] == [0, 1]
+
+
+def test_scheduler_async():
+    scheduler: Scheduler = Scheduler(time())
+
+    async def request(value: int) -> tuple[int, float]:
+        with priority(value):
+            assert current_priority().priority == value
+            return value, time() + await scheduler.acquire_async(0.05)
+
+    async def main() -> list[tuple[int, float]]:
+        return await gather(*(request(v) for v in range(3)))
+
+    results: list[tuple[int, float]] = run(main())
+    assert scheduler.served == 3
+    assert current_priority() == RequestPriority(0, None)
+    assert max(t for _, t in results) - min(t for _, t in results) >= 0.09
@@ -0,0 +1,58 @@
+from datetime import date
+
+from pytest import raises
+
+from faapi.search import browse_params
+from faapi.search import search_params
+
+
+def test_search_params():
+    params = search_params(" cat ", 2)
+    assert params["q"] == "cat"
+    assert params["page"] == 2
+    assert params["range"] == "all"
+    assert params["order-direction"] == "desc"
+    assert {k for k in params if k.startswith("rating-")} == {"rating-general", "rating-mature", "rating-adult"}
+    assert len([k for k in params if k.startswith("type-")]) == 6
+
+    params = search_params(
+        "cat", rating=["general"], type_=("art", "story"), date_range="7days", order_by="date", ascending=True
+    )
+    assert {k for k in params if k.startswith("rating-")} == {"rating-general"}
+    assert {k for k in params if k.startswith("type-")} == {"type-art", "type-story"}
+    assert params["range"] == "7days"
+    assert params["order-by"] == "date"
+    assert params["order-direction"] == "asc"
+
+
+def test_search_params_dates():
+    params = search_params("cat", date_from=date(2026, 1, 1), date_to=date(2026, 2, 1))
+    assert (params["range"], params["range_from"], params["range_to"]) == ("manual", "2026-01-01", "2026-02-01")
+    params = search_params("cat", date_from=date(2026, 1, 1))
+    assert (params["range"], params["range_from"], params["range_to"]) == ("manual", "2026-01-01", "")
+
+
+def test_search_params_errors():
+    with raises(ValueError):
+        search_params(" ")
+    with raises(ValueError):
+        search_params("cat", 0)
+    with raises(ValueError):
+        search_params("cat", rating=[])
+    with raises(ValueError):
+        search_params("cat", type_=["video"])  # type: ignore
+    with raises(ValueError):
+        search_params("cat", date_range="2days")  # type: ignore
+    with raises(ValueError):
+        search_params("cat", date_from=date(2026, 2, 1), date_to=date(2026, 1, 1))
+
+
+def test_browse_params():
+    params = browse_params(3, rating=("mature", "adult"), category=2, per_page=48)
+    assert params == {
+        "cat": 2, "atype": 1, "species": 1, "gender": 0, "perpage": 48, "page": 3, "rating_mature": 1, "rating_adult": 1
+    }
+    with raises(ValueError):
+        browse_params(per_page=100)  # type: ignore
+    with raises(ValueError):
+        browse_params(category=0)
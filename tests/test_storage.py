@@ -0,0 +1,86 @@
+from pathlib import Path
+
+from pytest import fixture
+from pytest import raises
+
+from faapi import Journal
+from faapi import JournalPartial
+from faapi import Submission
+from faapi import SubmissionPartial
+from faapi import User
+from faapi.comment import Comment
+from faapi.comment import flatten_comments
+from faapi.parse import parse_page
+from faapi.parse import parse_user_journals
+from faapi.parse import parse_user_submissions
+from faapi.storage import Database
+
+__root__: Path = Path(__file__).resolve().parent
+
+
+@fixture
+def pages() -> dict[str, str]:
+    return {p.name.removesuffix(".html"): p.read_text(encoding="utf-8") for p in (__root__ / "pages").glob("*.html")}
+
+
+def test_save_submissions(pages: dict[str, str], tmp_path: Path):
+    submission: Submission = Submission(parse_page(pages["submission_comments"]))
+    partials: list[SubmissionPartial] = [
+        SubmissionPartial(f) for f in parse_user_submissions(parse_page(pages["gallery"]))["figures"]
+    ]
+
+    with Database(tmp_path / "archive.sqlite", batch_size=50) as database:
+        assert database.connection.execute("pragma journal_mode").fetchone()[0] == "wal"
+        database.save_submissions([submission])
+        database.save_submissions(partials)
+        database.save_submissions([submission, *partials])
+
+        assert database.count("submissions") == len({submission.id, *(s.id for s in partials)})
+        assert database.count("tags") == len(submission.tags)
+        assert database.count("user_folders") == len(submission.user_folders)
+        assert database.count("comments") == len(flatten_comments(submission.comments))
+        assert database.stored_submissions([submission.id, 1]) == {submission.id}
+        assert database.stored_submissions(range(100000)) == set()
+        assert database.stored_users([submission.author.name.upper()]) == {submission.author.name_url}
+
+    with Database(tmp_path / "archive.sqlite") as database:
+        database.save_submissions([partials[0]])
+        assert database.count("submissions") == len({submission.id, *(s.id for s in partials)})
+        assert database.connection.execute(
+            "select file_url, description from submissions where id = ?", [submission.id]
+        ).fetchone() == (submission.file_url, submission.description)
+        assert database.connection.execute(
+            "select count(*) from comments where reply_to is not null"
+        ).fetchone()[0] == sum(c.reply_to is not None for c in flatten_comments(submission.comments))
+
+        submission.comments = submission.comments[1:]
+        database.save_submissions([submission])
+        assert database.count("comments") == len(flatten_comments(submission.comments))
+
+
+def test_save_journals_users(pages: dict[str, str]):
+    journal: Journal = Journal(parse_page(pages["journal"]))
+    partials: list[JournalPartial] = [
+        JournalPartial(j) for j in parse_user_journals(parse_page(pages["journals"]))["sections"]
+    ]
+    user: User = User(parse_page(pages["user"]))
+
+    with Database() as database:
+        database.save_journals([journal, *partials])
+        database.save_users([user])
+        database.save_users([journal.author])
+
+        assert database.stored_journals([journal.id, *(j.id for j in partials), 0]) == \
+               {journal.id, *(j.id for j in partials)}
+        assert database.count("comments") == len(flatten_comments(journal.comments))
+        assert database.stored_users([user.name, journal.author.name]) == {user.name_url, journal.author.name_url}
+        assert database.connection.execute(
+            "select profile, watched_by from users where name_url = ?", [user.name_url]
+        ).fetchone() == (user.profile, user.stats.watched_by)
+
+        journal.comments = []
+        database.save_journals([journal, *partials])
+        assert database.count("comments") == 0
+
+        with raises(ValueError):
+            database.save_comments([Comment()])
@@ -0,0 +1,69 @@
+from email.utils import formatdate
+from time import time
+
+from faapi.throttle import AdaptiveDelay
+from faapi.throttle import parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("30") == 30
+    assert parse_retry_after("-1") == 0
+    assert 55 < (parse_retry_after(formatdate(time() + 60, usegmt=True)) or 0) <= 60
+    assert parse_retry_after("soon") is None
+
+
+def test_minimum():
+    delay: AdaptiveDelay = AdaptiveDelay()
+    assert delay.delay(1) == 1
+    delay.record_success(0.1, 1)
+    assert delay.delay(1) == 1
+    assert delay.delay(2) == 2
+
+
+def test_backoff_recovery():
+    delay: AdaptiveDelay = AdaptiveDelay(backoff_factor=2, recovery_step=0.5, max_delay=10)
+    delay.record_distress(1)
+    assert delay.delay(1) == 2
+    delay.record_distress(1)
+    assert delay.delay(1) == 4
+    for _ in range(3):
+        delay.record_distress(1)
+    assert delay.delay(1) == 10
+    assert delay.state.backoffs == 5
+
+    for _ in range(4):
+        delay.record_success(0.1, 1)
+    assert delay.delay(1) == 8
+    for _ in range(100):
+        delay.record_success(0.1, 1)
+    assert delay.delay(1) == 1
+
+
+def test_retry_after():
+    delay: AdaptiveDelay = AdaptiveDelay(backoff_factor=1)
+    delay.record_distress(1, 30)
+    last_get: float = time()
+    assert 29 < delay.delay(1, last_get) <= 30
+    assert delay.delay(1, last_get + 30) == 1
+
+
+def test_latency():
+    delay: AdaptiveDelay = AdaptiveDelay(latency_threshold=3, latency_alpha=0.5)
+    for _ in range(10):
+        delay.record_success(0.1, 1)
+    assert delay.state.backoffs == 0
+    assert abs(delay.state.baseline_latency - 0.1) < 1e-9
+
+    for _ in range(10):
+        delay.record_success(1, 1)
+    # Backed off at most once for every 1 / latency_alpha slow responses
+    assert 1 <= delay.state.backoffs <= 5
+    assert delay.delay(1) > 1
+    assert abs(delay.state.baseline_latency - 0.1) < 1e-9
+
+    state = delay.state
+    delay.record_success(None, 1)
+    assert delay.state.latency == state.latency and delay.state.baseline_latency == state.baseline_latency
+    assert abs(delay.state.delay - max(1, state.delay - delay.recovery_step)) < 1e-9